@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks for `integraty.productivity`.
+
+Run from the root of the repository:
+$ python benchmarks/bench_productivity.py
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from integraty.productivity import READ_LIMIT_BYTES, ChecksumFile
+
+
+# Checksums as computed before, reading whole file once per algorithm.
+def legacy_digests(path, algorithms):
+    result = {}
+    with open(path, "rb") as f:
+        for name in algorithms:
+            f.seek(0)
+            result[name] = hashlib.new(name,
+                                       f.read(READ_LIMIT_BYTES)).hexdigest()
+    return result
+
+
+def peak(func):
+    """Returns result of `func` and the most memory it held at once."""
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def bench_checksums(size_mib=64, number=3):
+    """Whole file read per algorithm versus all algorithms in one pass."""
+    algorithms = ("sha1", "sha256", "md5")
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(os.urandom(1 << 20) * size_mib)
+        f.flush()
+        legacy = lambda: legacy_digests(f.name, algorithms)
+        single = lambda: ChecksumFile(f.name).digests(*algorithms)
+        (expected, legacy_peak), (actual, single_peak) = map(
+            peak, (legacy, single))
+        assert expected == actual
+        t_legacy = timeit.timeit(legacy, number=number) / number
+        t_single = timeit.timeit(single, number=number) / number
+        print(f"checksums {size_mib} MiB: legacy {t_legacy:.3f}s, "
+              f"peak {legacy_peak / (1 << 20):.1f} MiB; "
+              f"single pass {t_single:.3f}s, "
+              f"peak {single_peak / (1 << 20):.1f} MiB")
+
+
+if __name__ == "__main__":
+    bench_checksums()
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks for `integraty.case.Similarity`.
+
+Run from the root of the repository:
+$ python benchmarks/bench_similarity.py
+"""
+
+import math
+import os
+import random
+import re
+import sys
+import timeit
+
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from integraty.case import Similarity, similarity_many
+from integraty.fingerprint import LSHIndex, MinHash
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "tests")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def mutate(text, edits, seed=0):
+    """Copy of `text` with `edits` characters replaced at random."""
+    rng = random.Random(seed)
+    chars = list(text)
+    for i in rng.sample(range(len(chars)), edits):
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz0123456789")
+    return "".join(chars)
+
+
+# Levenshtein distance as implemented before, with a full matrix of lists,
+# grown by `list.insert`.
+def legacy_levenshtein_distance(str1, str2):
+    m = len(str1)
+    n = len(str2)
+    lensum = float(m + n)
+    d = []
+    for i in range(m + 1):
+        d.append([i])
+    del d[0][0]
+    for j in range(n + 1):
+        d[0].append(j)
+    for j in range(1, n + 1):
+        for i in range(1, m + 1):
+            if str1[i - 1] == str2[j - 1]:
+                d[i].insert(j, d[i - 1][j - 1])
+            else:
+                minimum = min(d[i - 1][j] + 1, d[i][j - 1] + 1,
+                              d[i - 1][j - 1] + 2)
+                d[i].insert(j, minimum)
+    ldist = d[-1][-1]
+    ratio = (lensum - ldist) / lensum
+    return ldist, ratio
+
+
+def bench_levenshtein(text, label, sizes=(500, 2000), number=3):
+    """Full-matrix distance versus bit-parallel one, and its early exit."""
+    for size in sizes:
+        str1 = text[:size]
+        str2 = mutate(str1, size // 10)
+        legacy = lambda: legacy_levenshtein_distance(str1, str2)
+        fast = lambda: Similarity._levenshtein_distance(str1, str2)
+        assert legacy() == fast()
+        t_legacy = timeit.timeit(legacy, number=1)
+        t_fast = timeit.timeit(fast, number=number) / number
+        print(f"levenshtein ({label}) {size} chars: legacy {t_legacy:.3f}s, "
+              f"bit-parallel {t_fast:.4f}s, {t_legacy / t_fast:.0f}x")
+    str1 = (text * (50000 // len(text) + 1))[:50000]
+    str2 = mutate(str1, 500)
+    distance, _ = Similarity._levenshtein_distance(str1, str2)
+    for name, bound in (("exact", None), ("bounded", distance // 10)):
+        t = timeit.timeit(lambda: Similarity._levenshtein_distance(
+            str1, str2, bound), number=1)
+        print(f"levenshtein ({label}) 50000 chars, {name}: {t:.3f}s")
+
+
+def bench_units(text, label, repeat=100, number=3):
+    """Whole outputs compared by characters versus by lines and tokens."""
+    expected = text * repeat
+    lines = expected.splitlines()
+    for i in range(0, len(lines), 500):
+        lines[i] = mutate(lines[i], 1, seed=i) if lines[i] else "new line"
+    actual = "\n".join(lines)
+    for unit in ("char", "line", "token"):
+        sim = Similarity(actual, expected, unit)
+        cases = [("levenshtein", sim.levenshtein_distance),
+                 ("difflib", sim.difflib_ratio)]
+        if unit != "char":
+            cases.append(("differences", sim.differences))
+        timings = []
+        for name, run in cases:
+            t = timeit.timeit(run, number=1 if unit == "char" else number)
+            t /= 1 if unit == "char" else number
+            timings.append(f"{name} {t:.4f}s")
+        print(f"similarity ({label}) {len(lines)} lines by {unit}: "
+              f"{', '.join(timings)}")
+
+
+# Cosine similarity as implemented before, tokenizing both texts on every
+# call, and adding up squares of all counts of both.
+def legacy_cosine(str1, str2):
+    vec1 = Counter(re.compile(r"\w+").findall(str1))
+    vec2 = Counter(re.compile(r"\w+").findall(str2))
+    intersection = set(vec1.keys()) & set(vec2.keys())
+    numerator = sum(vec1[x] * vec2[x] for x in intersection)
+    sum1 = sum(vec1[x]**2 for x in vec1.keys())
+    sum2 = sum(vec2[x]**2 for x in vec2.keys())
+    denom = math.sqrt(sum1) * math.sqrt(sum2)
+    return float(numerator) / denom if denom else 0.0
+
+
+def bench_similarity_many(text, label, repeat=50, snippets=50, number=3):
+    """One output against many snippets, tokenized per pair versus once."""
+    actual = text * repeat
+    expected = [actual[i * 97:i * 97 + 400] for i in range(snippets)]
+    legacy = lambda: [legacy_cosine(actual, e) for e in expected]
+    many = lambda: similarity_many(actual, expected)
+    assert all(abs(a - b) < 1e-9 for a, b in zip(legacy(), many()))
+    t_legacy = timeit.timeit(legacy, number=number) / number
+    t_many = timeit.timeit(many, number=number) / number
+    print(f"cosine ({label}) 1 x {snippets}: legacy {t_legacy:.3f}s, "
+          f"similarity_many {t_many:.3f}s, {t_legacy / t_many:.0f}x")
+
+
+def nearest(minhash, signatures):
+    return max(signatures, key=lambda k: minhash.similarity(signatures[k]))
+
+
+def bench_fingerprint(text, label, baselines=1000, number=3):
+    """Nearest of stored outputs by cosine, by MinHash and by LSH index."""
+    goldens = {f"golden{i}": mutate(text, len(text) // 5, seed=i)
+               for i in range(baselines)}
+    actual = mutate(goldens["golden7"], len(text) // 50, seed=-1)
+    t0 = timeit.default_timer()
+    signatures = {k: MinHash.from_text(g) for k, g in goldens.items()}
+    t_sign = (timeit.default_timer() - t0) / baselines
+    index = LSHIndex()
+    for key, minhash in signatures.items():
+        index.add(key, minhash)
+    cases = [
+        ("cosine", lambda: max(goldens, key=lambda k: Similarity(
+            actual, goldens[k]).consine_distance())),
+        ("minhash", lambda: nearest(MinHash.from_text(actual), signatures)),
+        ("lsh", lambda: index.query(MinHash.from_text(actual))[0][0]),
+    ]
+    timings = []
+    for name, run in cases:
+        assert run() == "golden7"
+        t = timeit.timeit(run, number=number) / number
+        timings.append(f"{name} {t:.4f}s")
+    print(f"fingerprint ({label}) nearest of {baselines}: "
+          f"{', '.join(timings)}; signing {t_sign * 1000:.2f}ms each")
+
+
+if __name__ == "__main__":
+    bench_levenshtein(fixture("whois_iana_org_ip6_servers_arpa"), "whois")
+    bench_units(fixture("whois_iana_org_ip6_servers_arpa"), "whois")
+    bench_similarity_many(fixture("whois_iana_org_ip6_servers_arpa"), "whois")
+    bench_fingerprint(fixture("whois_iana_org_ip6_servers_arpa"), "whois")
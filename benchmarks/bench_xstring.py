@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks for `integraty.xstring.String`.
+
+Run from the root of the repository:
+$ python benchmarks/bench_xstring.py
+"""
+
+import gc
+import itertools
+import os
+import random
+import re
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from integraty.utils import Split
+from integraty.xstring import String
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "tests")
+
+
+def fixture(name, repeat):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read() * repeat
+
+
+def dig_output(repeat=20000):
+    """A `dig`-style capture several megabytes in size."""
+    return fixture("dig_t_mx_cloudflare_com", repeat)
+
+
+def whois_output(repeat=2000):
+    """A `whois`-style capture several megabytes in size."""
+    return fixture("whois_iana_org_ip6_servers_arpa", repeat)
+
+
+def varying_pairs_output(lines=50000, seed=1):
+    """Key-value lines, e.g. of flow logs, each with its own set of keys."""
+    rng = random.Random(seed)
+    fields = ("src", "dst", "proto", "port", "bytes", "pkts", "flags", "ttl",
+              "uid", "state", "duration", "service")
+    return "".join(" ".join(
+        "%s %d" % (k, rng.randrange(100000))
+        for k in rng.sample(fields, rng.randint(3, 8))) + "\n"
+                   for _ in range(lines))
+
+
+# Extractors as implemented before the fused pipeline: a filtered list of
+# lines is materialized first, then every line is split by a new Split
+# object, twice for pairs and dicts.
+def legacy_take_column(s, column=0, **kw):
+    return [Split(l)()[column].strip() for l in s.lines(**kw)]
+
+
+def legacy_compress(s, indexes=(), **kw):
+    selectors = tuple(i in indexes for i in range(max(indexes) + 1))
+    return [tuple(itertools.compress(Split(l)(), selectors))
+            for l in s.lines(**kw)]
+
+
+def legacy_pairs(s, **kw):
+    return [dict(zip(Split(l)()[::2], Split(l)()[1::2]))
+            for l in s.lines(**kw)]
+
+
+def legacy_to_dict(s, **kw):
+    return [dict(zip(range(len(Split(l)())), Split(l)()))
+            for l in s.lines(**kw) if l]
+
+
+def legacy_line_tuples(s, **kw):
+    result = []
+    for l in s.lines(**kw):
+        tokens = tuple(Split(l)())
+        if tokens:
+            result.append(tokens)
+    return result
+
+
+def bench_line_index(data, queries=30, number=3):
+    """
+    Many queries against a single String should pay for splitting input into
+    lines once, instead of once per query.
+    """
+
+    def run(s):
+        for _ in range(queries):
+            s.count()
+
+    split_once = timeit.timeit(
+        lambda: [l.strip() for l in data.splitlines() if l],
+        number=number) / number
+    total = timeit.timeit(lambda: run(String(data)), number=number) / number
+    print(f"line index: one split {split_once:.3f}s, "
+          f"{queries} queries {total:.3f}s "
+          f"({total / split_once:.1f}x one split)")
+
+
+def bench_pipeline(data, label, pattern, number=3):
+    """Fused single-pass extractors versus their earlier list-based form."""
+    s = String(data)
+    s.count()  # Both variants share the line index; keep it out of timings.
+    cases = [
+        ("take_column", lambda: s.take_column(column=0, pattern=pattern),
+         lambda: legacy_take_column(s, column=0, pattern=pattern)),
+        ("compress", lambda: s.compress(indexes=(0, 2), pattern=pattern),
+         lambda: legacy_compress(s, indexes=(0, 2), pattern=pattern)),
+        ("pairs", lambda: s.pairs(as_dict=True, pattern=pattern),
+         lambda: legacy_pairs(s, pattern=pattern)),
+        ("to_dict", lambda: s.to_dict(pattern=pattern),
+         lambda: legacy_to_dict(s, pattern=pattern)),
+        ("line_tuples", lambda: s.line_tuples(pattern=pattern),
+         lambda: legacy_line_tuples(s, pattern=pattern)),
+    ]
+    for name, fused, legacy in cases:
+        assert fused() == legacy()
+        t_fused = timeit.timeit(fused, number=number) / number
+        t_legacy = timeit.timeit(legacy, number=number) / number
+        print(f"pipeline ({label}) {name}: legacy {t_legacy:.3f}s, "
+              f"fused {t_fused:.3f}s, {t_legacy / t_fused:.1f}x")
+
+
+def bench_literal(data, label, literals, number=3):
+    """Plain-word patterns matched by `re`, by `in` and by `str.find`."""
+    for literal in literals:
+        cases = [
+            ("regex", lambda s: list(
+                filter(re.compile(literal).search, s._splitlines()))),
+            ("in", lambda s: s.lines(pattern=literal)),
+            ("find", lambda s: list(s._find_lines(literal))),
+        ]
+        results = []
+        timings = []
+        for name, run in cases:
+            s = String(data)
+            s.count()
+            results.append(run(s))
+            t = timeit.timeit(lambda: run(s), number=number) / number
+            timings.append(f"{name} {t:.3f}s")
+        assert results[0] == results[1] == results[2]
+        # Without an index, the line index is only built if it pays off.
+        s = String(data)
+        t_first = timeit.timeit(lambda: s.lines(pattern=literal), number=1)
+        print(f"literal ({label}) {literal!r}, {len(results[0])} lines: "
+              f"{', '.join(timings)}, unindexed {t_first:.3f}s")
+
+
+def allocated(func):
+    """Returns result of `func` and memory it still holds once returned."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def bench_records(data, label, pattern=None, keys=None, number=3):
+    """Memory held by a dict per line versus a compact record per line."""
+    s = String(data)
+    s.count()  # The line index is shared; keep it out of measurements.
+    cases = [
+        ("to_dict", lambda c: s.to_dict(keys=keys, pattern=pattern,
+                                        compact=c)),
+        ("pairs", lambda c: s.pairs(as_dict=True, pattern=pattern,
+                                    compact=c)),
+    ]
+    for name, run in cases:
+        dicts, dicts_size = allocated(lambda: run(False))
+        records, records_size = allocated(lambda: run(True))
+        # Beyond MAX_RECORD_TYPES sets of keys, lines are left as dicts.
+        assert [dict(r.items()) for r in records] == dicts
+        # Tokens are the same strings in both, only containers differ.
+        tokens = sum(sys.getsizeof(v) for d in dicts for v in d.values())
+        del dicts, records
+        t_dicts = timeit.timeit(lambda: run(False), number=number) / number
+        t_records = timeit.timeit(lambda: run(True), number=number) / number
+        print(f"records ({label}) {name}: "
+              f"dicts {dicts_size / (1 << 20):.1f} MiB "
+              f"({(dicts_size - tokens) / (1 << 20):.1f} MiB containers) "
+              f"{t_dicts:.3f}s, "
+              f"records {records_size / (1 << 20):.1f} MiB "
+              f"({(records_size - tokens) / (1 << 20):.1f} MiB containers) "
+              f"{t_records:.3f}s")
+
+
+def bench_parallel(data, label, workers=4, number=3):
+    """Serial processing versus chunks processed by several workers."""
+    cpus = os.cpu_count() or 1
+    print(f"parallel ({label}): {cpus} CPUs, {workers} workers")
+    if cpus == 1:
+        # Workers would only take turns, and pay for it, on a single CPU.
+        print(f"parallel ({label}): skipped, needs more than one CPU")
+        return
+    s = String(data)
+    s.count()
+    key = lambda l: l.split()[-1]
+    cases = [
+        ("map_func", lambda w: s.map_func(key, workers=w)),
+        ("groupby_count", lambda w: s.groupby_count(key, workers=w)),
+    ]
+    for name, run in cases:
+        assert run(None) == run(workers)
+        t_serial = timeit.timeit(lambda: run(None), number=number) / number
+        t_par = timeit.timeit(lambda: run(workers), number=number) / number
+        print(f"parallel ({label}) {name}: serial {t_serial:.3f}s, "
+              f"{workers} workers {t_par:.3f}s, {t_serial / t_par:.1f}x")
+
+
+if __name__ == "__main__":
+    data = dig_output()
+    print(f"input: {len(data) / (1 << 20):.1f} MiB, "
+          f"{data.count(os.linesep)} lines")
+    bench_line_index(data)
+    bench_pipeline(data, "dig", "IN")
+    bench_pipeline(whois_output(), "whois", "^[a-z]")
+    bench_literal(data, "dig", ["IN", "cloudflare", "ANSWER SECTION"])
+    bench_records(data, "dig", "IN",
+                  keys=("name", "ttl", "class", "q_type", "priority", "host"))
+    bench_records(varying_pairs_output(), "varying keys")
+    bench_parallel(data * 4, "dig")
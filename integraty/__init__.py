@@ -1,5 +1,11 @@
+from . import aggregate
 from . import case
 from . import extprog
+from . import fingerprint
+from . import multipattern
+from . import parallel
 from . import productivity
+from . import schema
+from . import xbytes
 from . import xstring
 from . import utils
\ No newline at end of file
@@ -0,0 +1,565 @@
+# -*- coding: utf-8 -*-
+"""
+Grouping engine, which consumes rows one at a time, e.g. split lines of a
+`String`, and keeps only a little state per group, i.e. one value for each
+aggregation, never the rows themselves. Work and memory are therefore linear
+in the number of rows and distinct groups, and input may be streamed.
+
+Along with it are single-pass summaries of whole inputs, whose memory is
+bounded regardless of size of input: heavy hitters (`SpaceSaving`),
+distinct counts (`HyperLogLog`), samples for quantiles (`Reservoir`) and
+histograms (`Histogram`).
+"""
+
+import heapq
+import math
+import random
+
+from bisect import bisect_right
+from functools import partial
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Tuple, Union
+
+from integraty.schema import record_type
+
+
+def _identity(item):
+    return item
+
+
+def getter(spec) -> Callable[[Any], Any]:
+    """
+    Makes a function extracting a key or value from a row, where `spec` is
+    None for the whole row, a column index, a callable taking a row, or a
+    tuple of those for a tuple of values, i.e. a multi-key.
+
+    Args:
+        spec (int, Callable, tuple, None): What to extract.
+
+    Returns:
+        Callable[[Any], Any]: Function taking a row.
+    """
+    if spec is None:
+        return _identity
+    if callable(spec):
+        return spec
+    if isinstance(spec, int):
+        return itemgetter(spec)
+    specs = tuple(spec)
+    if all(isinstance(s, int) for s in specs):
+        # Even a single column makes a tuple, like more than one would.
+        return itemgetter(*specs) if len(specs) > 1 else lambda row: (
+            row[specs[0]], )
+    getters = tuple(getter(s) for s in specs)
+    return lambda row: tuple(g(row) for g in getters)
+
+
+class Aggregation:
+    """
+    Base of aggregations computed for each group. An aggregation takes a
+    value from each row, i.e. `column` of row, or the whole row if `column`
+    is None, converted with `type` if given, then folds values into a
+    single state per group.
+
+    Args:
+        column (int, Callable, optional): Value of row to aggregate. Defaults to None, whole row.
+        type (Callable, optional): Conversion applied to each value. Defaults to None.
+    """
+    __slots__ = ["column", "type", "value"]
+
+    def __init__(self, column=None, type: Callable[[Any], Any] = None):
+        self.column = column
+        self.type = type
+        get = getter(column)
+        self.value = get if type is None else lambda row: type(get(row))
+
+    def __repr__(self):
+        return "{}(column={!r}, type={})".format(
+            self.__class__.__name__, self.column,
+            getattr(self.type, "__name__", self.type))
+
+    def start(self, value):
+        """State of a group after its first value."""
+        return value
+
+    def step(self, state, value):
+        """State of a group after another value."""
+        raise NotImplementedError
+
+    def result(self, state):
+        """Final value of a group."""
+        return state
+
+
+class Count(Aggregation):
+    """Number of rows in group."""
+    __slots__ = []
+
+    def __init__(self):
+        super().__init__()
+        self.value = _identity
+
+    def start(self, value):
+        return 1
+
+    def step(self, state, value):
+        return state + 1
+
+
+class First(Aggregation):
+    """Value of first row in group."""
+    __slots__ = []
+
+    def step(self, state, value):
+        return state
+
+
+class Last(Aggregation):
+    """Value of last row in group."""
+    __slots__ = []
+
+    def step(self, state, value):
+        return value
+
+
+class Min(Aggregation):
+    """Smallest value in group. Give a `type` to compare numbers."""
+    __slots__ = []
+
+    def step(self, state, value):
+        return value if value < state else state
+
+
+class Max(Aggregation):
+    """Largest value in group. Give a `type` to compare numbers."""
+    __slots__ = []
+
+    def step(self, state, value):
+        return value if value > state else state
+
+
+class Sum(Aggregation):
+    """Sum of numeric `column` in group, converted with `type`."""
+    __slots__ = []
+
+    def __init__(self, column, type: Callable[[Any], Any] = float):
+        super().__init__(column, type)
+
+    def step(self, state, value):
+        return state + value
+
+
+class GroupBy:
+    """
+    Groups rows by `key` and computes `aggregations` for each group in a
+    single pass over rows, which may be fed in any number of batches, e.g.
+    from a command which is still running. A key may be a column index, a
+    callable taking a row, or a tuple of those, to group by more than one
+    value. Each group results in a `Record`, see `integraty.schema`, of
+    aggregation names and their values.
+    ```
+    >>> from integraty.aggregate import Count, GroupBy, Max, Sum
+    >>> rows = [r.split() for r in ['a.com A 300', 'b.com A 60', 'a.com MX 300', 'a.com A 30']]
+    >>> g = GroupBy((0, 1), {'n': Count(), 'ttl': Sum(2, int), 'max': Max(2, int)})
+    >>> g.update(rows).results()
+    {('a.com', 'A'): Group(n=2, ttl=330, max=300), ('b.com', 'A'): Group(n=1, ttl=60, max=60), ('a.com', 'MX'): Group(n=1, ttl=300, max=300)}
+
+    ```
+    Args:
+        key (int, Callable, tuple): Key of each row.
+        aggregations (Mapping[str, Aggregation], optional): Aggregations by name. Defaults to a `Count` named 'count'.
+    """
+
+    def __init__(self,
+                 key: Union[int, Callable, tuple],
+                 aggregations: Mapping[str, Aggregation] = None):
+        self.key = key
+        self.aggregations = dict(aggregations or {"count": Count()})
+        self.record = record_type(tuple(self.aggregations), "Group")
+        self._groups = {}
+
+    def __len__(self):
+        return len(self._groups)
+
+    def update(self, rows: Iterable) -> "GroupBy":
+        """
+        Adds rows to their groups.
+
+        Args:
+            rows (Iterable): Rows to group.
+
+        Returns:
+            GroupBy: This instance, so that calls can be chained.
+        """
+        key = getter(self.key)
+        groups = self._groups
+        aggs = tuple(self.aggregations.values())
+        starts = tuple((a.value, a.start) for a in aggs)
+        steps = tuple(enumerate((a.value, a.step) for a in aggs))
+        for row in rows:
+            k = key(row)
+            state = groups.get(k)
+            if state is None:
+                groups[k] = [start(value(row)) for value, start in starts]
+            else:
+                for i, (value, step) in steps:
+                    state[i] = step(state[i], value(row))
+        return self
+
+    def results(self, sort: Union[bool, Callable] = False,
+                reverse=False) -> Dict:
+        """
+        Results of all groups, in order in which groups were first seen,
+        unless sorted.
+
+        Args:
+            sort (bool, Callable, optional): Sort by key if True, or by result of calling it with key and record of each group. Defaults to False.
+            reverse (bool, optional): Sort in descending order. Defaults to False.
+
+        Returns:
+            dict: Mapping of group keys to records.
+        """
+        make = self.record
+        results = tuple(self.aggregations.values())
+        groups = {
+            k: make(agg.result(s) for agg, s in zip(results, state))
+            for k, state in self._groups.items()
+        }
+        if sort is True:
+            return dict(sorted(groups.items(), reverse=reverse))
+        if sort:
+            return dict(
+                sorted(groups.items(),
+                       key=lambda kv: sort(*kv),
+                       reverse=reverse))
+        return groups
+
+
+class SpaceSaving:
+    """
+    Approximate counts of most frequent values, i.e. heavy hitters, kept in
+    at most twice `capacity` counters, however many distinct values there
+    are. Once counters run out, all but `capacity` largest are dropped, and
+    a value seen afterwards starts from the largest count dropped so far,
+    `floor`. Counts are therefore never below true counts, and at most
+    `floor` above them, and any value more frequent than `floor` is kept.
+    ```
+    >>> from integraty.aggregate import SpaceSaving
+    >>> s = SpaceSaving(2).update('aaaaabbbbcdefgaab')
+    >>> s.most_common(2)
+    [('a', 7), ('b', 5)]
+    >>> s.floor
+    2
+
+    ```
+    Args:
+        capacity (int): Number of counters kept after pruning.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.floor = 0
+        self.counts = {}
+
+    def update(self, values: Iterable) -> "SpaceSaving":
+        """
+        Counts values.
+
+        Args:
+            values (Iterable): Hashable values to count.
+
+        Returns:
+            SpaceSaving: This instance, so that calls can be chained.
+        """
+        counts = self.counts
+        get = counts.get
+        limit = 2 * self.capacity
+        floor = self.floor
+        for value in values:
+            c = get(value)
+            if c is not None:
+                counts[value] = c + 1
+                continue
+            if len(counts) >= limit:
+                self._prune()
+                floor = self.floor
+            counts[value] = floor + 1
+        return self
+
+    def _prune(self):
+        items = sorted(self.counts.items(), key=itemgetter(1), reverse=True)
+        self.floor = max(self.floor, items[self.capacity][1])
+        # Cleared in place, since `update` may hold on to it.
+        self.counts.clear()
+        self.counts.update(items[:self.capacity])
+
+    def most_common(self, k: int = None) -> List[Tuple[Any, int]]:
+        """
+        Most frequent values and their counts, in descending order of
+        counts.
+
+        Args:
+            k (int, optional): Number of values. Defaults to None, all counted.
+
+        Returns:
+            List[Tuple[Any, int]]: Value and count pairs.
+        """
+        if k is None:
+            return sorted(self.counts.items(), key=itemgetter(1), reverse=True)
+        return heapq.nlargest(k, self.counts.items(), key=itemgetter(1))
+
+
+_MASK64 = (1 << 64) - 1
+
+
+class HyperLogLog:
+    """
+    Approximate count of distinct values, from `2 ** precision` registers of
+    one byte each, with a typical relative error of `1.04 / sqrt(2 **
+    precision)`, e.g. 0.8% with 16KiB of registers at the default precision
+    of 14. Values are hashed with `hash`, so that sketches of different
+    processes can only be merged where hashes of strings are not
+    randomized, see `PYTHONHASHSEED`.
+    ```
+    >>> from integraty.aggregate import HyperLogLog
+    >>> h = HyperLogLog().update(str(i % 50000) for i in range(200000))
+    >>> abs(h.count() - 50000) < 50000 * 0.03
+    True
+
+    ```
+    Args:
+        precision (int, optional): Number of bits selecting a register, from 4 to 18. Defaults to 14.
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def update(self, values: Iterable) -> "HyperLogLog":
+        """
+        Adds values to sketch.
+
+        Args:
+            values (Iterable): Hashable values.
+
+        Returns:
+            HyperLogLog: This instance, so that calls can be chained.
+        """
+        registers = self.registers
+        shift = 64 - self.precision
+        low = (1 << shift) - 1
+        mask = _MASK64
+        for value in values:
+            # Hashes of small integers are integers themselves, so hashes are
+            # mixed (splitmix64 finalizer) to spread them over all bits.
+            x = hash(value) & mask
+            x = ((x ^ (x >> 30)) * 0xbf58476d1ce4e5b9) & mask
+            x = ((x ^ (x >> 27)) * 0x94d049bb133111eb) & mask
+            x ^= x >> 31
+            i = x >> shift
+            rank = shift - (x & low).bit_length() + 1
+            if rank > registers[i]:
+                registers[i] = rank
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        Adds values counted by another sketch of the same precision.
+
+        Args:
+            other (HyperLogLog): Sketch to merge.
+
+        Returns:
+            HyperLogLog: This instance, so that calls can be chained.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / math.fsum(
+            2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+class Reservoir:
+    """
+    Uniform random sample of at most `size` values from a stream of unknown
+    length, e.g. to estimate quantiles of a large input in bounded memory.
+    After a sample is full, gaps between values which replace one of its
+    values are drawn directly (Algorithm L), so that random numbers are
+    only drawn for values which are kept.
+
+    Args:
+        size (int): Size of sample.
+        seed (optional): Seed of random number generator. Defaults to None.
+    """
+
+    def __init__(self, size: int, seed=None):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.sample = []
+        self.seen = 0
+        self._random = random.Random(seed)
+        self._w = 1.0
+        self._skip = 0
+
+    def _next_gap(self):
+        rand = self._random.random
+        self._w *= math.exp(math.log(1.0 - rand()) / self.size)
+        # 1 - random() is in (0, 1], so logarithms are defined.
+        if self._w >= 1.0:
+            return 0
+        return int(math.log(1.0 - rand()) / math.log1p(-self._w))
+
+    def update(self, values: Iterable) -> "Reservoir":
+        """
+        Samples values.
+
+        Args:
+            values (Iterable): Values to sample.
+
+        Returns:
+            Reservoir: This instance, so that calls can be chained.
+        """
+        sample, size = self.sample, self.size
+        values = iter(values)
+        for value in values:
+            self.seen += 1
+            sample.append(value)
+            if len(sample) == size:
+                self._skip = self._next_gap()
+                break
+        if len(sample) < size:
+            return self
+        skip = self._skip
+        randrange = self._random.randrange
+        for value in values:
+            self.seen += 1
+            if skip:
+                skip -= 1
+                continue
+            sample[randrange(size)] = value
+            skip = self._next_gap()
+        self._skip = skip
+        return self
+
+
+def quantiles(values: Sequence[float],
+              qs: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict[float, float]:
+    """
+    Quantiles of values, interpolated linearly between closest values, the
+    way `numpy.quantile` does by default.
+    ```
+    >>> from integraty.aggregate import quantiles
+    >>> quantiles([4, 1, 3, 2, 5], qs=(0, 0.5, 0.9, 1))
+    {0: 1, 0.5: 3, 0.9: 4.6, 1: 5}
+
+    ```
+    Args:
+        values (Sequence[float]): Values, in any order.
+        qs (Iterable[float], optional): Quantiles, each between 0 and 1. Defaults to (0.5, 0.9, 0.99).
+
+    Returns:
+        Dict[float, float]: Value of each quantile, or None of each without values.
+    """
+    ordered = sorted(values)
+    n = len(ordered)
+    result = {}
+    for q in qs:
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile {} is not between 0 and 1".format(q))
+        if not n:
+            result[q] = None
+            continue
+        pos = q * (n - 1)
+        i = int(pos)
+        frac = pos - i
+        if not frac:
+            result[q] = ordered[i]
+        else:
+            result[q] = ordered[i] + (ordered[i + 1] - ordered[i]) * frac
+    return result
+
+
+class Histogram:
+    """
+    Counts of values in buckets, which are either `bins` wide, if `bins` is a
+    number, or lie between consecutive edges, if it is a sequence of edges,
+    in which case values below the first and at or above the last edge fall
+    into open-ended buckets. Buckets include their lower edge, but not their
+    upper one.
+    ```
+    >>> from integraty.aggregate import Histogram
+    >>> Histogram(10).update([1, 5, 12, 37, 38]).results()
+    {(0, 10): 2, (10, 20): 1, (30, 40): 2}
+    >>> Histogram([10, 20]).update([1, 5, 12, 37, 38]).results()
+    {(-inf, 10): 2, (10, 20): 1, (20, inf): 2}
+
+    ```
+    Args:
+        bins (float, Sequence[float]): Width of buckets, or their edges.
+    """
+
+    def __init__(self, bins: Union[float, Sequence[float]]):
+        if isinstance(bins, (int, float)):
+            if bins <= 0:
+                raise ValueError("Width of buckets must be positive")
+            self.width, self.edges = bins, None
+        else:
+            self.width, self.edges = None, tuple(sorted(bins))
+            if not self.edges:
+                raise ValueError("At least one edge is required")
+        self.counts = {}
+
+    def update(self, values: Iterable[float]) -> "Histogram":
+        """
+        Counts values into buckets.
+
+        Args:
+            values (Iterable[float]): Numbers to count.
+
+        Returns:
+            Histogram: This instance, so that calls can be chained.
+        """
+        counts = self.counts
+        get = counts.get
+        if self.edges:
+            bucket = partial(bisect_right, self.edges)
+        else:
+            width = self.width
+            bucket = lambda v: math.floor(v / width)
+        for b in map(bucket, values):
+            counts[b] = get(b, 0) + 1
+        return self
+
+    def results(self) -> Dict[Tuple[float, float], int]:
+        """
+        Counts of buckets in ascending order of buckets. With edges, all
+        buckets between edges are included, otherwise only those which have
+        any values.
+
+        Returns:
+            Dict[Tuple[float, float], int]: Count of values of each bucket, by lower and upper edge.
+        """
+        if self.width:
+            w = self.width
+            return {(b * w, (b + 1) * w): self.counts[b]
+                    for b in sorted(self.counts)}
+        edges = (-math.inf, ) + self.edges + (math.inf, )
+        return {(edges[b], edges[b + 1]): self.counts.get(b, 0)
+                for b in range(len(edges) - 1)
+                if self.counts.get(b) or 0 < b < len(edges) - 2}
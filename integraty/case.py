@@ -10,11 +10,14 @@ import sys
 
 from collections import Counter
 from difflib import SequenceMatcher
+from typing import Iterable, List, Union
 from unittest import TestCase
 from unittest import main as run_integra_tests
 
 from integraty.extprog import ExternalProgram
+from integraty.multipattern import MultiPattern
 from integraty.productivity import ChecksumFile
+from integraty.utils import compile_pattern, popcount
 
 
 def is_equal(num1: float, num2: float, ε: float = 0.0000001) -> bool:
@@ -31,64 +34,383 @@ class InvalidStream(Exception):
     pass
 
 
+WORD_RE = compile_pattern(r"\w+")
+
+
+class TokenVector:
+    """
+    Counts of words of a text, with their Euclidean norm computed once, so
+    that a text compared with many others is tokenized only once, rather
+    than for every comparison.
+    ```
+    >>> from integraty.case import TokenVector
+    >>> v = TokenVector.from_text("alpha beta beta")
+    >>> v.norm == 5 ** 0.5, round(v.cosine(TokenVector.from_text("beta")), 4)
+    (True, 0.8944)
+
+    ```
+    Args:
+        counts (dict): Count of each word.
+    """
+    __slots__ = ["counts", "norm"]
+
+    def __init__(self, counts: dict):
+        self.counts = counts
+        self.norm = math.sqrt(sum(n * n for n in counts.values()))
+
+    @classmethod
+    def from_text(cls, text: str) -> "TokenVector":
+        """
+        Makes vector of words of `text`.
+
+        Args:
+            text (str): Text to tokenize.
+
+        Returns:
+            TokenVector: Vector of counts of words.
+        """
+        return cls(Similarity._text2vec(text))
+
+    def cosine(self, other: "TokenVector") -> float:
+        """
+        Cosine similarity of both vectors.
+
+        Args:
+            other (TokenVector): Vector to compare with.
+
+        Returns:
+            float: Similarity between 0 and 1.
+        """
+        denom = self.norm * other.norm
+        if not denom:
+            return 0.0
+        small, large = self.counts, other.counts
+        if len(small) > len(large):
+            small, large = large, small
+        get = large.get
+        return sum(n * get(w, 0) for w, n in small.items()) / denom
+
+
+def _as_vector(text):
+    if isinstance(text, TokenVector):
+        return text
+    return TokenVector.from_text(text)
+
+
+def similarity_many(reference: Union[str, TokenVector],
+                    candidates: Iterable[Union[str, TokenVector]]
+                    ) -> List[float]:
+    """
+    Cosine similarity of `reference` to each of `candidates`, tokenizing
+    `reference` once, instead of once per candidate. Texts are given as
+    strings, or as vectors of their words, which are then reused as they
+    are.
+    ```
+    >>> from integraty.case import similarity_many
+    >>> [round(r, 4) for r in similarity_many("alpha beta", ["alpha", "gamma", "beta alpha"])]
+    [0.7071, 0.0, 1.0]
+
+    ```
+    Args:
+        reference (Union[str, TokenVector]): Text compared with all candidates.
+        candidates (Iterable[Union[str, TokenVector]]): Texts to compare.
+
+    Returns:
+        List[float]: Similarity of each candidate, in order.
+    """
+    cosine = _as_vector(reference).cosine
+    return [cosine(_as_vector(c)) for c in candidates]
+
+
+# Units compared by `Similarity`: characters, non-blank lines stripped of
+# surrounding whitespace, or whitespace-separated tokens.
+SIMILARITY_UNITS = ("char", "line", "token")
+
+# Differences are found by a shortest edit script, as long as it is not
+# longer than this; more different sequences are compared by difflib, which
+# is faster then, though it may report more differences than there are.
+# Finding a script of D edits takes time and memory in proportion to D * D.
+DIFF_MAX_EDITS = 1000
+
+
 class Similarity:
 
-    def __init__(self, str1, str2):
+    def __init__(self, str1, str2, unit="char"):
+        if unit not in SIMILARITY_UNITS:
+            raise ValueError(f"Unit must be one of {SIMILARITY_UNITS}")
         self.str1 = str1
         self.str2 = str2
+        self.unit = unit
+        self._units = None
+        self._codes = None
+        self._vectors = None
 
     @staticmethod
-    def _cosine(vec1, vec2):
-        intersection = set(vec1.keys()) & set(vec2.keys())
-        numerator = sum(vec1[x] * vec2[x] for x in intersection)
-        sum1 = sum(vec1[x]**2 for x in vec1.keys())
-        sum2 = sum(vec2[x]**2 for x in vec2.keys())
-        denom = math.sqrt(sum1) * math.sqrt(sum2)
+    def _split(text, unit):
+        if unit == "line":
+            return [l for l in map(str.strip, text.splitlines()) if l]
+        if unit == "token":
+            return text.split()
+        return text
+
+    def units(self):
+        """
+        Both strings as sequences of units compared, i.e. characters, lines
+        or tokens.
+
+        Returns:
+            tuple: Sequence of units of each string.
+        """
+        if self._units is None:
+            self._units = (self._split(self.str1, self.unit),
+                           self._split(self.str2, self.unit))
+        return self._units
+
+    def _encoded(self):
+        # Lines and tokens are compared as integers, one per distinct unit,
+        # so that they are hashed only once, instead of on every comparison.
+        if self.unit == "char":
+            return self.units()
+        if self._codes is None:
+            codes = {}
+            self._codes = tuple([codes.setdefault(u, len(codes)) for u in seq]
+                                for seq in self.units())
+        return self._codes
 
-        return float(numerator) / denom if denom else 0.0
+    @staticmethod
+    def _cosine(vec1, vec2):
+        return TokenVector(vec1).cosine(TokenVector(vec2))
 
     @staticmethod
-    def _text2vec(text):
-        word = re.compile(r'\w+')
-        words = word.findall(text)
+    def _text2vec(text, shingle=1):
+        words = WORD_RE.findall(text)
+        if shingle > 1 and len(words) > 1:
+            # Runs of words, which unlike single words, reflect their order,
+            # though no longer than all words of text.
+            shingle = min(shingle, len(words))
+            words = map(" ".join,
+                        zip(*(words[i:] for i in range(shingle))))
         return Counter(words)
 
     @staticmethod
-    def _levenshtein_distance(str1, str2):
+    def _lcs_length(seq1, seq2, at_least=0):
+        # Length of the longest common subsequence, computed bit-parallel
+        # (Hyyrö, 2004): a whole column of the DP matrix is held as bits of
+        # one integer, with a bit per element of the longer sequence, so each
+        # element of the shorter one costs a few operations on integers,
+        # instead of a loop over the longer one. Once the length cannot
+        # reach `at_least` anymore, an upper bound of it is returned early.
+        if len(seq1) < len(seq2):
+            seq1, seq2 = seq2, seq1
+        m = len(seq1)
+        if not seq2:
+            return 0
+        bits = {}
+        for i, x in enumerate(seq1):
+            if x not in bits:
+                bits[x] = bytearray((m + 7) // 8)
+            bits[x][i >> 3] |= 1 << (i & 7)
+        masks = {x: int.from_bytes(b, "little") for x, b in bits.items()}
+        get = masks.get
+        ones = (1 << m) - 1
+        v = ones  # Zero bits mark where a common subsequence grows.
+        left = len(seq2)
+        for x in seq2:
+            u = v & get(x, 0)
+            v = ((v + u) | (v - u)) & ones
+            if at_least:
+                left -= 1
+                bound = m - popcount(v) + left
+                if bound < at_least:
+                    return bound
+        return m - popcount(v)
+
+    @staticmethod
+    def _levenshtein_distance(str1, str2, max_distance=None):
+        # Substitutions cost 2, i.e. as much as a deletion and an insertion,
+        # so distance is `m + n - 2 * LCS`, where LCS is the length of their
+        # longest common subsequence. Given `max_distance`, computation stops
+        # as soon as distance is known to exceed it, and a lower bound of
+        # distance, greater than `max_distance`, is returned.
         m = len(str1)
         n = len(str2)
         lensum = float(m + n)
-        d = []
-        for i in range(m + 1):
-            d.append([i])
-        del d[0][0]
-        for j in range(n + 1):
-            d[0].append(j)
-        for j in range(1, n + 1):
-            for i in range(1, m + 1):
-                if str1[i - 1] == str2[j - 1]:
-                    d[i].insert(j, d[i - 1][j - 1])
-                else:
-                    minimum = min(d[i - 1][j] + 1, d[i][j - 1] + 1,
-                                  d[i - 1][j - 1] + 2)
-                    d[i].insert(j, minimum)
-        ldist = d[-1][-1]
+        if not lensum:
+            return 0, 1.0
+        # Common prefix and suffix are part of every longest subsequence.
+        prefix = 0
+        limit = min(m, n)
+        while prefix < limit and str1[prefix] == str2[prefix]:
+            prefix += 1
+        suffix = 0
+        limit -= prefix
+        while suffix < limit and str1[m - 1 - suffix] == str2[n - 1 - suffix]:
+            suffix += 1
+        at_least = 0
+        if max_distance is not None:
+            at_least = max(-(-(m + n - max_distance) // 2) - prefix - suffix,
+                           0)
+        lcs = prefix + suffix + Similarity._lcs_length(
+            str1[prefix:m - suffix], str2[prefix:n - suffix], at_least)
+        ldist = m + n - 2 * lcs
         ratio = (lensum - ldist) / lensum
         return ldist, ratio
 
     def consine_distance(self):
-        vec1 = self._text2vec(self.str1)
-        vec2 = self._text2vec(self.str2)
-        return self._cosine(vec1, vec2)
+        if self._vectors is None:
+            self._vectors = (TokenVector.from_text(self.str1),
+                             TokenVector.from_text(self.str2))
+        vec1, vec2 = self._vectors
+        return vec1.cosine(vec2)
 
-    def levenshtein_distance(self):
-        return self._levenshtein_distance(self.str1, self.str2)
+    def levenshtein_distance(self, max_distance=None):
+        return self._levenshtein_distance(*self._encoded(), max_distance)
 
     @property
     def levenshtein_dist_ratio(self):
-        _, ratio = self._levenshtein_distance(self.str1, self.str2)
+        _, ratio = self._levenshtein_distance(*self._encoded())
         return ratio
 
+    def difflib_ratio(self, quick=True):
+        """
+        Similarity of units of both strings, measured by
+        `difflib.SequenceMatcher`.
+
+        Args:
+            quick (bool, optional): Use upper bound of ratio, which ignores order of units. Defaults to True.
+
+        Returns:
+            float: Ratio of units in common; between 0 and 1.
+        """
+        # Lines and tokens repeat far more than characters, and would be
+        # mostly ignored as junk, which only makes sense for characters.
+        matcher = SequenceMatcher(None,
+                                  *self._encoded(),
+                                  autojunk=self.unit == "char")
+        return matcher.quick_ratio() if quick else matcher.ratio()
+
+    @staticmethod
+    def _opcodes(seq1, seq2):
+        # Opcodes like those of `SequenceMatcher`, from a shortest edit
+        # script found by Myers' O(ND) algorithm, which takes time in
+        # proportion to number of differences, and unlike difflib, is not
+        # misled by repeated lines into reporting more of them than there are.
+        n, m = len(seq1), len(seq2)
+        # Length of a shortest edit script follows from the LCS, which is
+        # much cheaper to find than the script itself.
+        edits, _ = Similarity._levenshtein_distance(seq1, seq2,
+                                                    DIFF_MAX_EDITS)
+        if edits > DIFF_MAX_EDITS:
+            matcher = SequenceMatcher(None, seq1, seq2, autojunk=False)
+            return matcher.get_opcodes()
+        v = {1: 0}
+        # Only the frontier reached in each round is kept, i.e. furthest x
+        # of diagonals -d + 1 to d - 1 before round d.
+        trace = []
+        done = False
+        for d in range(edits + 1):
+            trace.append([v[k] for k in range(-d + 1, d, 2)])
+            for k in range(-d, d + 1, 2):
+                if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                    x = v[k + 1]
+                else:
+                    x = v[k - 1] + 1
+                y = x - k
+                while x < n and y < m and seq1[x] == seq2[y]:
+                    x += 1
+                    y += 1
+                v[k] = x
+                if x >= n and y >= m:
+                    done = True
+                    break
+            if done:
+                break
+        # Walks back from the end, through edits of each round.
+        moves = []
+        x, y = n, m
+        for d in range(len(trace) - 1, -1, -1):
+            frontier = trace[d]
+            k = x - y
+            # Diagonal k - 1 is at index (k + d) // 2 - 1, k + 1 at the next.
+            i = (k + d) // 2
+            if k == -d or (k != d and frontier[i - 1] < frontier[i]):
+                prev_k = k + 1
+            else:
+                prev_k = k - 1
+            prev_x = frontier[(prev_k + d - 1) // 2] if d else 0
+            prev_y = prev_x - prev_k if d else 0
+            while x > prev_x and y > prev_y:
+                x -= 1
+                y -= 1
+                moves.append(("equal", x, y))
+            if d:
+                moves.append(("insert" if x == prev_x else "delete", prev_x,
+                              prev_y))
+            x, y = prev_x, prev_y
+        opcodes = []
+        i = j = 0
+        for tag, x, y in reversed(moves):
+            if tag == "equal":
+                if opcodes and opcodes[-1][0] == "equal":
+                    opcodes[-1][2] += 1
+                    opcodes[-1][4] += 1
+                else:
+                    opcodes.append(["equal", x, x + 1, y, y + 1])
+                continue
+            if not opcodes or opcodes[-1][0] == "equal":
+                opcodes.append([tag, x, x, y, y])
+            last = opcodes[-1]
+            if tag == "delete":
+                last[2] += 1
+            else:
+                last[4] += 1
+            if last[1] != last[2] and last[3] != last[4]:
+                last[0] = "replace"
+        return [tuple(op) for op in opcodes]
+
+    def differences(self):
+        """
+        Runs of units which differ between both strings, e.g. lines of
+        `str1` replaced by other lines in `str2`, in order.
+        ```
+        >>> from integraty.case import Similarity
+        >>> sim = Similarity("a\\nb\\nc\\nd", "a\\nB\\nc\\nd\\ne", unit="line")
+        >>> sim.differences()
+        [('replace', ['b'], ['B']), ('insert', [], ['e'])]
+
+        ```
+        Returns:
+            List[Tuple[str, list, list]]: Kind of change, i.e. 'replace', 'delete' or 'insert', with units of `str1` and of `str2` it concerns.
+        """
+        units1, units2 = self.units()
+        return [(tag, units1[i1:i2], units2[j1:j2])
+                for tag, i1, i2, j1, j2 in self._opcodes(*self._encoded())
+                if tag != "equal"]
+
+    def describe_differences(self, limit=10):
+        """
+        Differences of both strings in a readable form, with units only in
+        `str1` prefixed by '-', and units only in `str2` prefixed by '+'.
+
+        Args:
+            limit (int, optional): Most differences to describe. Defaults to 10.
+
+        Returns:
+            str: One unit per line.
+        """
+        diffs = self.differences()
+        lines = []
+        for _, units1, units2 in diffs[:limit]:
+            if self.unit == "char":
+                # Characters are substrings, which are shown whole.
+                units1 = [units1] if units1 else []
+                units2 = [units2] if units2 else []
+            lines.extend(f"- {u}" for u in units1)
+            lines.extend(f"+ {u}" for u in units2)
+        if len(diffs) > limit:
+            lines.append(f"... and {len(diffs) - limit} more differences")
+        return "\n".join(lines)
+
 
 class IntegraTestCase(TestCase):
 
@@ -178,7 +500,7 @@ class IntegraTestCase(TestCase):
                               "Parameter 'substr' is not a string")
 
         if extprog:
-            if not re.search(substr, extprog.out):
+            if not compile_pattern(substr).search(extprog.out):
                 msg = self._formatMessage(
                     msg,
                     f"Output from command '{extprog.cmd}' does not contain '{substr}'",
@@ -196,7 +518,7 @@ class IntegraTestCase(TestCase):
                               "Parameter 'substr' is not a string")
 
         if extprog:
-            if not re.search(substr, extprog.err):
+            if not compile_pattern(substr).search(extprog.err):
                 msg = self._formatMessage(
                     msg,
                     f"Output from command '{extprog.cmd}' does not contain '{substr}'",
@@ -205,6 +527,37 @@ class IntegraTestCase(TestCase):
         else:
             raise NoCommandException("ExternalProgram cannot be None")
 
+    def assertStdOutContainsAll(self,
+                                extprog: ExternalProgram = None,
+                                substrs=None,
+                                msg=None):
+        """Assert that stdout from command contains all given substrings,
+        searching output once for all of them"""
+        self._assertContainsAll(extprog, "out", substrs, msg)
+
+    def assertStdErrContainsAll(self,
+                                extprog: ExternalProgram = None,
+                                substrs=None,
+                                msg=None):
+        """Assert that stderr from command contains all given substrings,
+        searching output once for all of them"""
+        self._assertContainsAll(extprog, "err", substrs, msg)
+
+    def _assertContainsAll(self, extprog, stream, substrs, msg):
+        if not extprog:
+            raise NoCommandException("ExternalProgram cannot be None")
+        if isinstance(substrs, str) or not substrs:
+            raise TypeError("Parameter 'substrs' is not a list of strings")
+        found = MultiPattern.from_patterns(substrs).search(
+            getattr(extprog, stream))
+        missing = [s for s in substrs if s not in found]
+        if missing:
+            msg = self._formatMessage(
+                msg,
+                f"Output from command '{extprog.cmd}' does not contain {missing}",
+            )
+            raise self.failureException(msg)
+
     def assertStdoutIsJSONArray(self,
                                 extprog: ExternalProgram = None,
                                 msg=None):
@@ -235,37 +588,66 @@ class IntegraTestCase(TestCase):
                                  str2,
                                  ratio: float = 0.8,
                                  max_distance: int = None,
+                                 unit: str = "char",
                                  msg=None):
-        """Assert that two strings are similar enough; by default 80% in common using Levenshtein Distance"""
-        sim = Similarity(str1, str2)
-        actual_distance, actual_ratio = sim.levenshtein_distance()
+        """Assert that two strings are similar enough; by default 80% in common using Levenshtein Distance, of characters, lines or tokens"""
+        sim = Similarity(str1, str2, unit)
+        actual_distance, actual_ratio = sim.levenshtein_distance(
+            max_distance or None)
         if max_distance and actual_distance > max_distance:
+            first, second = self._compared(sim)
             msg = self._formatMessage(
                 msg,
-                f"Expected distance between '{str1}' and '{str2}', to be less than {max_distance}, instead distance is {actual_distance}",
-            )
+                self._similarityMessage(
+                    sim,
+                    f"Expected distance between {first} and {second}, to be less than {max_distance}, instead distance is at least {actual_distance}",
+                ))
             raise self.failureException(msg)
         if is_equal(actual_ratio, ratio) or actual_ratio > ratio:
             return
+        first, second = self._compared(sim)
         msg = self._formatMessage(
             msg,
-            f"Expected '{str1}' to be at least {100*ratio:.4f}% similar to '{str2}', instead similarity is only {100*actual_ratio:.4f}%",
-        )
+            self._similarityMessage(
+                sim,
+                f"Expected {first} to be at least {100*ratio:.4f}% similar to {second}, instead similarity is only {100*actual_ratio:.4f}%",
+            ))
         raise self.failureException(msg)
 
+    @staticmethod
+    def _compared(sim):
+        # Outputs compared by lines or tokens are usually large, so only
+        # their size is mentioned, along with what differs between them,
+        # rather than leaving it to be found by eye.
+        if sim.unit == "char":
+            return f"'{sim.str1}'", f"'{sim.str2}'"
+        return tuple(f"{len(units)} {sim.unit}s" for units in sim.units())
+
+    @staticmethod
+    def _similarityMessage(sim, message):
+        if sim.unit == "char":
+            return message
+        return (f"{message}; {sim.unit}s which differ:\n"
+                f"{sim.describe_differences()}")
+
     def assertStringsAlmostEqualDiffLib(self,
                                  str1,
                                  str2,
                                  ratio: float = 0.8,
+                                 unit: str = "char",
                                  msg=None):
-        """Assert that two strings are similar enough; by default 80% in common using Difflib SequenceMatcher"""
-        actual_ratio = SequenceMatcher(None, str1, str2).quick_ratio()
+        """Assert that two strings are similar enough; by default 80% in common using Difflib SequenceMatcher, of characters, lines or tokens"""
+        sim = Similarity(str1, str2, unit)
+        actual_ratio = sim.difflib_ratio()
         if is_equal(actual_ratio, ratio) or actual_ratio > ratio:
             return
+        first, second = self._compared(sim)
         msg = self._formatMessage(
             msg,
-            f"Expected '{str1}' to be at least {100*ratio:.4f}% similar to '{str2}', instead similarity is only {100*actual_ratio:.4f}%",
-        )
+            self._similarityMessage(
+                sim,
+                f"Expected {first} to be at least {100*ratio:.4f}% similar to {second}, instead similarity is only {100*actual_ratio:.4f}%",
+            ))
         raise self.failureException(msg)
 
     def assertStringsAlmostEqualCosine(self,
@@ -375,6 +757,26 @@ class IntegraTestCase(TestCase):
             )
             raise self.failureException(msg)
 
+    def assertFileChecksumsEqual(self, path, checksums: dict, msg=None):
+        """Assert that checksums of any algorithms, e.g. {'sha256': ..., 'md5': ...}, are correct, reading file only once."""
+        if not isinstance(checksums, dict) or not checksums:
+            raise TypeError(
+                "Parameter 'checksums' is not a dict of checksums by algorithm")
+        actual = ChecksumFile(path).digests(*checksums)
+        failed = {
+            name: (checksum, actual[name])
+            for name, checksum in checksums.items()
+            if actual[name] != checksum.lower()
+        }
+        if failed:
+            msg = self._formatMessage(
+                msg,
+                "; ".join(
+                    f"{name.upper()} validation for '{path}' failed, want {want}; got {got}"
+                    for name, (want, got) in failed.items()),
+            )
+            raise self.failureException(msg)
+
     def assertFileMD5Equals(self, path, checksum: str, msg=None):
         """Assert that MD5 checksum is correct."""
         actual = ChecksumFile(path).md5
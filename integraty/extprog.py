@@ -1,20 +1,28 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import codecs
 import itertools
 import json
 import os
 import re
+import selectors
 import subprocess
 import shlex
 import signal
 import sys
 import locale
 import errno
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import reduce
-from typing import Callable, Dict, List, TypeVar, Sequence, Sequence
+from typing import Callable, Dict, Iterator, List, TypeVar, Sequence, Sequence
 
-from integraty.xstring import String
+from integraty.utils import compile_pattern, splitter
+from integraty.xbytes import Bytes
+from integraty.xstring import LINE_BREAKS, String, filter_lines
 
 from pexpect.popen_spawn import PopenSpawn
 import pexpect
@@ -28,10 +36,237 @@ except NameError:
     STR_TYPES = (str, )
 
 
+# Number of bytes read from a pipe at a time when streaming output.
+CHUNK_SIZE = 1 << 16
+
+# Seconds a timed out command is given to exit after SIGTERM, before its
+# whole process group is sent SIGKILL.
+KILL_GRACE = 2.0
+
+
 class ExternalProgramException(Exception):
     pass
 
 
+def signal_group(pgid, sig):
+    """
+    Sends signal to every process in process group `pgid`, or only to process
+    `pgid` where process groups are not supported. Signal 0 checks whether
+    any process in the group still exists.
+
+    Args:
+        pgid (int): Process group ID, same as PID of the group leader.
+        sig (int): Signal to send.
+
+    Returns:
+        bool: True if signal was delivered, False if group no longer exists.
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(pgid, sig)
+        else:
+            os.kill(pgid, sig)
+    except OSError as err:
+        # EPERM is what some platforms return for a group of zombies.
+        if err.errno in (errno.ESRCH, errno.EPERM):
+            return False
+        raise err
+    return True
+
+
+def _in_foreground() -> bool:
+    """
+    Does this process run in the foreground process group of a terminal?
+    Commands it starts then have to stay in its process group, since only
+    that group may read the terminal, and gets signals typed on it, like
+    SIGINT from Ctrl-C.
+    """
+    try:
+        fd = os.open("/dev/tty", os.O_RDONLY | getattr(os, "O_NOCTTY", 0))
+    except OSError:
+        return False  # No controlling terminal.
+    try:
+        return os.tcgetpgrp(fd) == os.getpgrp()
+    except (AttributeError, OSError):
+        return False
+    finally:
+        os.close(fd)
+
+
+def _process_group_kwargs(preexec=False) -> dict:
+    """
+    Arguments of `subprocess.Popen` which start a command in a process group
+    of its own, so that everything it starts can be signaled at once, while
+    it stays in the session of its caller. Commands started from the
+    foreground of a terminal stay in the process group of their caller
+    instead, see `_in_foreground`, so that they can still read the terminal,
+    and are interrupted along with their caller by Ctrl-C.
+
+    Args:
+        preexec (bool, optional): Use `preexec_fn`, for callers which accept no other way, e.g. pexpect. Defaults to False.
+
+    Returns:
+        dict: Keyword arguments; empty where command stays in the process group of its caller.
+    """
+    if _in_foreground():
+        return {}
+    if not preexec and sys.version_info >= (3, 11):
+        return {"process_group": 0}
+    if hasattr(os, "setpgrp"):
+        return {"preexec_fn": os.setpgrp}
+    return {}
+
+
+def _wrap_output(data):
+    # Output of commands run with `binary` stays bytes, and is only decoded
+    # where something is extracted from it.
+    if isinstance(data, (String, Bytes)):
+        return data
+    if isinstance(data, (bytes, bytearray)):
+        return Bytes(data)
+    return String(data)
+
+
+def _read_raw(stream):
+    # Rest of output of a pipe, as bytes, read from beneath its text layer.
+    return getattr(stream, "buffer", stream).read()
+
+
+def _decode_output(stream, data):
+    # Decodes raw output read from a pipe the way Popen does in text mode,
+    # i.e. by encoding of the pipe, with universal newlines; output of pipes
+    # opened in binary mode stays bytes.
+    encoding = getattr(stream, "encoding", None)
+    if encoding is None:
+        return data
+    text = data.decode(encoding, stream.errors)
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _exit_code(status):
+    # Return code of a child, from its status as reported by os.wait*, the
+    # way subprocess reports it, i.e. negated signal number if killed.
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    if os.WIFEXITED(status):
+        return os.WEXITSTATUS(status)
+    return status
+
+
+class _Popen(subprocess.Popen):
+    """
+    Popen which reaps its child with `os.wait4`, where there is one, keeping
+    resource usage of the child in `rusage`, and the time child was reaped in
+    `reaped_at`. Child is reaped in `poll` and `wait` before Popen itself
+    gets to it, which then returns `returncode` set here.
+    """
+    rusage = None
+    reaped_at = None
+
+    def _reap(self, options):
+        # Reaps child if it is done, returning whether it was. Holds the lock
+        # Popen holds while reaping, so that threads which poll or wait at
+        # the same time do not race to reap the child. If another thread
+        # holds it, that one is waiting already, and child is left to it.
+        lock = self._waitpid_lock
+        if not lock.acquire(not options & os.WNOHANG):
+            return False
+        try:
+            if self.returncode is not None:
+                return True
+            pid, status, rusage = os.wait4(self.pid, options)
+        except ChildProcessError:
+            # Child was already reaped elsewhere, which has its status.
+            return True
+        finally:
+            lock.release()
+        if pid != self.pid:
+            return False
+        self.rusage = rusage
+        self.reaped_at = time.monotonic()
+        self.returncode = _exit_code(status)
+        return True
+
+    if hasattr(os, "wait4"):
+
+        def poll(self):
+            if self.returncode is None:
+                self._reap(os.WNOHANG)
+            return super(_Popen, self).poll()
+
+        def wait(self, timeout=None):
+            if self.returncode is None:
+                if timeout is None:
+                    self._reap(0)
+                else:
+                    # Polls like Popen does, as waiting has no timeout.
+                    deadline = time.monotonic() + timeout
+                    delay = 0.0005
+                    while not self._reap(os.WNOHANG):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise subprocess.TimeoutExpired(self.args, timeout)
+                        time.sleep(min(delay, remaining, 0.05))
+                        delay *= 2
+            return super(_Popen, self).wait(timeout)
+
+
+class Stats:
+    """
+    Resource usage of a finished command. CPU times and maximum resident set
+    size are what the kernel accounted to the command's process, including
+    its own children it waited for, and are None where `os.wait4` is not
+    available to collect them, or command was run with pexpect. On Linux,
+    maximum resident set size of a command which uses little memory may be
+    that of the interpreter it was forked from. Sizes of output are None for
+    streams which were not read, like stdout of every stage but the last in
+    a pipeline. Sizes are numbers of bytes command wrote, counted before
+    they were decoded.
+    """
+    __slots__ = [
+        "wall_time", "user_time", "sys_time", "max_rss", "stdout_bytes",
+        "stderr_bytes"
+    ]
+
+    def __init__(self,
+                 wall_time,
+                 user_time=None,
+                 sys_time=None,
+                 max_rss=None,
+                 stdout_bytes=None,
+                 stderr_bytes=None):
+        self.wall_time = wall_time
+        self.user_time = user_time
+        self.sys_time = sys_time
+        self.max_rss = max_rss
+        self.stdout_bytes = stdout_bytes
+        self.stderr_bytes = stderr_bytes
+
+    def __repr__(self):
+        return "Stats({})".format(", ".join(
+            "{}={!r}".format(k, getattr(self, k)) for k in self.__slots__))
+
+    @classmethod
+    def from_rusage(cls, wall_time, rusage, **kwargs):
+        """Builds Stats from `resource.struct_rusage` of a process."""
+        if rusage is None:
+            return cls(wall_time, **kwargs)
+        # ru_maxrss is in kilobytes, except on macOS where it is in bytes.
+        scale = 1 if sys.platform == "darwin" else 1024
+        return cls(wall_time,
+                   user_time=rusage.ru_utime,
+                   sys_time=rusage.ru_stime,
+                   max_rss=rusage.ru_maxrss * scale,
+                   **kwargs)
+
+    @property
+    def cpu_time(self):
+        """Total of user and system CPU time, if known."""
+        if self.user_time is None:
+            return None
+        return self.user_time + self.sys_time
+
+
 def pid_exists(pid):
     """Check whether pid exists in the current process table."""
     if pid == 0:
@@ -60,6 +295,42 @@ def pid_exists(pid):
         return True
 
 
+class LineBuffer:
+    """
+    Reassembles complete lines from chunks of bytes read from a pipe, holding
+    on to at most one incomplete line between chunks. Lines are treated the
+    same way `String` treats them, i.e. entirely empty lines are dropped and
+    remaining lines are stripped of leading and trailing whitespace.
+    """
+    __slots__ = ["_decoder", "_pending"]
+
+    def __init__(self, encoding=None):
+        if not encoding:
+            encoding = locale.getpreferredencoding(False)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._pending = ""
+
+    def feed(self, data: bytes, final=False) -> List[str]:
+        """
+        Decodes another chunk of data, returning lines completed by it. With
+        `final` set, whatever remains buffered is returned as the last line.
+
+        Args:
+            data (bytes): Chunk of data read from a pipe.
+            final (bool, optional): No more data will follow. Defaults to False.
+
+        Returns:
+            list: List of complete lines.
+        """
+        text = self._pending + self._decoder.decode(data, final)
+        lines = text.splitlines(True)
+        if lines and not final and lines[-1][-1] not in LINE_BREAKS:
+            self._pending = lines.pop()
+        else:
+            self._pending = ""
+        return [l.strip() for l in lines if l.rstrip(LINE_BREAKS)]
+
+
 class ExternalProgram(object):
     """
     ExternalProgram is an abstraction over the subprocess module with
@@ -102,6 +373,13 @@ class ExternalProgram(object):
         self.subprocess = None
         self.blocking = None
         self.was_run = False
+        self.stages = []
+        self.started_at = None
+        self.timed_out = False
+        self.phases = {}
+        self._own_group = False
+        self._out_bytes = None
+        self._err_bytes = None
         self.__out = None
         self.__err = None
 
@@ -148,6 +426,20 @@ class ExternalProgram(object):
             "timeout": self.timeout,
         }
 
+    @property
+    def _proc(self):
+        # Popen object underlying either subprocess or pexpect.
+        if self._uses_pexpect:
+            return self.subprocess.proc
+        return self.subprocess
+
+    @property
+    def _remaining(self):
+        # Time left until timeout, counting from start of command.
+        if not self.timeout:
+            return None
+        return max(0, self.started_at + self.timeout - time.monotonic())
+
     @property
     def _uses_subprocess(self):
         return isinstance(self.subprocess, subprocess.Popen)
@@ -183,17 +475,20 @@ class ExternalProgram(object):
     @property
     def out(self):
         """Std/out output (cached)"""
-        if self.__out:
-            return String(self.__out)
-
-        if self._uses_subprocess:
-            if not self.std_out.closed:
-                self.__out = self.std_out.read()
-                self.std_out.close()
-        else:
-            self.__out = self._pexpect_out
+        if not self.__out:
+            if self._uses_subprocess:
+                if not self.std_out.closed:
+                    data = _read_raw(self.std_out)
+                    self.__out = _decode_output(self.std_out, data)
+                    self._out_bytes = len(data)
+                    self.std_out.close()
+            else:
+                self.__out = self._pexpect_out
 
-        return String(self.__out)
+        # Keep the same String around, so that its line index is built once
+        # no matter how many times output is accessed.
+        self.__out = _wrap_output(self.__out)
+        return self.__out
 
     @property
     def std_err(self):
@@ -202,17 +497,18 @@ class ExternalProgram(object):
     @property
     def err(self):
         """Std/err output (cached)"""
-        if self.__err:
-            return String(self.__err)
-
-        if self._uses_subprocess:
-            if not self.std_err.closed:
-                self.__err = self.std_err.read()
-                self.std_err.close()
-        else:
-            self.__err = self._pexpect_out
+        if not self.__err:
+            if self._uses_subprocess:
+                if not self.std_err.closed:
+                    data = _read_raw(self.std_err)
+                    self.__err = _decode_output(self.std_err, data)
+                    self._err_bytes = len(data)
+                    self.std_err.close()
+            else:
+                self.__err = self._pexpect_out
 
-        return String(self.__err)
+        self.__err = _wrap_output(self.__err)
+        return self.__err
 
     @property
     def pid(self):
@@ -236,11 +532,46 @@ class ExternalProgram(object):
         # Standard subprocess method.
         return self.subprocess.returncode
 
+    @property
+    def return_codes(self):
+        """
+        Return codes of all stages of a pipeline, in pipeline order, or only
+        of this command if it did not run as the last stage of a pipeline.
+        """
+        if self.stages:
+            return [stage.return_code for stage in self.stages]
+        return [self.return_code]
+
+    @property
+    def stats(self):
+        """
+        Resource usage of the command, see `Stats`, or None if the command
+        is not yet complete. Wall time is measured from the start of the
+        command until it was reaped.
+        """
+        if not self.was_run or self._proc.returncode is None:
+            return None
+        reaped_at = getattr(self._proc, "reaped_at", None)
+        if reaped_at:
+            wall_time = reaped_at - self.started_at
+        else:
+            wall_time = sum(self.phases.values())
+        return Stats.from_rusage(wall_time,
+                                 getattr(self._proc, "rusage", None),
+                                 stdout_bytes=self._out_bytes,
+                                 stderr_bytes=self._err_bytes)
+
     @property
     def std_in(self):
         return self.subprocess.stdin
 
-    def run(self, block=True, binary=False, cwd=None, env=None, shell=True):
+    def run(self,
+            block=True,
+            binary=False,
+            cwd=None,
+            env=None,
+            shell=True,
+            stdin=None):
         """Runs the given command, with or without pexpect functionality enabled."""
         self.blocking = block
 
@@ -248,6 +579,8 @@ class ExternalProgram(object):
         if self.blocking:
             popen_kwargs = self._default_popen_kwargs.copy()
             del popen_kwargs["stdin"]
+            if stdin is not None:
+                popen_kwargs["stdin"] = stdin
             popen_kwargs["universal_newlines"] = not binary
             if cwd:
                 popen_kwargs["cwd"] = cwd
@@ -255,7 +588,9 @@ class ExternalProgram(object):
                 popen_kwargs["env"].update(env)
             if not shell:
                 popen_kwargs["shell"] = False
-            s = subprocess.Popen(self._popen_args, **popen_kwargs)
+            group_kwargs = _process_group_kwargs()
+            popen_kwargs.update(group_kwargs)
+            s = _Popen(self._popen_args, **popen_kwargs)
         # Otherwise, use pexpect.
         else:
             pexpect_kwargs = self._default_pexpect_kwargs.copy()
@@ -267,9 +602,17 @@ class ExternalProgram(object):
                 pexpect_kwargs["env"].update(env)
             # Enable Python subprocesses to work with expect functionality.
             pexpect_kwargs["env"]["PYTHONUNBUFFERED"] = "1"
+            group_kwargs = _process_group_kwargs(preexec=True)
+            pexpect_kwargs.update(group_kwargs)
             s = PopenSpawn(self._popen_args, **pexpect_kwargs)
         self.subprocess = s
+        self._own_group = bool(group_kwargs)
         self.was_run = True
+        self.started_at = time.monotonic()
+        self.timed_out = False
+        self.phases = {}
+        self._out_bytes = None
+        self._err_bytes = None
 
     def exec(self, env=None, shell=True):
         """ Runs the command and blocks (waits) until the command is complete. """
@@ -279,6 +622,136 @@ class ExternalProgram(object):
         self.run(env=env, shell=shell)
         self.block()
 
+    def iter_out(
+        self,
+        sep=None,
+        maxsplit=-1,
+        column=None,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        on_stderr=None,
+        chunk_size=CHUNK_SIZE,
+        cwd=None,
+        env=None,
+        shell=True,
+    ) -> Iterator[str]:
+        """
+        Runs the command, yielding lines written to stdout as soon as they
+        are complete, instead of waiting for the command to finish. Pipes are
+        read `chunk_size` bytes at a time, and nothing beyond a single chunk
+        and an incomplete line is buffered, so output of any size can be
+        processed with `String`-style filtering and column selection while
+        the command is still running. Since output is consumed as it is
+        streamed, `out` is empty afterwards.
+
+        Lines from stderr are passed to `on_stderr` as they become complete,
+        or if no callback is given, collected and available from `err` once
+        the command is finished. Command is started when the first line is
+        asked for, which is also when its `timeout` starts to count, and
+        leaving the generator before it is exhausted kills the command.
+
+        >>> from integraty.extprog import ExternalProgram
+        >>> c = ExternalProgram('echo "a 1"; echo "b 2"; echo "c 3" >&2')
+        >>> list(c.iter_out(column=1, pattern='^c', exclude=True))
+        ['1', '2']
+        >>> c.return_code, c.err
+        (0, String('c 3\\n'))
+
+        Args:
+            sep (str, optional): Separator character used with `column`. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            column (int, optional): Yield only this column of each split line. Defaults to None.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+            on_stderr (Callable[[str], Any], optional): Called with each line from stderr. Defaults to None.
+            chunk_size (int, optional): Number of bytes to read at a time. Defaults to CHUNK_SIZE.
+            cwd (str, optional): Working directory of the command. Defaults to None.
+            env (dict, optional): Additional environment variables. Defaults to None.
+            shell (bool, optional): Run command through the shell. Defaults to True.
+
+        Returns:
+            Iterator[str]: Lines, or columns of lines, from stdout.
+        """
+        if not shell and not isinstance(self._popen_args, list):
+            raise ExternalProgramException(
+                "With 'shell=False' command must be a sequence not a string")
+        lines = filter_lines(
+            self._stream(chunk_size,
+                         on_stderr,
+                         binary=True,
+                         cwd=cwd,
+                         env=env,
+                         shell=shell),
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        if column is None:
+            return lines
+        split = splitter(sep=sep, maxsplit=maxsplit)
+        return (split(line)[column].strip() for line in lines)
+
+    def _stream(self, chunk_size, on_stderr, **run_kwargs):
+        """
+        Runs the command, yielding complete lines from stdout while draining
+        stderr.
+        """
+        self.run(**run_kwargs)
+        deadline = self.started_at + self.timeout if self.timeout else None
+        out_buffer = LineBuffer()
+        err_buffer = LineBuffer()
+        err_chunks = []
+        nbytes = {self.std_out: 0, self.std_err: 0}
+        sel = selectors.DefaultSelector()
+        try:
+            sel.register(self.std_out, selectors.EVENT_READ)
+            sel.register(self.std_err, selectors.EVENT_READ)
+            while sel.get_map():
+                timeout = None
+                if deadline:
+                    timeout = max(0, deadline - time.monotonic())
+                events = sel.select(timeout)
+                if not events and deadline and time.monotonic() >= deadline:
+                    self._expire()
+                    raise subprocess.TimeoutExpired(self.cmd, self.timeout)
+                for key, _ in events:
+                    data = os.read(key.fd, chunk_size)
+                    nbytes[key.fileobj] += len(data)
+                    if not data:
+                        sel.unregister(key.fileobj)
+                        key.fileobj.close()
+                    if key.fileobj is self.std_out:
+                        yield from out_buffer.feed(data, final=not data)
+                    elif on_stderr:
+                        for line in err_buffer.feed(data, final=not data):
+                            on_stderr(line)
+                    else:
+                        err_chunks.append(data)
+            try:
+                # Command may keep running after closing its output.
+                self.subprocess.wait(self._remaining)
+            except subprocess.TimeoutExpired:
+                self._expire()
+                raise
+            self.phases.setdefault("run", time.monotonic() - self.started_at)
+        finally:
+            self._out_bytes = nbytes[self.std_out]
+            self._err_bytes = nbytes[self.std_err]
+            sel.close()
+            self.std_out.close()
+            self.std_err.close()
+            if self.subprocess.poll() is None:
+                self._signal(signal.SIGKILL)
+                self.subprocess.wait()
+        self.__out = ""
+        self.__err = b"".join(err_chunks).decode(
+            locale.getpreferredencoding(False))
+
     def expect(self, pattern, timeout=-1):
         """Waits on the given pattern to appear in std_out"""
 
@@ -307,39 +780,145 @@ class ExternalProgram(object):
             self.subprocess.send_signal(s)
 
     def terminate(self):
-        self.subprocess.terminate()
+        """Sends SIGTERM to the command and everything it started."""
+        self._signal(signal.SIGTERM)
 
     def kill(self):
-        if self._uses_pexpect:
-            self.subprocess.kill(signal.SIGINT)
+        """Sends SIGINT to the command and everything it started."""
+        self._signal(signal.SIGINT)
+
+    def stop(self, grace=KILL_GRACE):
+        """
+        Stops the command and everything it started, by sending SIGTERM to
+        its process group, and SIGKILL if the command is still running after
+        `grace` seconds. Whatever is left of the group once the command has
+        exited is killed as well. Time taken by each step is recorded in
+        `phases`, under `terminate` and, if it was necessary, `kill`.
+
+        Args:
+            grace (float, optional): Seconds to wait after SIGTERM. Defaults to KILL_GRACE.
+        """
+        proc = self._proc
+        start = time.monotonic()
+        self._signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            self.phases["terminate"] = time.monotonic() - start
+            start = time.monotonic()
+            self._signal(signal.SIGKILL)
+            proc.wait()
+            self.phases["kill"] = time.monotonic() - start
         else:
-            self.subprocess.send_signal(signal.SIGINT)
+            self.phases["terminate"] = time.monotonic() - start
+            # Command is gone, but some of its children may not be.
+            self._signal(signal.SIGKILL)
+
+    def _signal(self, sig):
+        # Signals everything in process group of the command, if it has one
+        # of its own, otherwise just the command, unless it was reaped.
+        if self._own_group:
+            signal_group(self._proc.pid, sig)
+        else:
+            self._proc.send_signal(sig)
+
+    def _communicate(self):
+        """
+        Reads output of command until it closes stdout and stderr, then waits
+        for it to exit, like `Popen.communicate`, but keeps output as bytes
+        until all of it is read, so that its size is known. Once command runs
+        out of time, it is stopped, output written until then is kept, and
+        subprocess.TimeoutExpired is raised.
+        """
+        chunks = {
+            f: []
+            for f in (self.std_out, self.std_err)
+            if f is not None and not f.closed
+        }
+        sel = selectors.DefaultSelector()
+        try:
+            for f in chunks:
+                sel.register(f, selectors.EVENT_READ)
+            while sel.get_map():
+                timeout = None if self.timed_out else self._remaining
+                events = sel.select(timeout)
+                if not events and timeout is not None and not self._remaining:
+                    self._expire()
+                for key, _ in events:
+                    data = os.read(key.fd, CHUNK_SIZE)
+                    if data:
+                        chunks[key.fileobj].append(data)
+                    else:
+                        sel.unregister(key.fileobj)
+                        key.fileobj.close()
+        finally:
+            sel.close()
+        if self.std_out in chunks:
+            data = b"".join(chunks[self.std_out])
+            self.__out = _decode_output(self.std_out, data)
+            self._out_bytes = len(data)
+        if self.std_err in chunks:
+            data = b"".join(chunks[self.std_err])
+            self.__err = _decode_output(self.std_err, data)
+            self._err_bytes = len(data)
+        if not self.timed_out:
+            try:
+                # Command may keep running after closing its output.
+                self.subprocess.wait(self._remaining)
+            except subprocess.TimeoutExpired:
+                self._expire()
+        if self.timed_out:
+            raise subprocess.TimeoutExpired(self.cmd, self.timeout)
+
+    def _expire(self):
+        # Deals with command which ran out of time.
+        self.phases["run"] = time.monotonic() - self.started_at
+        self.timed_out = True
+        self.stop()
 
     def block(self):
-        """Blocks until process is complete."""
+        """
+        Blocks until process is complete. If command is still running once
+        `timeout` seconds have passed since it started, it is stopped along
+        with everything it started, see `stop`, and subprocess.TimeoutExpired
+        is raised. Output written before then remains available. Command is
+        stopped as well if waiting is interrupted, e.g. by KeyboardInterrupt.
+        """
+        try:
+            self._block()
+        except BaseException:
+            # Command must not outlive interrupted caller; after a timeout it
+            # has been stopped already.
+            if self._proc.poll() is None:
+                self.stop()
+            raise
+
+    def _block(self):
         if self._uses_subprocess:
             # consume stdout and stderr
             if self.blocking:
-                try:
-                    stdout, stderr = self.subprocess.communicate(
-                        timeout=self.timeout if self.timeout else None)
-                    self.__out = stdout
-                    self.__err = stderr
-                except ValueError:
-                    pass  # Don't read from finished subprocesses.
+                self._communicate()
             else:
                 self.subprocess.stdin.close()
                 self.std_out.close()
                 self.std_err.close()
-                # self.subprocess.wait(self.timeout if self.timeout else None)
-                self.subprocess.wait()
+                try:
+                    self.subprocess.wait(self._remaining)
+                except subprocess.TimeoutExpired:
+                    self._expire()
+                    raise
         else:
             self.subprocess.sendeof()
             try:
-                self.subprocess.wait()
+                self.subprocess.proc.wait(self._remaining)
+            except subprocess.TimeoutExpired:
+                self._expire()
+                raise
             finally:
+                self.subprocess.wait()
                 if self.subprocess.proc.stdout:
                     self.subprocess.proc.stdout.close()
+        self.phases.setdefault("run", time.monotonic() - self.started_at)
 
     def poll(self):
         if self._uses_subprocess:
@@ -351,13 +930,22 @@ class ExternalProgram(object):
         else:
             raise ExternalProgramException("Do not combine poll() with expect")
 
-    def pipe(self, command, timeout=None, cwd=None):
+    def pipe(self, command, timeout=None, cwd=None, os_pipe=False):
         """Runs the current command and passes its output to the next
-        given process.
+        given process. With `os_pipe` both commands run at the same time,
+        with output of the current command wired directly into the next
+        one, see `ExternalProgram.pipeline`.
         """
         if not timeout:
             timeout = self.timeout
 
+        if os_pipe:
+            if self.was_run:
+                raise ExternalProgramException(
+                    "With 'os_pipe=True' command must not have been run yet")
+            return self.pipeline([self, ExternalProgram(command, timeout)],
+                                 cwd=cwd)
+
         if not self.was_run:
             self.run(block=False, cwd=cwd)
 
@@ -374,6 +962,85 @@ class ExternalProgram(object):
         c.block()
         return c
 
+    @classmethod
+    def pipeline(cls, commands, timeout=None, cwd=None, env=None):
+        """
+        Runs commands as a pipeline, in which stdout of each command is
+        connected directly to stdin of the next command by the OS, like a
+        shell does it. All commands run concurrently, and data flowing
+        between them never passes through the interpreter. Only output of the
+        last command is collected, while stderr of every command is drained
+        and kept with its stage.
+
+        >>> from integraty.extprog import ExternalProgram
+        >>> c = ExternalProgram.pipeline([['printf', 'b\\na\\nc\\n'], ['sort'], ['head', '-n', '2']])
+        >>> c.out.lines(), c.return_codes
+        (['a', 'b'], [0, 0, 0])
+
+        Args:
+            commands (Sequence): Commands, as strings run through shell, argument lists, or not yet run ExternalPrograms.
+            timeout (float, optional): Timeout of each command, see `block`; if any command runs longer, it is stopped, and subprocess.TimeoutExpired raised. Defaults to None.
+            cwd (str, optional): Working directory of all commands. Defaults to None.
+            env (dict, optional): Additional environment variables. Defaults to None.
+
+        Returns:
+            ExternalProgram: Last command of the pipeline, with all stages in `stages`.
+        """
+        stages = []
+        stdin = None
+        for command in commands:
+            if isinstance(command, ExternalProgram):
+                c = command
+            else:
+                c = cls(command, timeout=timeout)
+            c.run(cwd=cwd,
+                  env=env,
+                  shell=isinstance(c.cmd, STR_TYPES),
+                  stdin=stdin)
+            if stdin is not None:
+                # Only the next command may hold on to the read end of the
+                # pipe, otherwise the writing command never sees SIGPIPE.
+                stdin.close()
+            stdin = c.std_out
+            stages.append(c)
+
+        last = stages[-1]
+        last.stages = stages
+        # Drain stderr of upstream stages while the pipeline runs, so that
+        # none of them can block on a full pipe.
+        drains = []
+        for stage in stages[:-1]:
+            stage.__out = ""  # stdout was handed over to the next stage
+            t = threading.Thread(target=getattr,
+                                 args=(stage, "err"),
+                                 daemon=True)
+            t.start()
+            drains.append(t)
+        overran = None
+        try:
+            last.block()
+        except BaseException:
+            for stage in stages[:-1]:
+                stage.stop()
+            raise
+        finally:
+            for stage in stages[:-1]:
+                try:
+                    stage.subprocess.wait(stage._remaining)
+                except subprocess.TimeoutExpired:
+                    # E.g. a stage which keeps running without writing.
+                    stage._expire()
+                    overran = overran or stage
+                # Upstream stages finish no later than the last one.
+                stage.phases.setdefault("run",
+                                        time.monotonic() - stage.started_at)
+        for t in drains:
+            t.join()
+        if overran:
+            last.timed_out = True
+            raise subprocess.TimeoutExpired(overran.cmd, overran.timeout)
+        return last
+
 
 def _expand_args(command):
     """Parses command strings and returns a Popen-ready list."""
@@ -402,8 +1069,15 @@ def _expand_args(command):
     return command
 
 
-def chain(command, timeout=None, cwd=None, env=None):
+def chain(command, timeout=None, cwd=None, env=None, os_pipe=False):
     commands = _expand_args(command)
+
+    if os_pipe:
+        return ExternalProgram.pipeline(commands,
+                                        timeout=timeout,
+                                        cwd=cwd,
+                                        env=env)
+
     data = None
 
     for command in commands:
@@ -427,3 +1101,367 @@ def run(command, block=True, binary=False, timeout=None, cwd=None, env=None):
         c.block()
 
     return c
+
+
+class Batch:
+    """
+    Results of running many commands with `run_many`, iterable as a sequence
+    of finished ExternalPrograms. Besides the programs themselves, a batch
+    records how long each command took and how long the whole batch took,
+    which shows how much was gained by running commands concurrently.
+    """
+
+    def __init__(self, programs, durations, timed_out, wall_time):
+        self.programs = programs
+        self.durations = durations
+        self.timed_out = timed_out
+        self.wall_time = wall_time
+
+    def __repr__(self):
+        return "Batch({} commands, wall_time={:.3f}, total_time={:.3f})".format(
+            len(self.programs), self.wall_time, self.total_time)
+
+    def __iter__(self):
+        return iter(self.programs)
+
+    def __len__(self):
+        return len(self.programs)
+
+    def __getitem__(self, i):
+        return self.programs[i]
+
+    @property
+    def total_time(self):
+        """Sum of time taken by each command, as if they ran one by one."""
+        return sum(self.durations)
+
+    @property
+    def speedup(self):
+        """Ratio of total time of all commands to wall time of the batch."""
+        return self.total_time / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def ok(self):
+        """Did every command succeed?"""
+        return all(c.ok for c in self.programs)
+
+
+def _run_timed(command, timeout=None, cwd=None, env=None):
+    c = ExternalProgram(command, timeout=timeout)
+    start = time.monotonic()
+    c.run(cwd=cwd, env=env, shell=isinstance(command, STR_TYPES))
+    try:
+        c.block()
+    except subprocess.TimeoutExpired:
+        pass  # Command was stopped, which is recorded in `timed_out`.
+    return c, time.monotonic() - start, c.timed_out
+
+
+def run_many(commands,
+             max_workers=None,
+             timeout=None,
+             ordered=True,
+             cwd=None,
+             env=None):
+    """
+    Runs independent commands concurrently, with at most `max_workers` of
+    them running at any time. Each command is subject to its own `timeout`,
+    and a command which runs out of time is killed and reported in
+    `timed_out` of the result, instead of failing the whole batch.
+
+    >>> from integraty import extprog
+    >>> b = extprog.run_many(['echo alpha', 'sleep 0.2; echo beta', ['echo', 'gamma']], max_workers=2)
+    >>> [c.out.lines() for c in b], b.ok
+    ([['alpha'], ['beta'], ['gamma']], True)
+
+    Args:
+        commands (Iterable): Commands, as strings run through shell, or argument lists.
+        max_workers (int, optional): Most commands running at the same time. Defaults to None, chosen by ThreadPoolExecutor.
+        timeout (float, optional): Timeout for each command. Defaults to None.
+        ordered (bool, optional): Return programs in order of submission, rather than in order of completion. Defaults to True.
+        cwd (str, optional): Working directory of all commands. Defaults to None.
+        env (dict, optional): Additional environment variables. Defaults to None.
+
+    Returns:
+        Batch: Finished programs, with timing of the batch.
+    """
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_run_timed, command, timeout, cwd, env)
+            for command in commands
+        ]
+        results = [
+            f.result() for f in (futures if ordered else as_completed(futures))
+        ]
+    wall_time = time.monotonic() - start
+    return Batch(
+        programs=[c for c, _, _ in results],
+        durations=[d for _, d, _ in results],
+        timed_out=[c for c, _, t in results if t],
+        wall_time=wall_time,
+    )
+
+
+class AsyncExternalProgram(object):
+    """
+    AsyncExternalProgram runs a command the way ExternalProgram does, but is
+    driven from an asyncio event loop instead of blocking the caller. Output
+    is read by the event loop instead of a thread per process, so a great
+    many commands may be running at once, e.g. with `asyncio.gather`. The
+    same `out`, `err`, `return_code` and `ok` are available once a command
+    is complete, and `expect` and `send` allow interaction with a command
+    while it is running.
+
+    >>> import asyncio
+    >>> from integraty.extprog import AsyncExternalProgram
+    >>> async def main():
+    ...     progs = [AsyncExternalProgram('echo {}'.format(i)) for i in range(3)]
+    ...     await asyncio.gather(*(p.exec() for p in progs))
+    ...     return [p.out.lines() for p in progs], all(p.ok for p in progs)
+    >>> asyncio.run(main())
+    ([['0'], ['1'], ['2']], True)
+    """
+
+    def __init__(self, cmd, timeout=None):
+        super(AsyncExternalProgram, self).__init__()
+        self.cmd = cmd
+        self.timeout = timeout
+        self.subprocess = None
+        self.was_run = False
+        self.started_at = None
+        self.timed_out = False
+        self.phases = {}
+        self.before = None
+        self.after = None
+        self._decoder = None
+        self._own_group = False
+        self._seen = ""
+        self._pos = 0
+        self.__out = None
+        self.__err = None
+
+    def __repr__(self):
+        return "AsyncExternalProgram({!r}, timeout={})".format(
+            self.cmd, self.timeout)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        if self.subprocess and self.subprocess.returncode is None:
+            self._signal(signal.SIGKILL)
+            await self.subprocess.wait()
+
+    @property
+    def std_in(self):
+        return self.subprocess.stdin
+
+    @property
+    def std_out(self):
+        return self.subprocess.stdout
+
+    @property
+    def std_err(self):
+        return self.subprocess.stderr
+
+    @property
+    def ok(self):
+        return self.return_code == 0
+
+    @property
+    def out(self):
+        """Std/out output, available once command is complete."""
+        if not isinstance(self.__out, String):
+            self.__out = String(self.__out or "")
+        return self.__out
+
+    @property
+    def err(self):
+        """Std/err output, available once command is complete."""
+        if not isinstance(self.__err, String):
+            self.__err = String(self.__err or "")
+        return self.__err
+
+    @property
+    def pid(self):
+        """The process' PID."""
+        return self.subprocess.pid
+
+    @property
+    def is_alive(self):
+        """Is the process alive?"""
+        return pid_exists(self.pid)
+
+    @property
+    def return_code(self):
+        return self.subprocess.returncode
+
+    async def run(self, cwd=None, env=None, shell=True):
+        """Starts the given command, without waiting for it to complete."""
+        if not shell and not isinstance(self.cmd, list):
+            raise ExternalProgramException(
+                "With 'shell=False' command must be a sequence not a string")
+        popen_env = os.environ.copy()
+        if env:
+            popen_env.update(env)
+        # Enable Python subprocesses to work with expect functionality.
+        popen_env["PYTHONUNBUFFERED"] = "1"
+        kwargs = {
+            "stdin": asyncio.subprocess.PIPE,
+            "stdout": asyncio.subprocess.PIPE,
+            "stderr": asyncio.subprocess.PIPE,
+            "cwd": cwd,
+            "env": popen_env,
+        }
+        group_kwargs = _process_group_kwargs()
+        kwargs.update(group_kwargs)
+        if shell:
+            s = await asyncio.create_subprocess_shell(self.cmd, **kwargs)
+        else:
+            s = await asyncio.create_subprocess_exec(*self.cmd, **kwargs)
+        self._decoder = codecs.getincrementaldecoder(
+            locale.getpreferredencoding(False))()
+        self.subprocess = s
+        self._own_group = bool(group_kwargs)
+        self.was_run = True
+        self.started_at = time.monotonic()
+        self.timed_out = False
+        self.phases = {}
+
+    async def exec(self, cwd=None, env=None, shell=True):
+        """Runs the command and waits until the command is complete."""
+        await self.run(cwd=cwd, env=env, shell=shell)
+        await self.block()
+
+    async def block(self):
+        """
+        Waits until process is complete, closing its stdin and collecting
+        its output. If command is still running once `timeout` seconds have
+        passed since it started, it is stopped along with everything it
+        started, see `stop`, and subprocess.TimeoutExpired is raised. Output
+        written before then remains available. Command is stopped as well if
+        waiting is interrupted, e.g. by cancellation or KeyboardInterrupt.
+        """
+        try:
+            await self._block()
+        except BaseException:
+            # Command must not outlive interrupted caller; after a timeout it
+            # has been stopped already.
+            if self.subprocess.returncode is None:
+                await self.stop()
+            raise
+
+    async def _block(self):
+        remaining = None
+        if self.timeout:
+            remaining = max(
+                0, self.started_at + self.timeout - time.monotonic())
+        # Commands reading stdin would otherwise wait for more input, since
+        # communicate only closes stdin when given input to send.
+        if self.subprocess.stdin is not None:
+            self.subprocess.stdin.close()
+        # Shielded, so that output read until timeout is not lost.
+        communicate = asyncio.ensure_future(self.subprocess.communicate())
+        try:
+            await asyncio.wait_for(asyncio.shield(communicate), remaining)
+        except asyncio.TimeoutError:
+            self.phases["run"] = time.monotonic() - self.started_at
+            self.timed_out = True
+            await self.stop()
+        stdout, stderr = await communicate
+        self.phases.setdefault("run", time.monotonic() - self.started_at)
+        self._seen += self._decoder.decode(stdout, True)
+        self.__out = self._seen
+        self.__err = stderr.decode(locale.getpreferredencoding(False))
+        if self.timed_out:
+            raise subprocess.TimeoutExpired(self.cmd, self.timeout)
+
+    async def stop(self, grace=KILL_GRACE):
+        """
+        Stops the command and everything it started, by sending SIGTERM to
+        its process group, and SIGKILL if the command is still running after
+        `grace` seconds. Whatever is left of the group once the command has
+        exited is killed as well. Time taken by each step is recorded in
+        `phases`, under `terminate` and, if it was necessary, `kill`.
+
+        Args:
+            grace (float, optional): Seconds to wait after SIGTERM. Defaults to KILL_GRACE.
+        """
+        start = time.monotonic()
+        self._signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(self.subprocess.wait(), grace)
+        except asyncio.TimeoutError:
+            self.phases["terminate"] = time.monotonic() - start
+            start = time.monotonic()
+            self._signal(signal.SIGKILL)
+            await self.subprocess.wait()
+            self.phases["kill"] = time.monotonic() - start
+        else:
+            self.phases["terminate"] = time.monotonic() - start
+            # Command is gone, but some of its children may not be.
+            self._signal(signal.SIGKILL)
+
+    def _signal(self, sig):
+        # Signals everything in process group of the command, if it has one
+        # of its own, otherwise just the command, unless it was reaped.
+        if self._own_group:
+            signal_group(self.pid, sig)
+        elif self.subprocess.returncode is None:
+            self.subprocess.send_signal(sig)
+
+    async def expect(self, pattern, timeout=-1):
+        """
+        Waits on the given pattern to appear in std_out. Text preceding the
+        match is available in `before`, and matched text in `after`. If the
+        command exits before the pattern appears, `before` holds the rest of
+        its output and `after` is None. Raises pexpect.TIMEOUT if pattern
+        does not appear within `timeout` seconds, which by default is the
+        program's `timeout`.
+        """
+        if timeout == -1:
+            timeout = self.timeout
+        search = compile_pattern(pattern).search
+        try:
+            await asyncio.wait_for(self._read_until(search), timeout)
+        except asyncio.TimeoutError:
+            raise pexpect.TIMEOUT("Timeout exceeded waiting for {!r}".format(
+                pattern))
+
+    async def _read_until(self, search):
+        while True:
+            m = search(self._seen, self._pos)
+            if m:
+                self.before = self._seen[self._pos:m.start()]
+                self.after = m.group()
+                self._pos = m.end()
+                return
+            data = await self.std_out.read(CHUNK_SIZE)
+            self._seen += self._decoder.decode(data, not data)
+            if not data:
+                self.before = self._seen[self._pos:]
+                self.after = None
+                self._pos = len(self._seen)
+                return
+
+    async def send(self, s, end=os.linesep, signal=False):
+        """Sends the given string or signal to std_in."""
+        if signal:
+            self.subprocess.send_signal(s)
+            return
+        self.std_in.write(
+            (s + end).encode(locale.getpreferredencoding(False)))
+        await self.std_in.drain()
+
+    def sendeof(self):
+        """Closes std_in, signaling end of input to the command."""
+        self.std_in.close()
+
+    def terminate(self):
+        """Sends SIGTERM to the command and everything it started."""
+        self._signal(signal.SIGTERM)
+
+    def kill(self):
+        """Sends SIGINT to the command and everything it started."""
+        self._signal(signal.SIGINT)
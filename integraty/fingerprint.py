@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Fingerprints of outputs, small enough to be stored along with golden
+outputs, and compared in constant time, instead of a pass over both outputs,
+like `Similarity.consine_distance` makes. Outputs are reduced to shingles,
+i.e. runs of words, by `Similarity._text2vec`.
+
+`MinHash` signatures estimate Jaccard similarity of sets of shingles, and an
+`LSHIndex` of them finds those likely similar to a given one, among any
+number of stored ones, without comparing it to each. `SimHash` packs
+shingles, weighted by their counts, into 64 bits, of which similar outputs
+differ in few.
+"""
+
+import hashlib
+import random
+
+from functools import lru_cache
+from typing import Dict, Hashable, List, Sequence, Set, Tuple
+
+from integraty.case import Similarity
+from integraty.utils import popcount
+
+_BITS = 64
+
+_MASK64 = (1 << _BITS) - 1
+
+
+def shingle_hashes(text: str, shingle: int = 3) -> Dict[int, int]:
+    """
+    64-bit hash of each distinct shingle of `text`, with the number of times
+    it occurs. Shingles are hashed with BLAKE2, rather than `hash`, which is
+    randomized for strings, so that fingerprints are the same in every
+    process, and can be stored.
+
+    Args:
+        text (str): Text to fingerprint.
+        shingle (int, optional): Number of words in a shingle. Defaults to 3.
+
+    Returns:
+        Dict[int, int]: Count of shingles by hash.
+    """
+    hashes = {}
+    for s, n in Similarity._text2vec(text, shingle).items():
+        h = int.from_bytes(
+            hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+        hashes[h] = hashes.get(h, 0) + n
+    return hashes
+
+
+@lru_cache(maxsize=32)
+def _salt(seed):
+    return random.Random(seed).getrandbits(_BITS)
+
+
+class MinHash:
+    """
+    Signature of a set of shingles, made of the least hash of shingles in
+    each of `num_perm` bins, which shingles are distributed into by hash.
+    Fraction of equal values of two signatures estimates Jaccard similarity
+    of their sets, i.e. shingles in common out of all shingles, with a
+    standard error of at most about `0.5 / sqrt(num_perm)`. Hashing each
+    shingle once (one permutation hashing), rather than under `num_perm`
+    hash functions, takes a single pass over shingles. Bins left empty, by
+    sets of few shingles, borrow the value of the next bin which is not, so
+    that they are still equal where sets are (densification). Only
+    signatures of equal `num_perm` and `seed` can be compared.
+    ```
+    >>> from integraty.fingerprint import MinHash
+    >>> a = MinHash.from_text("alpha beta gamma delta epsilon zeta eta theta")
+    >>> b = MinHash.from_text("alpha beta gamma delta epsilon zeta eta iota")
+    >>> c = MinHash.from_text("one two three four five six seven eight")
+    >>> a.similarity(b) > 0.5 > a.similarity(c)
+    True
+
+    ```
+    Args:
+        signature (Sequence[int]): Least hash under each hash function.
+        seed (int, optional): Seed of hash functions. Defaults to 1.
+    """
+    __slots__ = ["signature", "seed"]
+
+    def __init__(self, signature: Sequence[int], seed: int = 1):
+        self.signature = tuple(signature)
+        self.seed = seed
+
+    @classmethod
+    def from_text(cls,
+                  text: str,
+                  num_perm: int = 128,
+                  shingle: int = 3,
+                  seed: int = 1) -> "MinHash":
+        """
+        Makes signature of shingles of `text`.
+
+        Args:
+            text (str): Text to fingerprint.
+            num_perm (int, optional): Number of hash functions. Defaults to 128.
+            shingle (int, optional): Number of words in a shingle. Defaults to 3.
+            seed (int, optional): Seed of hash functions. Defaults to 1.
+
+        Returns:
+            MinHash: Signature of `text`.
+        """
+        salt = _salt(seed)
+        mask = _MASK64
+        empty = 1 << _BITS
+        bins = [empty] * num_perm
+        for h in shingle_hashes(text, shingle):
+            # Shingle hashes are salted by seed and mixed again (splitmix64
+            # finalizer), so that each seed orders shingles differently.
+            x = h ^ salt
+            x = ((x ^ (x >> 30)) * 0xbf58476d1ce4e5b9) & mask
+            x = ((x ^ (x >> 27)) * 0x94d049bb133111eb) & mask
+            x ^= x >> 31
+            i = x % num_perm
+            if x < bins[i]:
+                bins[i] = x
+        filled = [i for i, x in enumerate(bins) if x != empty]
+        if filled and len(filled) < num_perm:
+            # Each empty bin takes the value of the next filled one, offset
+            # by distance to it, so that it only matches a bin that borrowed
+            # from the same distance.
+            nxt = filled[0] + num_perm
+            for i in range(num_perm - 1, -1, -1):
+                if bins[i] == empty:
+                    bins[i] = bins[nxt % num_perm] + (nxt - i) * empty
+                else:
+                    nxt = i
+        return cls(bins, seed)
+
+    def __len__(self):
+        return len(self.signature)
+
+    def __repr__(self):
+        return "MinHash(num_perm={}, seed={})".format(len(self), self.seed)
+
+    def similarity(self, other: "MinHash") -> float:
+        """
+        Estimated Jaccard similarity of shingles of both signatures.
+
+        Args:
+            other (MinHash): Signature to compare with.
+
+        Returns:
+            float: Similarity between 0 and 1.
+        """
+        if len(other) != len(self) or other.seed != self.seed:
+            raise ValueError("Signatures of different hash functions")
+        same = sum(map(int.__eq__, self.signature, other.signature))
+        return same / len(self.signature)
+
+
+class SimHash:
+    """
+    64-bit fingerprint, each bit of which is set where most of the weight of
+    shingles is on hashes with that bit set, so that similar texts differ in
+    few bits, and similarity is estimated from the number of differing bits.
+    ```
+    >>> from integraty.fingerprint import SimHash
+    >>> a = SimHash.from_text("alpha beta gamma delta epsilon zeta eta theta")
+    >>> b = SimHash.from_text("alpha beta gamma delta epsilon zeta eta iota")
+    >>> c = SimHash.from_text("one two three four five six seven eight")
+    >>> a.distance(b) < a.distance(c)
+    True
+
+    ```
+    Args:
+        value (int): Fingerprint.
+    """
+    __slots__ = ["value"]
+
+    def __init__(self, value: int):
+        self.value = value
+
+    @classmethod
+    def from_text(cls, text: str, shingle: int = 1) -> "SimHash":
+        """
+        Makes fingerprint of shingles of `text`, weighted by their counts.
+
+        Args:
+            text (str): Text to fingerprint.
+            shingle (int, optional): Number of words in a shingle. Defaults to 1.
+
+        Returns:
+            SimHash: Fingerprint of `text`.
+        """
+        weights = shingle_hashes(text, shingle)
+        half = sum(weights.values()) / 2
+        value = 0
+        for bit in range(_BITS):
+            if sum(n for h, n in weights.items() if h >> bit & 1) > half:
+                value |= 1 << bit
+        return cls(value)
+
+    def __repr__(self):
+        return "SimHash({:#018x})".format(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, SimHash) and other.value == self.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def distance(self, other: "SimHash") -> int:
+        """Number of bits in which both fingerprints differ."""
+        return popcount(self.value ^ other.value)
+
+    def similarity(self, other: "SimHash") -> float:
+        """Fraction of bits in which both fingerprints are the same."""
+        return 1 - self.distance(other) / _BITS
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing index of `MinHash` signatures, e.g. of stored
+    golden outputs, to look up those similar to a given signature, without
+    comparing it to every one. Signatures are cut into `bands` of equal
+    length, and those with all values of any band in common are candidates,
+    which happens with probability `1 - (1 - s ** rows) ** bands` for a
+    similarity of `s`, i.e. steeply above about `(1 / bands) ** (1 / rows)`,
+    0.42 by default. Candidates are then ranked by estimated similarity.
+    ```
+    >>> from integraty.fingerprint import LSHIndex, MinHash
+    >>> index = LSHIndex()
+    >>> index.add("a", MinHash.from_text("alpha beta gamma delta epsilon zeta eta theta"))
+    >>> index.add("c", MinHash.from_text("one two three four five six seven eight"))
+    >>> [key for key, _ in index.query(MinHash.from_text("alpha beta gamma delta epsilon zeta eta"))]
+    ['a']
+
+    ```
+    Args:
+        num_perm (int, optional): Length of signatures. Defaults to 128.
+        bands (int, optional): Number of bands of a signature. Defaults to 32.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32):
+        if bands < 1 or num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key):
+        return key in self._signatures
+
+    def _bands(self, minhash):
+        if len(minhash) != self.num_perm:
+            raise ValueError(f"Signature must be of length {self.num_perm}")
+        sig, rows = minhash.signature, self.rows
+        return [sig[i:i + rows] for i in range(0, self.num_perm, rows)]
+
+    def add(self, key: Hashable, minhash: MinHash):
+        """
+        Adds signature under `key`, replacing any added before under it.
+
+        Args:
+            key (Hashable): Key to find signature by, e.g. name of an output.
+            minhash (MinHash): Signature to add.
+        """
+        if key in self._signatures:
+            self.remove(key)
+        for buckets, band in zip(self._buckets, self._bands(minhash)):
+            buckets.setdefault(band, set()).add(key)
+        self._signatures[key] = minhash
+
+    def remove(self, key: Hashable):
+        """
+        Removes signature added under `key`.
+
+        Args:
+            key (Hashable): Key signature was added under.
+        """
+        minhash = self._signatures.pop(key)
+        for buckets, band in zip(self._buckets, self._bands(minhash)):
+            bucket = buckets[band]
+            bucket.discard(key)
+            if not bucket:
+                del buckets[band]
+
+    def candidates(self, minhash: MinHash) -> Set[Hashable]:
+        """
+        Keys of signatures which have a band in common with `minhash`.
+
+        Args:
+            minhash (MinHash): Signature to look up.
+
+        Returns:
+            Set[Hashable]: Keys of likely similar signatures.
+        """
+        found = set()
+        for buckets, band in zip(self._buckets, self._bands(minhash)):
+            found.update(buckets.get(band, ()))
+        return found
+
+    def query(self,
+              minhash: MinHash,
+              threshold: float = 0.0,
+              limit: int = None) -> List[Tuple[Hashable, float]]:
+        """
+        Keys of candidates similar to `minhash`, with their estimated
+        similarity, most similar first.
+
+        Args:
+            minhash (MinHash): Signature to look up.
+            threshold (float, optional): Least similarity to report. Defaults to 0.0.
+            limit (int, optional): Most candidates to report. Defaults to None, all.
+
+        Returns:
+            List[Tuple[Hashable, float]]: Key and similarity of each candidate.
+        """
+        scored = [(key, minhash.similarity(self._signatures[key]))
+                  for key in self.candidates(minhash)]
+        scored = [(k, s) for k, s in scored if s >= threshold]
+        scored.sort(key=lambda ks: ks[1], reverse=True)
+        return scored[:limit]
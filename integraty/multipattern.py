@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Matching of many patterns, i.e. literal substrings and regular expressions,
+in a single scan of input, instead of one scan per pattern.
+"""
+
+import re
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from integraty.utils import compile_pattern, literal_of
+
+# Sets of fewer literals are searched for one by one, with `in`, which is
+# faster than going through a trie, as long as there are only a few.
+TRIE_MIN_LITERALS = 50
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Regular expression matching any of `words`, with their common prefixes
+    factored out into a trie, so that at each position of input, matching
+    follows a single path through the trie, rather than trying every word
+    in turn. At any position, the longest word starting there is matched.
+    ```
+    >>> from integraty.multipattern import trie_regex
+    >>> trie_regex(['alpha', 'alphabet', 'alps', 'beta'])
+    '(?:alp(?:ha(?:bet)?|s)|beta)'
+
+    ```
+    Args:
+        words (Iterable[str]): Non-empty literals.
+
+    Returns:
+        str: Regular expression.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # Marks end of a word.
+    # Trie is as deep as the longest word, so it is built bottom-up, with an
+    # explicit stack, instead of recursively.
+    built = {}
+    stack = [(trie, False)]
+    while stack:
+        node, ready = stack.pop()
+        if not ready:
+            stack.append((node, True))
+            stack.extend((child, False) for ch, child in node.items() if ch)
+            continue
+        branches = []
+        for ch, child in sorted(node.items()):
+            if not ch:
+                continue
+            # Characters with a single child are chained into one literal.
+            branches.append(re.escape(ch) + built.pop(id(child)))
+        if not branches:
+            built[id(node)] = ""
+            continue
+        if len(branches) == 1 and "" not in node:
+            built[id(node)] = branches[0]
+        else:
+            body = "(?:" + "|".join(branches) + ")"
+            built[id(node)] = body + "?" if "" in node else body
+    return built[id(trie)]
+
+
+class MultiPattern:
+    """
+    Set of literal substrings and regular expressions, matched against
+    input all at once. Given at least `TRIE_MIN_LITERALS` of them, literals
+    are found in a single pass, with one regular expression, built as a trie
+    of all literals, which is tried at each position of input, much like an
+    Aho-Corasick automaton. Only the longest literal starting at each
+    position is reported, so every literal which is a substring of a
+    reported one is counted as found as well. Fewer literals are looked up
+    one by one with `in`, which then is faster. Regular expressions are
+    combined into a single alternation, which rules out lines matching none
+    of them in one pass, so that each one is only tried on the remaining
+    lines.
+    ```
+    >>> from integraty.multipattern import MultiPattern
+    >>> m = MultiPattern(literals=['alpha', 'alphabet', 'beta'], patterns=[r'\\d+'])
+    >>> sorted(m.matches('alphabet 42'))
+    ['\\\\d+', 'alpha', 'alphabet']
+    >>> m.count(['alpha beta', 'alphabet', 'gamma 7'])
+    {'alpha': 2, 'alphabet': 1, 'beta': 1, '\\\\d+': 1}
+
+    ```
+    Args:
+        literals (Iterable[str], optional): Substrings to find. Defaults to ().
+        patterns (Iterable[str], optional): Regular expressions to find. Defaults to ().
+        ignore_case (bool, optional): Match regardless of case. Defaults to False.
+    """
+
+    def __init__(self,
+                 literals: Iterable[str] = (),
+                 patterns: Iterable[str] = (),
+                 ignore_case=False):
+        self.literals = tuple(dict.fromkeys(literals))
+        self.regexes = tuple(dict.fromkeys(patterns))
+        if not (self.literals or self.regexes):
+            raise ValueError("At least one literal or pattern is required")
+        if "" in self.literals:
+            raise ValueError("Literals must not be empty")
+        self.ignore_case = ignore_case
+        self._order = None
+        flags = re.IGNORECASE if ignore_case else 0
+        fold = str.lower if ignore_case else str
+        # Found text of each literal, and literals it contains, itself
+        # included, which are found whenever it is.
+        self._found = {}
+        for lit in self.literals:
+            key = fold(lit)
+            self._found[key] = self._found.get(key, ()) + (lit, )
+        self._closure = {
+            key: tuple(lit for other, lits in self._found.items()
+                       if other in key for lit in lits)
+            for key in self._found
+        }
+        self._fold = fold
+        self._scanner = None
+        if len(self._found) >= TRIE_MIN_LITERALS:
+            # Searched for in folded text, like literals looked up with `in`,
+            # so that both agree on what matches regardless of case.
+            self._scanner = re.compile(trie_regex(self._found))
+        self._compiled = tuple(
+            (p, compile_pattern(p, flags)) for p in self.regexes)
+        # Combined into one alternation, groups are numbered anew, which
+        # would point backreferences at the wrong ones.
+        self._combinable = not any(rx.groups for _, rx in self._compiled)
+        self._gate = None
+        if len(self.regexes) == 1:
+            self._gate = self._compiled[0][1]
+        elif self.regexes and self._combinable:
+            try:
+                self._gate = re.compile(
+                    "|".join("(?:%s)" % p for p in self.regexes), flags)
+            except re.error:
+                pass  # E.g. inline flags, which must start a pattern.
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[str], ignore_case=False):
+        """
+        Makes a `MultiPattern` from regular expressions, treating those
+        which only match a fixed string, see `utils.literal_of`, as literals.
+        Patterns found are reported as given, not as the strings they match.
+        ```
+        >>> from integraty.multipattern import MultiPattern
+        >>> m = MultiPattern.from_patterns([r'10\\.0\\.0\\.1', r'eth\\d'])
+        >>> m.literals, m.regexes
+        (('10\\\\.0\\\\.0\\\\.1',), ('eth\\\\d',))
+        >>> sorted(m.matches('inet 10.0.0.1 on eth0'))
+        ['10\\\\.0\\\\.0\\\\.1', 'eth\\\\d']
+
+        ```
+
+        Args:
+            patterns (Iterable[str]): Regular expressions.
+            ignore_case (bool, optional): Match regardless of case. Defaults to False.
+
+        Returns:
+            MultiPattern: Pattern matching all of `patterns`.
+        """
+        patterns = tuple(dict.fromkeys(patterns))
+        texts = {p: literal_of(p) for p in patterns}
+        multi = cls(literals=[t for t in texts.values() if t is not None],
+                    patterns=[p for p, t in texts.items() if t is None],
+                    ignore_case=ignore_case)
+        # Literals are reported by the patterns they were given as.
+        names = {}
+        for p, t in texts.items():
+            if t is not None:
+                names[t] = names.get(t, ()) + (p, )
+        multi.literals = tuple(p for p in patterns if texts[p] is not None)
+        multi._found = {
+            key: tuple(p for lit in lits for p in names[lit])
+            for key, lits in multi._found.items()
+        }
+        multi._closure = {
+            key: tuple(p for lit in lits for p in names[lit])
+            for key, lits in multi._closure.items()
+        }
+        multi._order = patterns
+        return multi
+
+    @property
+    def patterns(self) -> Tuple[str, ...]:
+        """All literals and regular expressions, in order given."""
+        return self._order or self.literals + self.regexes
+
+    def __repr__(self):
+        return "MultiPattern(literals={!r}, patterns={!r})".format(
+            self.literals, self.regexes)
+
+    def _literals_in(self, text, found):
+        # Adds literals found in `text` to `found`, which holds no regular
+        # expressions yet.
+        text = self._fold(text)
+        if self._scanner is None:
+            found.update(lit for key, lits in self._found.items()
+                         if key in text for lit in lits)
+        else:
+            self._scan_folded(text, found)
+
+    def _scan_folded(self, text, found):
+        # Adds literals found by the trie in already folded `text` to `found`.
+        closure = self._closure
+        search = self._scanner.search
+        m = search(text)
+        while m:
+            found.update(closure[m.group()])
+            if len(found) == len(self.literals):
+                break  # No other literal is left to be found.
+            # Searching again right after start of a match, rather than after
+            # its end, finds literals overlapping it, too.
+            m = search(text, m.start() + 1)
+
+    def matches(self, text: str) -> Set[str]:
+        """
+        Patterns which occur in `text`, matched line by line.
+
+        Args:
+            text (str): Text, usually a single line, to match.
+
+        Returns:
+            Set[str]: Found literals and regular expressions.
+        """
+        found = set()
+        if self.literals:
+            self._literals_in(text, found)
+        if self._gate is None or self._gate.search(text):
+            found.update(p for p, rx in self._compiled if rx.search(text))
+        return found
+
+    def scan(self, lines: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Lines on which each pattern occurs, in order of lines.
+
+        Args:
+            lines (Iterable[str]): Lines to match.
+
+        Returns:
+            Dict[str, List[str]]: Matching lines by pattern, of all patterns.
+        """
+        if not isinstance(lines, (list, tuple)):
+            lines = list(lines)
+        hits = {p: [] for p in self.patterns}
+        folded = lines
+        if self.literals and self.ignore_case:
+            folded = [self._fold(line) for line in lines]
+        if self._scanner is not None:
+            search = self._scanner.search
+            for line, f in zip(lines, folded):
+                # Lines without any literal are skipped at the speed of `re`.
+                if not search(f):
+                    continue
+                found = set()
+                self._scan_folded(f, found)
+                for lit in found:
+                    hits[lit].append(line)
+        elif self.literals:
+            for key, lits in self._found.items():
+                matched = [l for l, f in zip(lines, folded) if key in f]
+                for lit in lits:
+                    hits[lit] = matched
+        if self.regexes:
+            candidates = lines
+            if len(self.regexes) > 1 and self._gate is not None:
+                candidates = list(filter(self._gate.search, lines))
+            for p, rx in self._compiled:
+                hits[p] = list(filter(rx.search, candidates))
+        return hits
+
+    def count(self, lines: Iterable[str]) -> Dict[str, int]:
+        """
+        Number of lines on which each pattern occurs.
+
+        Args:
+            lines (Iterable[str]): Lines to match.
+
+        Returns:
+            Dict[str, int]: Count of matching lines by pattern, of all patterns.
+        """
+        return {p: len(hits) for p, hits in self.scan(lines).items()}
+
+    def search(self, text: str) -> Set[str]:
+        """
+        Patterns which occur anywhere in `text`, including ones spanning
+        lines, like `re.search` of each pattern would find. Scanning stops as
+        soon as all literals have been found. Regular expressions are found
+        in one pass too, through their combined alternation, though any not
+        found that way, e.g. because a match of another one overlaps it, are
+        then searched for on their own.
+
+        Args:
+            text (str): Text to search.
+
+        Returns:
+            Set[str]: Found literals and regular expressions.
+        """
+        found = set()
+        if self.literals:
+            self._literals_in(text, found)
+        missing = dict(self._compiled)
+        if len(missing) > 1 and self._combinable:
+            names = {"_mp%d" % i: p for i, p in enumerate(self.regexes)}
+            try:
+                combined = compile_pattern(
+                    "|".join("(?P<%s>%s)" % (n, p) for n, p in names.items()),
+                    self._compiled[0][1].flags)
+            except re.error:
+                combined = None  # E.g. repeated names.
+            for m in combined.finditer(text) if combined else ():
+                missing.pop(names[m.lastgroup], None)
+                if not missing:
+                    break
+        found.update(set(self.regexes) - set(missing))
+        found.update(p for p, rx in missing.items() if rx.search(text))
+        return found
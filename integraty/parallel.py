@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel processing of large inputs in chunks, used by `String` methods
+given a number of `workers`. Work is partitioned by line index, each chunk
+runs through the usual pipeline in a worker process, or a thread where the
+interpreter is free-threaded, and results of chunks are returned in order
+of input, to be merged by the caller.
+"""
+
+import multiprocessing
+import sys
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+# Inputs with fewer lines than this are always processed serially, since
+# starting workers and sending results back would cost more than it saves.
+PARALLEL_MIN_LINES = 200000
+
+# Input is split into this many chunks per worker, so that workers which
+# are given cheaper chunks are not left idle while others finish theirs.
+CHUNKS_PER_WORKER = 4
+
+# Job of a worker process, set once when the worker starts.
+_job = None
+
+
+def free_threaded() -> bool:
+    """Is the interpreter running without the GIL?"""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def chunk_bounds(n: int, chunks: int) -> List[Tuple[int, int]]:
+    """
+    Splits range of `n` items into at most `chunks` contiguous ranges of
+    about equal size.
+    ```
+    >>> from integraty.parallel import chunk_bounds
+    >>> chunk_bounds(10, 4)
+    [(0, 3), (3, 6), (6, 9), (9, 10)]
+
+    ```
+    Args:
+        n (int): Number of items.
+        chunks (int): Number of ranges.
+
+    Returns:
+        List[Tuple[int, int]]: Start and stop of each range.
+    """
+    size = max(-(-n // max(chunks, 1)), 1)
+    return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+
+def in_parallel(n: int, workers: int = None, min_size: int = None) -> bool:
+    """
+    Would `map_chunks` process `n` items with `workers` in parallel?
+
+    Args:
+        n (int): Number of items.
+        workers (int, optional): Number of workers. Defaults to None, serial.
+        min_size (int, optional): Smallest number of items to process in parallel. Defaults to PARALLEL_MIN_LINES.
+
+    Returns:
+        bool: True unless items are processed at once, in calling process.
+    """
+    if min_size is None:
+        min_size = PARALLEL_MIN_LINES
+    return bool(workers) and workers > 1 and n >= max(min_size, 2)
+
+
+def _init_worker(job):
+    global _job
+    _job = job
+
+
+def _run_job(bounds):
+    return _job(*bounds)
+
+
+def map_chunks(job: Callable[[int, int], Any],
+               n: int,
+               workers: int = None,
+               min_size: int = None) -> List:
+    """
+    Calls `job` with start and stop of each chunk of a range of `n` items,
+    in `workers` processes, or threads on free-threaded builds, returning
+    results of all chunks in order. With fewer than two workers, or fewer
+    than `min_size` items, `job` is called once, for the whole range, in
+    calling process.
+
+    Where processes can be forked, `job` is inherited by workers, along with
+    any data it refers to, such as lines of a `String`, so it need not be
+    picklable, and only bounds of chunks and their results are passed
+    between processes. Elsewhere, `job` is pickled, once for each worker.
+    Processes are never forked while other threads are running, e.g. those
+    of `extprog.run_many`, since a forked child may deadlock on a lock held
+    by a thread which does not exist in it; chunks then run in threads,
+    which is safe, but only gains time on free-threaded builds.
+
+    Args:
+        job (Callable[[int, int], Any]): Processes items from start to stop.
+        n (int): Number of items.
+        workers (int, optional): Number of workers. Defaults to None, serial.
+        min_size (int, optional): Smallest number of items to process in parallel. Defaults to PARALLEL_MIN_LINES.
+
+    Returns:
+        list: Result of each chunk.
+    """
+    if not in_parallel(n, workers, min_size):
+        return [job(0, n)]
+    bounds = chunk_bounds(n, workers * CHUNKS_PER_WORKER)
+    forkable = "fork" in multiprocessing.get_all_start_methods()
+    if free_threaded() or (forkable and threading.active_count() > 1):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(job, *zip(*bounds)))
+    context = multiprocessing.get_context("fork" if forkable else None)
+    with context.Pool(workers, initializer=_init_worker,
+                      initargs=(job,)) as pool:
+        return pool.map(_run_job, bounds, chunksize=1)
@@ -7,8 +7,65 @@ import os
 import tempfile
 import random
 
+from typing import Dict, Iterable
+
 READ_LIMIT_BYTES = 1 << 30  # Do not attempt to read more than 1GB of data
 
+# Streams are digested in chunks of this many bytes, or characters of text
+# streams, so that memory used does not depend on size of stream.
+CHUNK_SIZE = 1 << 20
+
+DEFAULT_ALGORITHMS = ("sha1", "sha256", "md5")
+
+
+def digests(stream: io.IOBase,
+            algorithms: Iterable[str] = DEFAULT_ALGORITHMS,
+            chunk_size: int = CHUNK_SIZE) -> Dict[str, str]:
+    """
+    Checksums of the rest of `stream`, from its current position to its end,
+    under any number of `hashlib` algorithms at once, in a single pass.
+    Binary streams are read into one reusable buffer, a chunk at a time, so
+    that streams of any size are digested in constant memory, without any
+    copies of their contents. Text of text streams is digested encoded as
+    UTF-8.
+    ```
+    >>> import io
+    >>> from integraty.productivity import digests
+    >>> digests(io.BytesIO(b"integraty"), ("md5", "sha1"))
+    {'md5': '8efd1bbf7320aa67c6ffe7e07018b2b9', 'sha1': '10c4216a2e7471a90e94515e0118864528d49fd0'}
+
+    ```
+    Args:
+        stream (io.IOBase): Binary or text stream to read.
+        algorithms (Iterable[str], optional): Names of algorithms, as `hashlib.new` accepts. Defaults to DEFAULT_ALGORITHMS.
+        chunk_size (int, optional): Bytes or characters read at a time. Defaults to CHUNK_SIZE.
+
+    Returns:
+        Dict[str, str]: Hexadecimal checksum by algorithm.
+    """
+    hashes = {name: hashlib.new(name) for name in algorithms}
+    updates = [h.update for h in hashes.values()]
+    if isinstance(stream, io.TextIOBase):
+        for chunk in iter(lambda: stream.read(chunk_size), ""):
+            chunk = chunk.encode("utf-8")
+            for update in updates:
+                update(chunk)
+    elif hasattr(stream, "readinto"):
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        while True:
+            n = stream.readinto(buf)
+            if not n:
+                break
+            chunk = view[:n]
+            for update in updates:
+                update(chunk)
+    else:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            for update in updates:
+                update(chunk)
+    return {name: h.hexdigest() for name, h in hashes.items()}
+
 
 class RandomStrings:
     _letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
@@ -50,36 +107,35 @@ class ChecksumStringIO:
     def __init__(self, stream: io.StringIO):
         self._stream = stream
 
-    @property
-    def sha1(self):
+    def digests(self, *algorithms: str) -> Dict[str, str]:
+        """
+        Checksums of all text in stream, under each of `algorithms`, in a
+        single pass. Offset of stream is left as it was.
+
+        Args:
+            *algorithms (str): Names of algorithms. Defaults to DEFAULT_ALGORITHMS.
+
+        Returns:
+            Dict[str, str]: Hexadecimal checksum by algorithm.
+        """
         offset = self._stream.tell()
         if offset:
             self._stream.seek(0)  # rewind if necessary
-        digest = hashlib.sha1(
-            self._stream.read(READ_LIMIT_BYTES).encode("utf-8")).hexdigest()
-
+        result = digests(self._stream, algorithms or DEFAULT_ALGORITHMS)
         self._stream.seek(offset)  # reset to original offset
-        return digest
+        return result
+
+    @property
+    def sha1(self):
+        return self.digests("sha1")["sha1"]
 
     @property
     def sha256(self):
-        offset = self._stream.tell()
-        if offset:
-            self._stream.seek(0)  # rewind if necessary
-        digest = hashlib.sha256(
-            self._stream.read(READ_LIMIT_BYTES).encode("utf-8")).hexdigest()
-        self._stream.seek(offset)  # reset to original offset
-        return digest
+        return self.digests("sha256")["sha256"]
 
     @property
     def md5(self):
-        offset = self._stream.tell()
-        if offset:
-            self._stream.seek(0)  # rewind if necessary
-        digest = hashlib.md5(
-            self._stream.read(READ_LIMIT_BYTES).encode("utf-8")).hexdigest()
-        self._stream.seek(offset)  # reset to original offset
-        return digest
+        return self.digests("md5")["md5"]
 
 
 class ChecksumBytesIO:
@@ -87,23 +143,32 @@ class ChecksumBytesIO:
     def __init__(self, stream: io.BytesIO):
         self._stream = stream
 
+    def digests(self, *algorithms: str) -> Dict[str, str]:
+        """
+        Checksums of stream from its current offset, under each of
+        `algorithms`, in a single pass. Stream is then rewound.
+
+        Args:
+            *algorithms (str): Names of algorithms. Defaults to DEFAULT_ALGORITHMS.
+
+        Returns:
+            Dict[str, str]: Hexadecimal checksum by algorithm.
+        """
+        result = digests(self._stream, algorithms or DEFAULT_ALGORITHMS)
+        self._stream.seek(0)  # reset to beginning for next operation
+        return result
+
     @property
     def sha1(self):
-        digest = hashlib.sha1(self._stream.read(READ_LIMIT_BYTES)).hexdigest()
-        self._stream.seek(0)  # reset to beginning for next operation
-        return digest
+        return self.digests("sha1")["sha1"]
 
     @property
     def sha256(self):
-        digest = hashlib.sha256(self._stream.read(READ_LIMIT_BYTES)).hexdigest()
-        self._stream.seek(0)  # reset to beginning for next operation
-        return digest
+        return self.digests("sha256")["sha256"]
 
     @property
     def md5(self):
-        digest = hashlib.md5(self._stream.read(READ_LIMIT_BYTES)).hexdigest()
-        self._stream.seek(0)  # reset to beginning for next operation
-        return digest
+        return self.digests("md5")["md5"]
 
 
 class ChecksumStream:
@@ -115,6 +180,23 @@ class ChecksumStream:
         if not self._stream.closed:
             self._stream.close()
 
+    def digests(self, *algorithms: str) -> Dict[str, str]:
+        """
+        Generate checksums of whole stream, under any number of algorithms,
+        reading it once, a chunk at a time, however large it is.
+
+        Args:
+            *algorithms (str): Names of algorithms, e.g. 'sha256'. Defaults to DEFAULT_ALGORITHMS.
+
+        Returns:
+            Dict[str, str]: Hexadecimal checksum value by algorithm
+        """
+        if self._stream.tell():
+            self._stream.seek(0)
+        result = digests(self._stream, algorithms or DEFAULT_ALGORITHMS)
+        self._stream.seek(0)  # reset to beginning for next operation
+        return result
+
     @property
     def sha1(self):
         """
@@ -123,17 +205,7 @@ class ChecksumStream:
         Returns:
             string: Hexadecimal checksum value
         """
-        if self._stream.tell():
-            self._stream.seek(0)
-        if isinstance(self._stream, io.TextIOBase):
-            digest = hashlib.sha1(
-                self._stream.read(READ_LIMIT_BYTES).encode(
-                    "utf-8")).hexdigest()
-        else:
-            digest = hashlib.sha1(
-                self._stream.read(READ_LIMIT_BYTES)).hexdigest()
-        self._stream.seek(0)  # reset to beginning for next operation
-        return digest
+        return self.digests("sha1")["sha1"]
 
     @property
     def sha256(self):
@@ -143,17 +215,7 @@ class ChecksumStream:
         Returns:
             string: Hexadecimal checksum value
         """
-        if self._stream.tell():
-            self._stream.seek(0)
-        if isinstance(self._stream, io.TextIOBase):
-            digest = hashlib.sha256(
-                self._stream.read(READ_LIMIT_BYTES).encode(
-                    "utf-8")).hexdigest()
-        else:
-            digest = hashlib.sha256(
-                self._stream.read(READ_LIMIT_BYTES)).hexdigest()
-        self._stream.seek(0)  # reset to beginning for next operation
-        return digest
+        return self.digests("sha256")["sha256"]
 
     @property
     def md5(self):
@@ -163,17 +225,7 @@ class ChecksumStream:
         Returns:
             string: Hexadecimal checksum value
         """
-        if self._stream.tell():
-            self._stream.seek(0)
-        if isinstance(self._stream, io.TextIOBase):
-            digest = hashlib.md5(
-                self._stream.read(READ_LIMIT_BYTES).encode(
-                    "utf-8")).hexdigest()
-        else:
-            digest = hashlib.md5(
-                self._stream.read(READ_LIMIT_BYTES)).hexdigest()
-        self._stream.seek(0)  # reset to beginning for next operation
-        return digest
+        return self.digests("md5")["md5"]
 
     @property
     def base64_enc(self):
@@ -298,6 +350,19 @@ class TemporaryFile:
         """
         return self._csum.md5
 
+    def digests(self, *algorithms: str):
+        """
+        Checksums of file content under any number of algorithms, computed
+        in a single pass.
+
+        Args:
+            *algorithms (str): Names of algorithms. Defaults to DEFAULT_ALGORITHMS.
+
+        Returns:
+            Dict[str, str]: Hexadecimal checksum string by algorithm.
+        """
+        return self._csum.digests(*algorithms)
+
     @property
     def content(self):
         offset = self._f.tell()
@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+
+import keyword
+import re
+
+from collections import namedtuple
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, List, Sequence
+
+from integraty.utils import splitter
+
+# Tokens of nullable columns which stand for a missing value.
+NULL_VALUES = ("-", "")
+
+# Most record types made in one pass over lines whose keys come from the
+# lines themselves, e.g. pairs. Lines with yet other keys are left as dicts,
+# since a type per distinct set of keys costs far more than a dict, and is
+# kept alive by every record of it.
+MAX_RECORD_TYPES = 64
+
+RowError = namedtuple("RowError", ["index", "line", "error"])
+RowError.__doc__ = """
+Line which could not be parsed, with its position among parsed lines and
+the exception raised while parsing it.
+"""
+
+
+def _apply(func, arg):
+    return func(arg)
+
+
+class Record(tuple):
+    """
+    Compact, read-only alternative to a dict per line. Values of a record are
+    stored in a tuple, while its keys are stored once, in a key index shared
+    by all records of the same type, i.e. with the same keys, so that a
+    record costs about as much memory as a tuple of its values. Values can
+    be looked up by key, by position, where keys take precedence, and by
+    attribute, where a key is a valid identifier which does not clash with
+    a method of `Record`, though it may hide those of tuple, like `count`.
+    Iterating over a record, comparing it and testing membership work like
+    with a tuple of values. Types of records are made with `record_type`.
+    ```
+    >>> from integraty.schema import record_type
+    >>> r = record_type(('name', 'ttl'))(('cloudflare.com.', '300'))
+    >>> r
+    Record(name='cloudflare.com.', ttl='300')
+    >>> r['ttl'], r[0], r.name
+    ('300', 'cloudflare.com.', 'cloudflare.com.')
+    >>> r.as_dict()
+    {'name': 'cloudflare.com.', 'ttl': '300'}
+
+    ```
+    """
+    __slots__ = ()
+    _keys = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        try:
+            key = self._index[key]
+        except KeyError:
+            if not isinstance(key, int):
+                raise
+        except TypeError:
+            pass  # Slices are unhashable before Python 3.12.
+        return tuple.__getitem__(self, key)
+
+    def __repr__(self):
+        return "{}({})".format(
+            type(self).__name__,
+            ", ".join("{}={!r}".format(k, v) if isinstance(k, str) and
+                      k.isidentifier() else "{!r}: {!r}".format(k, v)
+                      for k, v in zip(self._keys, self)))
+
+    def keys(self):
+        """Keys of record, in order of values."""
+        return self._keys
+
+    def values(self):
+        """Values of record, as a plain tuple."""
+        return tuple(self)
+
+    def items(self):
+        """Key, value pairs of record."""
+        return zip(self._keys, self)
+
+    def get(self, key, default=None):
+        """Value of `key`, or `default` if record has no such key."""
+        i = self._index.get(key)
+        return default if i is None else tuple.__getitem__(self, i)
+
+    def as_dict(self) -> dict:
+        """Converts record into a dict."""
+        return dict(zip(self._keys, self))
+
+
+@lru_cache(maxsize=1024)
+def record_type(keys: tuple, name="Record"):
+    """
+    Makes a `Record` subclass for given keys, or returns one made earlier
+    for the same keys, so that every line with the same keys shares one key
+    index. Instances are made by calling the type with an iterable of values,
+    which must not be longer than keys.
+
+    Args:
+        keys (tuple): Hashable keys of records, e.g. strings or positions.
+        name (str, optional): Name of record type. Defaults to 'Record'.
+
+    Returns:
+        type: Subclass of `Record`.
+    """
+    keys = tuple(keys)
+    # Later of duplicate keys wins, as it would in a dict.
+    namespace = {
+        "__slots__": (),
+        "_keys": keys,
+        "_index": {k: i for i, k in enumerate(keys)},
+    }
+    for i, k in enumerate(keys):
+        if (isinstance(k, str) and k.isidentifier() and
+                not k.startswith("_") and k not in vars(Record)):
+            namespace[k] = property(itemgetter(i))
+    return type(name, (Record,), namespace)
+
+
+def to_record(keys: Sequence, values: Iterable) -> Record:
+    """
+    Makes a record from keys and values, truncated to the shorter of the
+    two, like `dict(zip(keys, values))` does.
+
+    Args:
+        keys (Sequence): Keys of record.
+        values (Iterable): Values of record.
+
+    Returns:
+        Record: Record of type `record_type(keys)`.
+    """
+    values = tuple(values)
+    keys = tuple(keys)
+    if len(keys) != len(values):
+        n = min(len(keys), len(values))
+        keys, values = keys[:n], values[:n]
+    return record_type(keys)(values)
+
+
+def iter_records(rows: Iterable[Sequence],
+                 keys: Sequence = None) -> Iterator[Record]:
+    """
+    Makes a record of each row of values, i.e. a compact counterpart of
+    `dict(zip(keys, row))`, or of `dict(enumerate(row))` without `keys`.
+
+    Args:
+        rows (Iterable[Sequence]): Rows of values, e.g. split lines.
+        keys (Sequence, optional): Keys of records. Defaults to None, positions of values.
+
+    Yields:
+        Record: Record for each row.
+    """
+    types = {}
+    if keys is None:
+        for values in rows:
+            n = len(values)
+            make = types.get(n)
+            if make is None:
+                make = types[n] = record_type(tuple(range(n)))
+            yield make(values)
+        return
+    keys = tuple(keys)
+    width = len(keys)
+    full = record_type(keys)
+    for values in rows:
+        n = len(values)
+        if n == width:
+            yield full(values)
+        elif n > width:
+            yield full(values[:width])
+        else:
+            make = types.get(n)
+            if make is None:
+                make = types[n] = record_type(keys[:n])
+            yield make(values)
+
+
+class _RecordMaker:
+    # Makes records of varying keys, with a type for each of at most
+    # `max_types` distinct sets of keys, and dicts for any others.
+
+    def __init__(self, max_types=MAX_RECORD_TYPES):
+        self.max_types = max_types
+        self.types = {}
+
+    def __call__(self, keys, values):
+        make = self.types.get(keys)
+        if make is None:
+            if len(self.types) >= self.max_types:
+                return dict(zip(keys, values))
+            make = self.types[keys] = record_type(keys)
+        return make(values)
+
+
+def iter_pairs_records(rows: Iterable[Sequence],
+                       max_types: int = MAX_RECORD_TYPES) -> Iterator:
+    """
+    Makes a record of adjacent tokens of each row, like `pairs_record`,
+    as long as rows have no more than `max_types` distinct sets of keys.
+    Rows with keys beyond those become dicts, so that lines of varying keys
+    never take more memory or time than a dict per line would.
+
+    Args:
+        rows (Iterable[Sequence]): Alternating keys and values of each row.
+        max_types (int, optional): Most distinct sets of keys made into records. Defaults to MAX_RECORD_TYPES.
+
+    Yields:
+        Union[Record, dict]: Record, or dict, for each row.
+    """
+    make = _RecordMaker(max_types)
+    for tokens in rows:
+        n = len(tokens) & ~1
+        yield make(tuple(tokens[0:n:2]), tokens[1:n:2])
+
+
+def iter_dict_records(dicts: Iterable[dict],
+                      max_types: int = MAX_RECORD_TYPES) -> Iterator:
+    """
+    Makes a record of each dict, as long as dicts have no more than
+    `max_types` distinct sets of keys. Dicts with keys beyond those are
+    yielded as they are.
+
+    Args:
+        dicts (Iterable[dict]): Dicts to convert.
+        max_types (int, optional): Most distinct sets of keys made into records. Defaults to MAX_RECORD_TYPES.
+
+    Yields:
+        Union[Record, dict]: Record, or dict, for each dict.
+    """
+    make = _RecordMaker(max_types)
+    for d in dicts:
+        keys = tuple(d)
+        if keys in make.types or len(make.types) < make.max_types:
+            yield make(keys, d.values())
+        else:
+            yield d
+
+
+def pairs_record(tokens: Sequence) -> Record:
+    """
+    Makes a record of adjacent tokens, with every other token as a key of
+    the one which follows it, i.e. a compact counterpart of
+    `dict(zip(tokens[::2], tokens[1::2]))`. Every distinct set of keys has
+    a type of its own, so many lines of varying keys are better made into
+    records with `iter_pairs_records`.
+
+    Args:
+        tokens (Sequence): Alternating keys and values.
+
+    Returns:
+        Record: Record of type `record_type(tokens[::2])`.
+    """
+    n = len(tokens) & ~1
+    return record_type(tuple(tokens[0:n:2]))(tokens[1:n:2])
+
+
+class Column:
+    """
+    Column of a `Schema`, with a name and a type, which is any callable
+    converting a token into a value, like `int`, `float` or
+    `ipaddress.ip_address`. A nullable column is None where its token is one
+    of null values of the schema, or where a line ends before the column.
+    """
+    __slots__ = ["name", "type", "nullable"]
+
+    def __init__(self, name: str, type: Callable[[str], Any] = str,
+                 nullable=False):
+        self.name = name
+        self.type = type
+        self.nullable = nullable
+
+    def __repr__(self):
+        return "Column({!r}, type={}, nullable={})".format(
+            self.name, getattr(self.type, "__name__", self.type),
+            self.nullable)
+
+
+class ParseResult:
+    """
+    Records parsed from lines which matched a schema, along with a `RowError`
+    for each line which did not, in the order lines were parsed.
+    """
+    __slots__ = ["rows", "errors"]
+
+    def __init__(self, rows: List, errors: List[RowError]):
+        self.rows = rows
+        self.errors = errors
+
+    def __repr__(self):
+        return "ParseResult({} rows, {} errors)".format(
+            len(self.rows), len(self.errors))
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        return self.rows[i]
+
+    @property
+    def ok(self):
+        """Were all lines parsed?"""
+        return not self.errors
+
+
+class Schema:
+    """
+    Declarative description of tabular output, i.e. names and types of
+    columns of each line, compiled once into a parser which splits a line a
+    single time and converts its tokens into a record. Records are instances
+    of a namedtuple named `name`, which are tuples without a per-instance
+    `__dict__`. Tokens past the last column are ignored. Columns may be given
+    as `Column` instances, as names of `str` columns, or as tuples of
+    arguments to `Column`.
+    ```
+    >>> from integraty.schema import Schema
+    >>> from integraty.xstring import String
+    >>> s = String('microsoft.com. 1800 IN A 40.76.4.15\\nmicrosoft.com. oops IN A 13.77.161.179\\n')
+    >>> res = s.parse(Schema(['name', ('ttl', int), 'class', 'q_type', 'address']))
+    >>> res.rows
+    [Row(name='microsoft.com.', ttl=1800, class_='IN', q_type='A', address='40.76.4.15')]
+    >>> [(e.index, e.error) for e in res.errors]
+    [(1, ValueError("invalid literal for int() with base 10: 'oops'"))]
+
+    ```
+    Names which are not valid field names are adjusted, e.g. Python keywords
+    get an underscore appended, so `class` above becomes `class_`.
+
+    Args:
+        columns (Sequence): Columns of each line.
+        sep (str, Callable, optional): Separator character, regex pattern or splitting function. Defaults to None.
+        maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+        null_values (Sequence[str], optional): Tokens of nullable columns meaning no value. Defaults to NULL_VALUES.
+        name (str, optional): Name of record type. Defaults to 'Row'.
+    """
+
+    def __init__(self,
+                 columns: Sequence,
+                 sep=None,
+                 maxsplit=-1,
+                 null_values=NULL_VALUES,
+                 name="Row"):
+        self.columns = [self._column(c) for c in columns]
+        if not self.columns:
+            raise ValueError("Schema must have at least one column")
+        self.sep = sep
+        self.maxsplit = maxsplit
+        self.null_values = frozenset(null_values)
+        self.record = namedtuple(
+            name, [self._field_name(c.name) for c in self.columns])
+        self._parse = self._compile()
+
+    def __repr__(self):
+        return "Schema({!r}, sep={!r})".format(
+            [c.name for c in self.columns], self.sep)
+
+    @staticmethod
+    def _column(spec):
+        if isinstance(spec, Column):
+            return spec
+        if isinstance(spec, str):
+            return Column(spec)
+        return Column(*spec)
+
+    @staticmethod
+    def _field_name(name):
+        # Field names of a namedtuple must be identifiers, other than
+        # keywords, and must not start with an underscore.
+        name = re.sub(r"\W", "_", name).lstrip("_")
+        if not name.isidentifier():
+            name = "f_" + name
+        if keyword.iskeyword(name):
+            name += "_"
+        return name
+
+    def _compile(self):
+        # Everything which depends only on the schema is worked out here, so
+        # that parsing a line is a split, a conversion of each token and a
+        # construction of a tuple.
+        if self.sep is None and self.maxsplit == -1:
+            split = str.split  # Spares a call through `splitter` per line.
+        else:
+            split = splitter(sep=self.sep, maxsplit=self.maxsplit)
+        # Number of values is always right, so checks done by `_make` of a
+        # namedtuple are unnecessary.
+        make = partial(tuple.__new__, self.record)
+        width = len(self.columns)
+        # Lines may end early only with nullable columns.
+        required = width
+        while required and self.columns[required - 1].nullable:
+            required -= 1
+        converters = tuple(self._converter(c) for c in self.columns)
+
+        def too_few(tokens):
+            return ValueError("Expected at least {} fields, got {}".format(
+                required, len(tokens)))
+
+        if all(c.type is str and not c.nullable for c in self.columns):
+            # Tokens are values already.
+            def parse(line):
+                tokens = split(line)
+                if len(tokens) < width:
+                    raise too_few(tokens)
+                return make(tokens[:width])
+        elif required == width:
+
+            def parse(line):
+                tokens = split(line)
+                if len(tokens) < width:
+                    raise too_few(tokens)
+                return make(map(_apply, converters, tokens))
+        else:
+
+            def parse(line):
+                tokens = split(line)
+                if len(tokens) < required:
+                    raise too_few(tokens)
+                values = list(map(_apply, converters, tokens))
+                values.extend([None] * (width - len(values)))
+                return make(values)
+
+        return parse
+
+    def _converter(self, column):
+        convert, nulls = column.type, self.null_values
+        if not column.nullable:
+            return convert
+        return lambda tok: None if tok in nulls else convert(tok)
+
+    def parse_line(self, line: str):
+        """
+        Parses a single line into a record.
+
+        Args:
+            line (str): Line to parse.
+
+        Raises:
+            ValueError: Line has too few fields, or a token is not valid for its column.
+
+        Returns:
+            tuple: Record of type `record`.
+        """
+        return self._parse(line)
+
+    def iter_parse(self, lines: Iterable[str], errors: List = None) -> Iterator:
+        """
+        Streaming variant of `parse`. Lines which cannot be parsed are
+        appended to `errors` as `RowError`, if given, and skipped otherwise.
+
+        Args:
+            lines (Iterable[str]): Lines to parse.
+            errors (list, optional): Collects lines which could not be parsed. Defaults to None.
+
+        Yields:
+            tuple: Records of type `record`.
+        """
+        parse = self._parse
+        for i, line in enumerate(lines):
+            try:
+                yield parse(line)
+            except Exception as e:
+                if errors is not None:
+                    errors.append(RowError(i, line, e))
+
+    def parse(self, lines: Iterable[str]) -> ParseResult:
+        """
+        Parses lines into records, collecting lines which cannot be parsed,
+        instead of either failing or silently dropping them.
+
+        Args:
+            lines (Iterable[str]): Lines to parse.
+
+        Returns:
+            ParseResult: Records, and errors of lines which could not be parsed.
+        """
+        parse = self._parse
+        rows, errors = [], []
+        append = rows.append
+        # Same as `iter_parse`, without resuming a generator for each line.
+        for i, line in enumerate(lines):
+            try:
+                append(parse(line))
+            except Exception as e:
+                errors.append(RowError(i, line, e))
+        return ParseResult(rows, errors)
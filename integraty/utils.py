@@ -1,9 +1,90 @@
 # -*- coding: utf-8 -*-
 import re
 
+from functools import lru_cache
 from typing import Any, Callable, Dict, Iterable, Iterator, List, TypeVar, Sequence, Sequence
 
 
+# Upper bound on number of distinct compiled patterns kept by compile_pattern.
+PATTERN_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern, flags=0):
+    """
+    Compiles a regular expression, keeping the result in a bounded LRU cache
+    shared by the whole process, so that a pattern used over and over, e.g.
+    on each line of a large output, is only compiled once. Least recently
+    used patterns are evicted once the cache holds `PATTERN_CACHE_SIZE`
+    patterns. Hit and miss counters are available through
+    `compile_pattern.cache_info()`, and the cache is emptied with
+    `compile_pattern.cache_clear()`.
+
+    Args:
+        pattern (str, bytes, re.Pattern): Regular expression to compile.
+        flags (int, optional): Flags passed through to `re.compile`. Defaults to 0.
+
+    Returns:
+        re.Pattern: Compiled regular expression.
+    """
+    return re.compile(pattern, flags)
+
+
+# Characters of a regular expression which do not stand for themselves.
+REGEX_METACHARS = frozenset(".^$*+?{}[]|()")
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def literal_of(pattern):
+    """
+    Text matched by a regular expression which matches nothing but a fixed
+    string, i.e. which has no metacharacters, other than escaped ones, like
+    patterns made by `re.escape`, or None if `pattern` is not like that.
+    Such patterns can be searched for with `in` and `str.find`, which are
+    much faster than `re`.
+    ```
+    >>> from integraty.utils import literal_of
+    >>> literal_of('inet'), literal_of(r'10\\.0\\.0\\.1'), literal_of('inet6?')
+    ('inet', '10.0.0.1', None)
+
+    ```
+    Args:
+        pattern (str): Regular expression.
+
+    Returns:
+        str: Text matched by `pattern`, or None.
+    """
+    if not isinstance(pattern, str) or not pattern:
+        return None
+    if "\\" not in pattern:
+        return None if REGEX_METACHARS.intersection(pattern) else pattern
+    chars = []
+    escaped = False
+    for ch in pattern:
+        if escaped:
+            # Escaped letters and digits are classes, anchors or references.
+            if ch.isalnum() or ch == "_":
+                return None
+            chars.append(ch)
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch in REGEX_METACHARS:
+            return None
+        else:
+            chars.append(ch)
+    return None if escaped else "".join(chars)
+
+
+def _bin_popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+# Number of bits set in an integer, by `int.bit_count` where there is one,
+# i.e. from Python 3.10 on, which is much faster for large integers.
+popcount = getattr(int, "bit_count", _bin_popcount)
+
+
 def stripper(w, chars):
     if not chars:
         return w
@@ -93,14 +174,29 @@ class Split:
         self._s = string
 
     def __call__(self, sep=None, maxsplit=-1):
-        if isinstance(sep, Callable):
-            return [i for i in sep(self._s) if i]
-        if not sep or len(sep) == 1:
-            return [i for i in self._s.split(sep=sep, maxsplit=maxsplit) if i]
-        else:
-            pat = re.compile(sep)  # Assumes a regex pattern
-            return [
-                i for i in re.split(
-                    pat, self._s, maxsplit=0 if maxsplit == -1 else maxsplit)
-                if i
-            ]
+        return splitter(sep=sep, maxsplit=maxsplit)(self._s)
+
+
+def splitter(sep=None, maxsplit=-1) -> Callable[[str], List[str]]:
+    """
+    Builds a function which splits a string into tokens exactly like `Split`
+    does, but with all decisions about `sep` made up front, and a regex
+    pattern, if any, compiled once. Meant for splitting many lines in a row.
+
+    Args:
+        sep (str, Callable, optional): Separator character, regex pattern or splitting function. Defaults to None.
+        maxsplit (int, optional): Split string at most this many times. Defaults to `-1`, no limit.
+
+    Returns:
+        Callable[[str], List[str]]: Function returning a list of non-empty tokens.
+    """
+    if isinstance(sep, Callable):
+        return lambda s: [i for i in sep(s) if i]
+    if sep is None:
+        # Splitting on runs of whitespace never produces empty tokens.
+        return lambda s: s.split(None, maxsplit)
+    if not sep or len(sep) == 1:
+        return lambda s: [i for i in s.split(sep, maxsplit) if i]
+    pat_split = compile_pattern(sep).split  # Assumes a regex pattern
+    maxsplit = 0 if maxsplit == -1 else maxsplit
+    return lambda s: [i for i in pat_split(s, maxsplit) if i]
@@ -0,0 +1,915 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import mmap as _mmap
+
+from collections import Counter, deque
+from functools import partial
+from typing import Any, Callable, Iterator, List
+
+from integraty.schema import iter_pairs_records, iter_records
+from integraty.utils import Map, compile_pattern, splitter, stripper
+from integraty.xstring import PCHARS, filter_lines, to_columns
+
+# Bytes which `bytes.splitlines` treats as line boundaries, along with ASCII
+# separators which `str.splitlines` also treats as such. None of these bytes
+# ever occurs within a multi-byte UTF-8 sequence.
+BYTE_LINE_BREAKS = b"\n\r\x0b\x0c\x1c\x1d\x1e"
+
+BYTE_LINE_RE = compile_pattern(b"[^" + BYTE_LINE_BREAKS + b"]+")
+
+
+class Bytes:
+    """
+    Counterpart of `String` for raw output, which works on bytes, or on any
+    other object supporting the buffer protocol, like a memoryview or mmap,
+    without decoding it first. Lines are found, filtered and split with byte
+    regular expressions, and only what is returned, i.e. selected lines or
+    tokens, is decoded, using `encoding` and `errors`. Output which is not
+    valid in `encoding` therefore does not prevent extraction of what is.
+
+    Patterns, separators, prefixes and the like may be given either as
+    `str`, in which case they are encoded with `encoding`, or as `bytes`.
+    Regular expressions match bytes, so classes like `\\w` and `\\s` only
+    match ASCII characters. Lines are split on ASCII line breaks only, and
+    are stripped of ASCII whitespace, otherwise lines are the same as those
+    of `String`. Nothing besides the data itself is kept, each call scans
+    the data anew.
+    ```
+    >>> from integraty.xbytes import Bytes
+    >>> b = Bytes(b'eth0 up \\xff\\xfe\\neth1 down caf\\xc3\\xa9\\n')
+    >>> b.take_column(column=1)
+    ['up', 'down']
+    >>> b.count(pattern='down')
+    1
+    >>> b.lines()
+    ['eth0 up ��', 'eth1 down café']
+
+    ```
+    Args:
+        data (bytes, memoryview, mmap): Data to process.
+        encoding (str, optional): Encoding of returned text. Defaults to 'utf-8'.
+        errors (str, optional): Handling of undecodable bytes, see `bytes.decode`. Defaults to 'replace'.
+    """
+    __slots__ = ["_b", "encoding", "errors"]
+
+    def __init__(self, data, encoding="utf-8", errors="replace"):
+        self._b = data
+        self.encoding = encoding
+        self.errors = errors
+
+    def __repr__(self):
+        rep = bytes(self._b[:10])
+        if len(self._b) > 10:
+            rep += b"..."
+        return "Bytes({!r})".format(rep)
+
+    def __len__(self):
+        return len(self._b)
+
+    def __bytes__(self):
+        return bytes(self._b)
+
+    def __eq__(self, other):
+        if isinstance(other, Bytes):
+            other = other._b
+        return self._b == other
+
+    __hash__ = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    @classmethod
+    def from_file(cls, path, mmap=True, encoding="utf-8", errors="replace"):
+        """
+        Opens a file for extraction. With `mmap` set, data is not read, but
+        memory mapped instead, so that pages of the file are read by the OS
+        as they are scanned, and a file of any size may be processed without
+        copying it into memory. Only lines and tokens which are returned are
+        ever copied. Mapping stays open until `close` is called, or `Bytes`
+        is used as a context manager and left.
+        ```
+        >>> import tempfile
+        >>> from integraty.xbytes import Bytes
+        >>> with tempfile.NamedTemporaryFile(suffix='.log') as f:
+        ...     _ = f.write(b'alpha 1\\nbeta 2\\n')
+        ...     f.flush()
+        ...     with Bytes.from_file(f.name) as b:
+        ...         b.take_column(column=1, pattern='beta')
+        ['2']
+
+        ```
+        Args:
+            path (str): Path of the file.
+            mmap (bool, optional): Memory map the file, rather than read it. Defaults to True.
+            encoding (str, optional): Encoding of returned text. Defaults to 'utf-8'.
+            errors (str, optional): Handling of undecodable bytes, see `bytes.decode`. Defaults to 'replace'.
+
+        Returns:
+            Bytes: Contents of the file.
+        """
+        with open(path, "rb") as f:
+            if not mmap:
+                return cls(f.read(), encoding=encoding, errors=errors)
+            try:
+                data = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+            except ValueError:  # Empty files cannot be mapped.
+                return cls(b"", encoding=encoding, errors=errors)
+        # Mapping outlives the file object, and is read front to back.
+        if hasattr(_mmap, "MADV_SEQUENTIAL"):
+            data.madvise(_mmap.MADV_SEQUENTIAL)
+        return cls(data, encoding=encoding, errors=errors)
+
+    def close(self):
+        """Releases underlying data, if it can be closed, like a mapping."""
+        close = getattr(self._b, "close", None)
+        if close:
+            close()
+
+    def decode(self):
+        """
+        Decodes all data at once, for cases where all of it is needed as text.
+
+        Returns:
+            str: Decoded data.
+        """
+        return self._decode(self._b)
+
+    ### Bytes Processing Private Methods Below ###
+
+    def _decode(self, data):
+        return str(data, self.encoding, self.errors)
+
+    def _encode(self, value):
+        # Arguments given as text are matched against data as bytes.
+        if isinstance(value, str):
+            return value.encode(self.encoding)
+        return value
+
+    def _scanlines(self):
+        return (m.group().strip() for m in BYTE_LINE_RE.finditer(self._b))
+
+    def _iter_lines(self,
+                    sub_pattern=None,
+                    replacement=None,
+                    pattern=None,
+                    exclude=False):
+        return filter_lines(
+            self._scanlines(),
+            sub_pattern=self._encode(sub_pattern),
+            replacement=self._encode(replacement),
+            pattern=self._encode(pattern),
+            exclude=exclude,
+        )
+
+    def _iter_tokens(self,
+                     sep=None,
+                     maxsplit=-1,
+                     sub_pattern=None,
+                     replacement=None,
+                     pattern=None,
+                     exclude=False):
+        return map(
+            splitter(sep=self._encode(sep), maxsplit=maxsplit),
+            self._iter_lines(
+                sub_pattern=sub_pattern,
+                replacement=replacement,
+                pattern=pattern,
+                exclude=exclude,
+            ))
+
+    def _decode_tokens(self, tokens):
+        return tuple(map(self._decode, tokens))
+
+    ### End Bytes Processing Private Methods ###
+
+    ### Bytes Processing Public Methods Below ###
+
+    def count(self, pattern=None, exclude=False):
+        """
+        Count number of lines in input, without decoding any of them.
+
+        Args:
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            int: Count of lines in input.
+        """
+        return sum(1 for _ in self._iter_lines(pattern=pattern,
+                                               exclude=exclude))
+
+    def lines(self,
+              sub_pattern=None,
+              replacement=None,
+              pattern=None,
+              exclude=False):
+        """
+        Lines from input, optionally filtered with regular expression in
+        `pattern`.
+
+        Args:
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lines.
+        """
+        return list(
+            self.iter_lines(sub_pattern=sub_pattern,
+                            replacement=replacement,
+                            pattern=pattern,
+                            exclude=exclude))
+
+    def iter_lines(self,
+                   sub_pattern=None,
+                   replacement=None,
+                   pattern=None,
+                   exclude=False) -> Iterator[str]:
+        """
+        Streaming variant of `lines`.
+
+        Args:
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Yields:
+            str: Lines from input.
+        """
+        return map(
+            self._decode,
+            self._iter_lines(sub_pattern=sub_pattern,
+                             replacement=replacement,
+                             pattern=pattern,
+                             exclude=exclude))
+
+    def firstn(self,
+               n=1,
+               sub_pattern=None,
+               replacement=None,
+               pattern=None,
+               exclude=False):
+        """
+        Select first n lines from input. Scanning stops after n-th line.
+
+        Args:
+            n (int, optional): Number of lines to select. Defaults to 1.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of at most n lines.
+        """
+        if n < 1:
+            raise ValueError("Number of lines cannot be less than '1'")
+        lines = self._iter_lines(sub_pattern=sub_pattern,
+                                 replacement=replacement,
+                                 pattern=pattern,
+                                 exclude=exclude)
+        return list(map(self._decode, itertools.islice(lines, n)))
+
+    def lastn(self,
+              n=1,
+              sub_pattern=None,
+              replacement=None,
+              pattern=None,
+              exclude=False):
+        """
+        Select last n lines from input. Only last n lines are kept while
+        scanning, and only they are decoded.
+
+        Args:
+            n (int, optional): Number of lines to select. Defaults to 1.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of at most n lines.
+        """
+        if n < 1:
+            raise ValueError("Number of lines cannot be less than '1'")
+        lines = self._iter_lines(sub_pattern=sub_pattern,
+                                 replacement=replacement,
+                                 pattern=pattern,
+                                 exclude=exclude)
+        return list(map(self._decode, deque(lines, maxlen=n)))
+
+    def with_prefix(
+        self,
+        prefix,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Limits included lines from input to those starting with `prefix`.
+
+        Args:
+            prefix (str, bytes): Select lines starting with this prefix.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lines starting with prefix.
+        """
+        prefix = self._encode(prefix) or b""
+        lines = self._iter_lines(sub_pattern=sub_pattern,
+                                 replacement=replacement,
+                                 pattern=pattern,
+                                 exclude=exclude)
+        return [self._decode(l) for l in lines if l.startswith(prefix)]
+
+    def with_suffix(
+        self,
+        suffix,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Limits included lines from input to those ending with `suffix`.
+
+        Args:
+            suffix (str, bytes): Select lines ending with this suffix.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lines ending with suffix.
+        """
+        suffix = self._encode(suffix) or b""
+        lines = self._iter_lines(sub_pattern=sub_pattern,
+                                 replacement=replacement,
+                                 pattern=pattern,
+                                 exclude=exclude)
+        return [self._decode(l) for l in lines if l.endswith(suffix)]
+
+    def line_tuples(
+        self,
+        sep=None,
+        maxsplit=-1,
+        strip_punct=False,
+        strip_chars=PCHARS,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Split lines from input into tuples with `sep` as optional separator.
+
+        Args:
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            strip_punct (bool, optional): Strip punctuation from each token. Defaults to False.
+            strip_chars (str, optional): Characters to strip with `strip_punct`. Defaults to PCHARS.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples, one per line.
+        """
+        tokenized = self._iter_tokens(sep=sep,
+                                      maxsplit=maxsplit,
+                                      sub_pattern=sub_pattern,
+                                      replacement=replacement,
+                                      pattern=pattern,
+                                      exclude=exclude)
+        if strip_punct:
+            return [
+                tuple(stripper(tok, strip_chars)
+                      for tok in self._decode_tokens(tokens))
+                for tokens in tokenized if tokens
+            ]
+        return [self._decode_tokens(tokens) for tokens in tokenized if tokens]
+
+    def head(
+        self,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Select first column of each line from input, after splitting on `sep`.
+
+        Args:
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of first columns.
+        """
+        return self.take_column(sep=sep,
+                                maxsplit=maxsplit,
+                                column=0,
+                                sub_pattern=sub_pattern,
+                                replacement=replacement,
+                                pattern=pattern,
+                                exclude=exclude)
+
+    def tail(
+        self,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Select all but first column of each line from input, after splitting
+        on `sep`.
+
+        Args:
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples with all but first column of each line.
+        """
+        tokenized = self._iter_tokens(sep=sep,
+                                      maxsplit=maxsplit,
+                                      sub_pattern=sub_pattern,
+                                      replacement=replacement,
+                                      pattern=pattern,
+                                      exclude=exclude)
+        return [self._decode_tokens(tokens[1:]) for tokens in tokenized]
+
+    def fields(
+        self,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Split each line from input into fields and join each column into a
+        tuple, stopping at the shortest line.
+        ```
+        >>> from integraty.xbytes import Bytes
+        >>> Bytes(b'alpha beta gamma\\ndelta epsilon zeta\\n').fields()
+        [('alpha', 'delta'), ('beta', 'epsilon'), ('gamma', 'zeta')]
+
+        ```
+        Args:
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples, one per column.
+        """
+        tokenized = self._iter_tokens(sep=sep,
+                                      maxsplit=maxsplit,
+                                      sub_pattern=sub_pattern,
+                                      replacement=replacement,
+                                      pattern=pattern,
+                                      exclude=exclude)
+        return [self._decode_tokens(column) for column in zip(*tokenized)]
+
+    def take_column(
+        self,
+        sep=None,
+        maxsplit=-1,
+        column=0,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Take a single column out of each line from input, after splitting the
+        line on `sep`. Only the selected column is decoded.
+
+        Args:
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            column (int, optional): Select column matching this index. Defaults to 0.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of elements extracted from each split line.
+        """
+        return list(
+            self.iter_take_column(sep=sep,
+                                  maxsplit=maxsplit,
+                                  column=column,
+                                  sub_pattern=sub_pattern,
+                                  replacement=replacement,
+                                  pattern=pattern,
+                                  exclude=exclude))
+
+    def iter_take_column(
+        self,
+        sep=None,
+        maxsplit=-1,
+        column=0,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ) -> Iterator[str]:
+        """
+        Streaming variant of `take_column`.
+
+        Args:
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            column (int, optional): Select column matching this index. Defaults to 0.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Yields:
+            str: Element extracted from each split line.
+        """
+        tokenized = self._iter_tokens(sep=sep,
+                                      maxsplit=maxsplit,
+                                      sub_pattern=sub_pattern,
+                                      replacement=replacement,
+                                      pattern=pattern,
+                                      exclude=exclude)
+        return (self._decode(tokens[column].strip()) for tokens in tokenized)
+
+    def compress(
+        self,
+        sep=None,
+        maxsplit=-1,
+        indexes=(),
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Select one or more fields from each line from input, after splitting
+        the line on `sep`. Only selected fields are decoded.
+
+        Args:
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            indexes (tuple, optional): Indexes of fields to select. Defaults to ().
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples with selected fields from each line.
+        """
+        if not indexes or not isinstance(indexes, tuple):
+            raise ValueError(
+                "Argument 'indexes' must be a tuple with at least one index")
+        selectors = tuple(i in indexes for i in range(0, max(indexes) + 1))
+        tokenized = self._iter_tokens(sep=sep,
+                                      maxsplit=maxsplit,
+                                      sub_pattern=sub_pattern,
+                                      replacement=replacement,
+                                      pattern=pattern,
+                                      exclude=exclude)
+        return [
+            self._decode_tokens(itertools.compress(tokens, selectors))
+            for tokens in tokenized
+        ]
+
+    def take_range_fields(
+        self,
+        sep=None,
+        maxsplit=-1,
+        slc_range=(0, 1, 1),
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Select fields within `slc_range` from each line from input, after
+        splitting the line on `sep`. Only selected fields are decoded.
+
+        Args:
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            slc_range (tuple, optional): Arguments of slice selecting fields. Defaults to (0, 1, 1).
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lists with selected fields from each line.
+        """
+        slc_obj = slice(*slc_range)
+        tokenized = self._iter_tokens(sep=sep,
+                                      maxsplit=maxsplit,
+                                      sub_pattern=sub_pattern,
+                                      replacement=replacement,
+                                      pattern=pattern,
+                                      exclude=exclude)
+        return [
+            list(self._decode_tokens(tokens[slc_obj])) for tokens in tokenized
+        ]
+
+    def to_dict(self,
+                keys=None,
+                sep=None,
+                maxsplit=-1,
+                pattern=None,
+                exclude=False,
+                compact=False):
+        """
+        Converts input lines into dicts, where `keys` is a list of keys which
+        are zipped with contents of split line. Without `keys`, each dict is
+        keyed by position of fields in line.
+
+        Args:
+            keys (Sequence, optional): Keys to zip with fields of each line. Defaults to None.
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+            compact (bool, optional): Return a `Record` instead of a dict for each line. Defaults to False.
+
+        Returns:
+            list: List of dicts, or records, one per line.
+        """
+        tokenized = self._iter_tokens(sep=sep,
+                                      maxsplit=maxsplit,
+                                      pattern=pattern,
+                                      exclude=exclude)
+        # Blank lines are skipped, as `String.to_dict` does.
+        tokenized = filter(None, tokenized)
+        if compact:
+            return list(
+                iter_records((list(self._decode_tokens(tokens))
+                              for tokens in tokenized),
+                             keys=keys or None))
+        if keys:
+            return [
+                dict(zip(keys, self._decode_tokens(tokens[:len(keys)])))
+                for tokens in tokenized
+            ]
+        return [
+            dict(enumerate(self._decode_tokens(tokens)))
+            for tokens in tokenized
+        ]
+
+    def pairs(
+        self,
+        as_dict=False,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        compact=False,
+    ):
+        """
+        Split each line from input into fields and group consecutive fields
+        into pairs, e.g. keys and values.
+        ```
+        >>> from integraty.xbytes import Bytes
+        >>> Bytes(b'rx 10 tx 20\\n').pairs(as_dict=True)
+        [{'rx': '10', 'tx': '20'}]
+
+        ```
+        Args:
+            as_dict (bool, optional): Return dicts instead of tuples of pairs. Defaults to False.
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+            compact (bool, optional): With `as_dict`, return a `Record` instead of a dict for each line, for up to `MAX_RECORD_TYPES` distinct sets of keys, leaving lines with any others as dicts. Defaults to False.
+
+        Returns:
+            list: List of tuples of pairs, or dicts, one per line.
+        """
+        tokenized = self._iter_tokens(sep=sep,
+                                      maxsplit=maxsplit,
+                                      sub_pattern=sub_pattern,
+                                      replacement=replacement,
+                                      pattern=pattern,
+                                      exclude=exclude)
+        if as_dict and compact:
+            return list(
+                iter_pairs_records(
+                    list(self._decode_tokens(tokens)) for tokens in tokenized))
+        pairs = (zip(*[iter(self._decode_tokens(tokens))] * 2)
+                 for tokens in tokenized)
+        if as_dict:
+            return [dict(p) for p in pairs]
+        return [tuple(p) for p in pairs]
+
+    def filter_func(
+        self,
+        func: Callable[[str], bool],
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ) -> List[str]:
+        """
+        Filters lines from input with function `func`, which is called with
+        each line decoded, or with each line excluded by `func` if `exclude`
+        is set.
+
+        Args:
+            func (Callable[[str], bool]): Filtering function.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching and filtering. Defaults to False.
+
+        Returns:
+            list: List of lines selected by `func`.
+        """
+        lines = self.iter_lines(sub_pattern=sub_pattern,
+                                replacement=replacement,
+                                pattern=pattern,
+                                exclude=exclude)
+        if exclude:
+            return list(itertools.filterfalse(func, lines))
+        return list(filter(func, lines))
+
+    def map_func(
+        self,
+        func: Callable[[str], Any],
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ) -> List[Any]:
+        """
+        Maps function `func` over each line from input, decoded.
+
+        Args:
+            func (Callable[[str], Any]): Function called with each line.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of results of calling `func`.
+        """
+        return list(
+            map(
+                func,
+                self.iter_lines(sub_pattern=sub_pattern,
+                                replacement=replacement,
+                                pattern=pattern,
+                                exclude=exclude)))
+
+    def filtered_map(
+        self,
+        map_func: Callable[[str], Any],
+        filter_func: Callable[[str], bool],
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ) -> List[Any]:
+        """
+        Maps function `map_func` over each line from input, decoded, for
+        which `filter_func` returns True.
+
+        Args:
+            map_func (Callable[[str], Any]): Function called with each selected line.
+            filter_func (Callable[[str], bool]): Filtering function.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of results of calling `map_func`.
+        """
+        lines = self.iter_lines(sub_pattern=sub_pattern,
+                                replacement=replacement,
+                                pattern=pattern,
+                                exclude=exclude)
+        return list(Map(filter_func, map_func)(lines))
+
+    def groupby_count(
+        self,
+        key_func: Callable[[str], Any],
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Counts lines from input in groups, given by key function `key_func`
+        called with each line, decoded.
+
+        Args:
+            key_func (Callable[[str], Any]): For each line generate a key to establish a group to which the line will be added.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            dict: A dictionary of Any -> int with count for each distinct group.
+        """
+        return dict(
+            Counter(
+                map(
+                    key_func,
+                    self.iter_lines(sub_pattern=sub_pattern,
+                                    replacement=replacement,
+                                    pattern=pattern,
+                                    exclude=exclude))))
+
+    def columns(
+        self,
+        columns=(0, ),
+        types=str,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        use_numpy=None,
+    ):
+        """
+        Extracts one or more columns from each line from input into typed
+        buffers, one per column, see `String.columns`. Numbers are parsed
+        straight from bytes, and only tokens of `str` columns are decoded.
+        ```
+        >>> from integraty.xbytes import Bytes
+        >>> Bytes(b'alpha 10 0.5\\nbeta 20 1.5\\n').columns((1, 2), (int, float), use_numpy=False)
+        [array('q', [10, 20]), array('d', [0.5, 1.5])]
+
+        ```
+        Args:
+            columns (tuple, optional): Indexes of columns to extract. Defaults to (0,).
+            types (type, Sequence, optional): Type of all columns, or of each column; `int`, `float`, `str` or an `array` typecode. Defaults to str.
+            sep (str, bytes, optional): Separator character or pattern. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sub_pattern (str, bytes, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, bytes, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, bytes, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+            use_numpy (bool, optional): Build NumPy arrays, or never do, or if None, only if NumPy is installed. Defaults to None.
+
+        Returns:
+            list: List of columns, in order of `columns`.
+        """
+        tokenized = partial(self._iter_tokens,
+                            sep=sep,
+                            maxsplit=maxsplit,
+                            sub_pattern=sub_pattern,
+                            replacement=replacement,
+                            pattern=pattern,
+                            exclude=exclude)
+        return to_columns(tokenized,
+                          types,
+                          columns=columns,
+                          use_numpy=use_numpy,
+                          decode=self._decode)
+
+    ### End Bytes Processing Public Methods ###
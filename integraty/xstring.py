@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import array
+import heapq
 import itertools
 import json
 import re
@@ -7,18 +9,268 @@ import sys
 
 from collections import Counter, defaultdict
 from functools import partial, reduce
+from operator import itemgetter
 from typing import Any, Callable, Dict, Iterable, Iterator, List, TypeVar, Sequence, Sequence
 
-from integraty.utils import Map, Split
-from integraty.utils import apply_filtered, map_if_possible, stripper
+from integraty.aggregate import GroupBy, HyperLogLog, Histogram, Reservoir, SpaceSaving
+from integraty.aggregate import getter, quantiles
+from integraty.multipattern import MultiPattern
+from integraty.parallel import in_parallel, map_chunks
+from integraty.schema import ParseResult, Schema, iter_dict_records, iter_pairs_records, iter_records
+from integraty.utils import Map, Split, splitter
+from integraty.utils import apply_filtered, compile_pattern, literal_of, map_if_possible, stripper
 
 PCHARS = r'!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'
 
+# Characters which `str.splitlines` treats as line boundaries.
+LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+# Non-empty lines, i.e. what `str.splitlines` yields after dropping empty
+# strings, are exactly the maximal runs of characters which are not breaks.
+LINE_RE = re.compile("[^%s]+" % LINE_BREAKS)
+
+LINE_BREAKS_RE = re.compile("[%s]" % LINE_BREAKS)
+
+# Before input is indexed, lines containing a plain word are found by
+# searching whole input for it, unless it occurs more often than this many
+# times per line, in which case building the index and searching each line
+# is faster.
+FIND_LINES_MAX_DENSITY = 0.1
+
+
+class LineIndex:
+    """
+    Index of lines in a string, built once and then shared by all methods of
+    a `String` instance, instead of splitting the string on every call.
+    Entirely empty lines are dropped and every remaining line is stored
+    stripped of leading and trailing whitespace. Offsets of lines in the
+    original string are only computed when first requested.
+    """
+    __slots__ = ["_s", "lines", "_offsets"]
+
+    def __init__(self, string: str):
+        self._s = string
+        # We silently drop any entirely empty lines, which after splitting
+        # would basically be come an empty string, i.e. ''.
+        self.lines = [l.strip() for l in string.splitlines() if l]
+        self._offsets = None
+
+    def __len__(self):
+        return len(self.lines)
+
+    @property
+    def offsets(self) -> List[int]:
+        """
+        Offset of the first character of each indexed line in the original
+        string. Offsets line up with `lines`, i.e. `offsets[i]` is where the
+        unstripped `lines[i]` begins.
+
+        Returns:
+            list: List of integer offsets; one per line.
+        """
+        if self._offsets is None:
+            self._offsets = [m.start() for m in LINE_RE.finditer(self._s)]
+        return self._offsets
+
+
+def filter_lines(lines: Iterable[str],
+                 sub_pattern=None,
+                 replacement=None,
+                 pattern=None,
+                 exclude=False) -> Iterator[str]:
+    """
+    Filtering and substitution stages of the line processing pipeline used
+    by `String`, usable with any iterable of lines, such as lines streamed
+    from a running command. Stages are chained lazily, so each line passes
+    through all of them in a single pass, and no intermediate lists are
+    built. Substitution of all `sub_pattern` matches for `replacement` occurs
+    after lines have been filtered based on `pattern`, not before.
+    ```
+    >>> from integraty.xstring import filter_lines
+    >>> list(filter_lines(['alpha 1', 'beta 2'], sub_pattern=r'\\d', replacement='N', pattern='^b'))
+    ['beta N']
+
+    ```
+    Args:
+        lines (Iterable[str]): Lines to process.
+        sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+        replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+        pattern (str, optional): Select lines matching pattern. Defaults to None.
+        exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+    Returns:
+        Iterator[str]: Lines remaining after filtering and substitution.
+    """
+    lines = iter(lines)
+    literal = literal_of(pattern)
+    if literal:
+        # Plain words are found with `in`, about twice as fast as `re`.
+        if exclude:
+            lines = (line for line in lines if literal not in line)
+        else:
+            lines = (line for line in lines if literal in line)
+    elif pattern:
+        search = compile_pattern(pattern).search
+        if exclude:
+            lines = itertools.filterfalse(search, lines)
+        else:
+            lines = filter(search, lines)
+    # Apply substitution if there's a pattern, otherwise lines are passed
+    # through untouched.
+    if sub_pattern:
+        lines = map(partial(compile_pattern(sub_pattern).sub, replacement),
+                    lines)
+    return lines
+
+
+def _chunk_task(task, lines, filters, start, stop):
+    # Runs `task` over lines of a chunk of the line index, after the
+    # filtering and substitution stages of the pipeline.
+    if start or stop < len(lines):
+        lines = lines[start:stop]
+    return task(filter_lines(lines, **filters))
+
+
+def _map_task(func, lines):
+    return list(map(func, lines))
+
+
+def _filter_task(func, exclude, lines):
+    if exclude:
+        return [line for line in lines if not func(line)]
+    return [line for line in lines if func(line)]
+
+
+def _filtered_map_task(map_filter, lines):
+    return list(map_filter(lines))
+
+
+def _count_task(key_func, lines):
+    return Counter(map(key_func, lines))
+
+
+def _concat(chunks):
+    if len(chunks) == 1:
+        return chunks[0]
+    return list(itertools.chain.from_iterable(chunks))
+
+
+# Typecodes of `array.array` columns holding values of given Python types.
+TYPECODES = {int: "q", float: "d"}
+
+
+def to_columns(rows: Iterable[Sequence],
+               types: Sequence,
+               columns: Sequence[int] = None,
+               use_numpy=None,
+               decode=None) -> List:
+    """
+    Transposes rows of tokens into one buffer per column, converting all
+    tokens of a column at once. Numeric columns become NumPy arrays if NumPy
+    is installed, or `array.array` otherwise, so that they can be aggregated
+    without looping over values in Python. Columns of `str` are NumPy arrays
+    of strings, or plain lists without NumPy. Rows may also be given as a
+    function returning a new iterable of rows each time it is called, which
+    is then called once per column, so that only tokens of a single column
+    are ever held, rather than all rows.
+    ```
+    >>> from integraty.xstring import to_columns
+    >>> to_columns([('a', '1', '0.5'), ('b', '2', '1.5')], (str, int, float), use_numpy=False)
+    [['a', 'b'], array('q', [1, 2]), array('d', [0.5, 1.5])]
+
+    ```
+    Args:
+        rows (Iterable[Sequence], Callable[[], Iterable[Sequence]]): Rows with one token per column, or function returning them.
+        types (type, Sequence): Type of all columns, or of each column; `int`, `float`, `str` or an `array` typecode.
+        columns (Sequence[int], optional): Indexes of columns to take from each row, rather than all of them. Defaults to None.
+        use_numpy (bool, optional): Build NumPy arrays, or never do, or if None, only if NumPy is installed. Defaults to None.
+        decode (Callable, optional): Converts tokens of `str` columns, e.g. from bytes. Defaults to None.
+
+    Returns:
+        list: List of columns.
+    """
+    np = None
+    if use_numpy is not False:
+        try:
+            import numpy as np
+        except ImportError:
+            if use_numpy:
+                raise
+    if not callable(rows):
+        rows = list(rows)
+        if columns is None:
+            columns = range(min(map(len, rows), default=0))
+        rows = partial(iter, rows)
+    elif columns is None:
+        raise ValueError(
+            "Argument 'columns' is required with rows given as a function")
+    if not isinstance(types, (tuple, list)):
+        types = (types, ) * len(columns)
+    if len(types) != len(columns):
+        raise ValueError(
+            "Arguments 'columns' and 'types' must be of equal length")
+    # Tokens of each column are picked out of rows in C, one column at a
+    # time, avoiding a tuple per row, which transposing with zip() needs.
+    return [
+        _to_column(list(map(itemgetter(column), rows())), type_, np, decode)
+        for column, type_ in zip(columns, types)
+    ]
+
+
+def _to_column(tokens, type_, np, decode):
+    if type_ is str:
+        tokens = [t.strip() for t in tokens]
+        if decode:
+            tokens = list(map(decode, tokens))
+        return tokens if np is None else np.array(tokens, dtype=str)
+    if np is not None:
+        # NumPy parses numbers out of arrays of strings by itself.
+        dtype = {int: np.int64, float: np.float64}.get(type_, type_)
+        return np.array(tokens).astype(dtype)
+    typecode = TYPECODES.get(type_, type_)
+    convert = float if typecode in "fd" else int
+    return array.array(typecode, map(convert, tokens))
+
 
 class String(str):
 
     def __init__(self, string: str):
         self._s = string
+        self._index = None
+
+    @classmethod
+    def from_file(cls, path, mmap=False, encoding="utf-8", errors="strict"):
+        """
+        Reads a file into a String. A `str` always holds all of its text in
+        memory, so with `mmap` set, the file is memory mapped and returned as
+        `xbytes.Bytes` instead, which has the same extraction API, but only
+        reads pages of the file as they are scanned and only decodes lines
+        and tokens which are returned. This is the way to go with captured
+        output too large to comfortably fit in memory.
+        ```
+        >>> import tempfile
+        >>> from integraty.xstring import String
+        >>> with tempfile.NamedTemporaryFile(suffix='.log') as f:
+        ...     _ = f.write(b'alpha 1\\nbeta 2\\n')
+        ...     f.flush()
+        ...     String.from_file(f.name).lines(), String.from_file(f.name, mmap=True).lines()
+        (['alpha 1', 'beta 2'], ['alpha 1', 'beta 2'])
+
+        ```
+        Args:
+            path (str): Path of the file.
+            mmap (bool, optional): Memory map the file and return `Bytes`. Defaults to False.
+            encoding (str, optional): Encoding of the file. Defaults to 'utf-8'.
+            errors (str, optional): Handling of undecodable bytes, see `bytes.decode`. Defaults to 'strict'.
+
+        Returns:
+            String, Bytes: Contents of the file.
+        """
+        if mmap:
+            from integraty.xbytes import Bytes
+            return Bytes.from_file(path, encoding=encoding, errors=errors)
+        with open(path, encoding=encoding, errors=errors) as f:
+            return cls(f.read())
 
     def __repr__(self):
         if len(self._s) > 10:
@@ -34,47 +286,149 @@ class String(str):
                          replacement=None,
                          pattern=None,
                          exclude=False):
-        return self._lines(
+        return self._iter_lines(
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
+    def _line_index(self):
+        # Input is immutable, so lines are split at most once per instance.
+        if self._index is None:
+            self._index = LineIndex(self._s)
+        return self._index
+
     def _splitlines(self):
-        # We silently drop any entirely empty lines, which after splitting
-        # would basically be come an empty string, i.e. ''.
-        return [l.strip() for l in self._s.splitlines() if l]
+        # Shared by all callers, hence must never be modified in place.
+        return self._line_index().lines
+
+    def _scanlines(self):
+        # Streaming counterpart of `_splitlines`, which does not hold on to
+        # lines, unless an index was already built by an earlier call.
+        if self._index is not None:
+            return iter(self._index.lines)
+        return (m.group().strip() for m in LINE_RE.finditer(self._s))
+
+    def _map_chunks(self,
+                    task,
+                    workers=None,
+                    sub_pattern=None,
+                    replacement=None,
+                    pattern=None,
+                    exclude=False):
+        """
+        Runs `task` over filtered lines, either at once, or with `workers`,
+        over chunks of the line index in parallel, returning results of each
+        chunk in order. Input which is processed at once is streamed like
+        everywhere else, e.g. by `_find_lines`, without building an index.
+        """
+        filters = dict(sub_pattern=sub_pattern,
+                       replacement=replacement,
+                       pattern=pattern,
+                       exclude=exclude)
+        if self._index is not None:
+            most_lines = len(self._index.lines)
+        else:
+            # Every line but the last ends with a line break.
+            most_lines = sum(map(self._s.count, LINE_BREAKS)) + 1
+        if not in_parallel(most_lines, workers):
+            return [task(self._lines_from_impl(**filters))]
+        lines = self._splitlines()
+        return map_chunks(partial(_chunk_task, task, lines, filters),
+                          len(lines),
+                          workers=workers)
+
+    def _find_lines(self, literal):
+        """
+        Lines containing `literal`, found by searching whole input for it,
+        rather than each line in turn, so that lines without it are skipped
+        at the speed of `str.find`, and never split or even indexed.
+        """
+        s = self._s
+        find, rfind = s.find, s.rfind
+        # Other line breaks are only looked for between the nearest newlines,
+        # so that finding bounds of a line never searches beyond the line.
+        breaks = [c for c in LINE_BREAKS[1:] if c in s]
+        p = find(literal)
+        while p >= 0:
+            start = rfind("\n", 0, p) + 1
+            end = find("\n", p)
+            if end < 0:
+                end = len(s)
+            for c in breaks:
+                start = max(start, rfind(c, start, p) + 1)
+                e = find(c, p, end)
+                if e >= 0:
+                    end = e
+            line = s[start:end].strip()
+            # Stripped line may no longer contain literal, if it had leading
+            # or trailing whitespace.
+            if literal in line:
+                yield line
+                p = find(literal, end)
+            else:
+                p = find(literal, p + 1)
+
+    def _iter_lines(self,
+                    sub_pattern=None,
+                    replacement=None,
+                    pattern=None,
+                    exclude=False,
+                    lazy=False):
+        # With `lazy` set, lines are scanned from input as they are consumed,
+        # instead of from the index.
+        literal = None if exclude else literal_of(pattern)
+        if (literal and self._index is None and "\n" in self._s and
+                not LINE_BREAKS_RE.search(literal) and
+                (lazy or self._s.count(literal) < FIND_LINES_MAX_DENSITY *
+                 self._s.count("\n"))):
+            # Lines are only selected, substitution remains to be done.
+            return filter_lines(self._find_lines(literal),
+                                sub_pattern=sub_pattern,
+                                replacement=replacement)
+        return filter_lines(
+            self._scanlines() if lazy else iter(self._splitlines()),
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def _iter_tokens(self,
+                     sep=None,
+                     maxsplit=-1,
+                     sub_pattern=None,
+                     replacement=None,
+                     pattern=None,
+                     exclude=False,
+                     lazy=False):
+        """
+        Line processing pipeline extended with a tokenizing stage, which
+        splits each line exactly once.
+        """
+        return map(
+            splitter(sep=sep, maxsplit=maxsplit),
+            self._iter_lines(
+                sub_pattern=sub_pattern,
+                replacement=replacement,
+                pattern=pattern,
+                exclude=exclude,
+                lazy=lazy,
+            ))
 
     def _lines(self,
                sub_pattern=None,
                replacement=None,
                pattern=None,
                exclude=False):
-        compiled_pattern = None if not sub_pattern else re.compile(sub_pattern)
-
-        def sub_if_necessary(pat, repl, s):
-            """ Apply substitution if there's a pattern, otherwise return string untouched."""
-            return s if not pat else re.sub(pat, repl, s)
-
-        lines = self._splitlines()
-        filtered_lines = None
-        if pattern and exclude:
-            filtered_lines = [
-                sub_if_necessary(compiled_pattern, replacement, l)
-                for l in lines if not re.search(pattern, l)
-            ]
-        elif pattern:
-            filtered_lines = [
-                sub_if_necessary(compiled_pattern, replacement, l)
-                for l in lines if re.search(pattern, l)
-            ]
-        else:
-            filtered_lines = [
-                sub_if_necessary(compiled_pattern, replacement, l)
-                for l in lines
-            ]
-        return filtered_lines
+        return list(
+            self._iter_lines(
+                sub_pattern=sub_pattern,
+                replacement=replacement,
+                pattern=pattern,
+                exclude=exclude,
+            ))
 
     def _line_tuples(
         self,
@@ -87,23 +441,20 @@ class String(str):
         pattern=None,
         exclude=False,
     ):
-        new_lines = []
-        lines = self._lines_from_impl(
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
-
-        for l in lines:
-            split = Split(l)
-            tokens = tuple(split(sep=sep, maxsplit=maxsplit))
-            if tokens:
-                if strip_punct:
-                    tokens = tuple(
-                        stripper(tok, strip_chars) for tok in tokens)
-                new_lines.append(tokens)
-        return new_lines
+        if strip_punct:
+            return [
+                tuple(stripper(tok, strip_chars) for tok in tokens)
+                for tokens in tokenized if tokens
+            ]
+        return [tuple(tokens) for tokens in tokenized if tokens]
 
     def _trim_prefix(
         self,
@@ -160,7 +511,7 @@ class String(str):
             exclude=exclude,
         )
         if not prefix:
-            return lines
+            return list(lines)
 
         return [l for l in lines if l.startswith(prefix)]
 
@@ -179,34 +530,57 @@ class String(str):
             exclude=exclude,
         )
         if not suffix:
-            return lines
+            return list(lines)
 
         return [l for l in lines if l.endswith(suffix)]
 
+    def _match_many(
+        self,
+        patterns,
+        ignore_case=False,
+        counts=False,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        if not isinstance(patterns, MultiPattern):
+            patterns = MultiPattern.from_patterns(patterns,
+                                                  ignore_case=ignore_case)
+        lines = self._iter_lines(
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        if counts:
+            return patterns.count(lines)
+        return patterns.scan(lines)
+
     def _count_substrs(self, substr=None, pattern=None, exclude=False):
         lines = self._lines_from_impl(pattern=pattern, exclude=exclude)
         if not substr:
-            return len(lines)
-        return sum(1 for line in lines if line.find(substr) >= 0)
+            return len(list(lines))
+        return sum(1 for line in lines if substr in line)
 
     def _with_substr(self, substr=None, exclude=False):
         lines = self._lines_from_impl()
         if not substr:
-            return lines
+            return list(lines)
         if exclude:
-            return [l for l in lines if l.find(substr) == -1]
-        return [l for l in lines if l.find(substr) >= 0]
+            return [l for l in lines if substr not in l]
+        return [l for l in lines if substr in l]
 
     def _at_least_n_substr(self, substr=None, n=0):
         lines = self._lines_from_impl()
         if not substr:
-            return lines
+            return list(lines)
         return [l for l in lines if l.count(substr) >= n]
 
     def _at_most_n_substr(self, substr=None, n=0):
         lines = self._lines_from_impl()
         if not substr:
-            return lines
+            return list(lines)
         return [l for l in lines if l.count(substr) <= n]
 
     def _first_last_n(self,
@@ -216,10 +590,10 @@ class String(str):
                       replacement=None,
                       pattern=None,
                       exclude=False):
-        lines = self._lines_from_impl(sub_pattern=sub_pattern,
-                                      replacement=replacement,
-                                      pattern=pattern,
-                                      exclude=exclude)
+        lines = self._lines(sub_pattern=sub_pattern,
+                            replacement=replacement,
+                            pattern=pattern,
+                            exclude=exclude)
         if n < 1:
             raise ValueError("Number of lines cannot be less than '1'")
         if first:
@@ -237,17 +611,15 @@ class String(str):
         pattern=None,
         exclude=False,
     ):
-        lines = self._lines_from_impl(
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
-
-        return [
-            Split(line)(sep=sep, maxsplit=maxsplit)[0].strip()
-            for line in lines
-        ]
+        return [tokens[0].strip() for tokens in tokenized]
 
     def _tail(
         self,
@@ -258,17 +630,15 @@ class String(str):
         pattern=None,
         exclude=False,
     ):
-        lines = self._lines_from_impl(
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
-
-        return [
-            tuple(Split(line)(sep=sep, maxsplit=maxsplit)[1:])
-            for line in lines
-        ]
+        return [tuple(tokens[1:]) for tokens in tokenized]
 
     def _fields(
         self,
@@ -285,9 +655,8 @@ class String(str):
             pattern=pattern,
             exclude=exclude,
         )
-
-        return list(
-            zip(*map(lambda x: map(lambda x: x.strip(), x.split()), lines)))
+        # Splitting on whitespace already yields stripped tokens.
+        return list(zip(*map(splitter(), lines)))
 
     def _take_column(
         self,
@@ -299,16 +668,15 @@ class String(str):
         pattern=None,
         exclude=False,
     ):
-        lines = self._lines_from_impl(
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
-        return [
-            Split(line)(sep=sep, maxsplit=maxsplit)[column].strip()
-            for line in lines
-        ]
+        return [tokens[column].strip() for tokens in tokenized]
 
     def _compress(
         self,
@@ -320,23 +688,23 @@ class String(str):
         pattern=None,
         exclude=False,
     ):
-        lines = self._lines_from_impl(
-            sub_pattern=sub_pattern,
-            replacement=replacement,
-            pattern=pattern,
-            exclude=exclude,
-        )
         if not indexes or not isinstance(indexes, tuple):
             raise ValueError(
                 "Argument 'indexes' must be a tuple with at least one index")
         selectors = tuple(True if i in indexes else False
                           for i in range(0,
                                          max(indexes) + 1))
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
         return [
-            tuple(
-                itertools.compress(
-                    Split(line)(sep=sep, maxsplit=maxsplit), selectors))
-            for line in lines
+            tuple(itertools.compress(tokens, selectors))
+            for tokens in tokenized
         ]
 
     def _take_range_fields(
@@ -349,17 +717,16 @@ class String(str):
         pattern=None,
         exclude=False,
     ):
-        lines = self._lines_from_impl(
+        slc_obj = slice(*slc_range)
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
-        slc_obj = slice(*slc_range)
-
-        return [
-            Split(line)(sep=sep, maxsplit=maxsplit)[slc_obj] for line in lines
-        ]
+        return [tokens[slc_obj] for tokens in tokenized]
 
     def _to_dict_func(
         self,
@@ -368,6 +735,7 @@ class String(str):
         replacement=None,
         pattern=None,
         exclude=False,
+        compact=False,
     ):
         lines = self._lines_from_impl(
             sub_pattern=sub_pattern,
@@ -375,6 +743,9 @@ class String(str):
             pattern=pattern,
             exclude=exclude,
         )
+        if compact:
+            return list(
+                iter_dict_records(map(dict, map_if_possible(func, lines))))
         return [dict(i) for i in map_if_possible(func, lines)]
 
     def _filter_func(
@@ -384,18 +755,17 @@ class String(str):
         replacement=None,
         pattern=None,
         exclude=False,
+        workers=None,
     ):
-        lines = self._lines_from_impl(
-            sub_pattern=sub_pattern,
-            replacement=replacement,
-            pattern=pattern,
-            exclude=exclude,
-        )
-        if exclude:
-            filtered_lines = [line for line in lines if not func(line)]
-        else:
-            filtered_lines = [line for line in lines if func(line)]
-        return filtered_lines
+        return _concat(
+            self._map_chunks(
+                partial(_filter_task, func, exclude),
+                workers=workers,
+                sub_pattern=sub_pattern,
+                replacement=replacement,
+                pattern=pattern,
+                exclude=exclude,
+            ))
 
     def _map_func(
         self,
@@ -404,15 +774,17 @@ class String(str):
         replacement=None,
         pattern=None,
         exclude=False,
+        workers=None,
     ):
-        lines = self._lines_from_impl(
-            sub_pattern=sub_pattern,
-            replacement=replacement,
-            pattern=pattern,
-            exclude=exclude,
-        )
-        c = Map(lambda i: True, func)
-        return list(c(lines))
+        return _concat(
+            self._map_chunks(
+                partial(_map_task, func),
+                workers=workers,
+                sub_pattern=sub_pattern,
+                replacement=replacement,
+                pattern=pattern,
+                exclude=exclude,
+            ))
 
     def _filtered_map(
         self,
@@ -422,15 +794,18 @@ class String(str):
         replacement=None,
         pattern=None,
         exclude=False,
+        workers=None,
     ):
-        lines = self._lines_from_impl(
-            sub_pattern=sub_pattern,
-            replacement=replacement,
-            pattern=pattern,
-            exclude=exclude,
-        )
         c = Map(filter_func, map_func)
-        return list(c(lines))
+        return _concat(
+            self._map_chunks(
+                partial(_filtered_map_task, c),
+                workers=workers,
+                sub_pattern=sub_pattern,
+                replacement=replacement,
+                pattern=pattern,
+                exclude=exclude,
+            ))
 
     def _json_loads(self):
         if not self._s:
@@ -449,21 +824,21 @@ class String(str):
                  sub_pattern=None,
                  replacement=None,
                  pattern=None,
-                 exclude=False):
+                 exclude=False,
+                 compact=False):
         lines = self._lines_from_impl(sub_pattern=sub_pattern,
                                       replacement=replacement,
                                       pattern=pattern,
                                       exclude=exclude)
-        return [
-            dict(
-                zip(
-                    keys if keys else [
-                        i for i in range(
-                            0, len(Split(line)(sep=sep, maxsplit=maxsplit)))
-                    ],
-                    Split(line)(sep=sep, maxsplit=maxsplit),
-                )) for line in lines if line
-        ]
+        split = splitter(sep=sep, maxsplit=maxsplit)
+        # Empty lines, possible only after substitution, are skipped.
+        if compact:
+            return list(
+                iter_records((split(line) for line in lines if line),
+                             keys=keys or None))
+        if keys:
+            return [dict(zip(keys, split(line))) for line in lines if line]
+        return [dict(enumerate(split(line))) for line in lines if line]
 
     def _fold_funcs(
         self,
@@ -499,28 +874,25 @@ class String(str):
         replacement=None,
         pattern=None,
         exclude=False,
+        compact=False,
     ):
-        lines = self._lines_from_impl(
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
+        if as_dict and compact:
+            return list(iter_pairs_records(tokenized))
         if as_dict:
             return [
-                dict(
-                    zip(
-                        Split(line)(sep=sep, maxsplit=maxsplit)[::2],
-                        Split(line)(sep=sep, maxsplit=maxsplit)[1::2]))
-                for line in lines
+                dict(zip(tokens[::2], tokens[1::2])) for tokens in tokenized
             ]
         else:
             return [
-                tuple(
-                    zip(
-                        Split(line)(sep=sep, maxsplit=maxsplit)[::2],
-                        Split(line)(sep=sep, maxsplit=maxsplit)[1::2]))
-                for line in lines
+                tuple(zip(tokens[::2], tokens[1::2])) for tokens in tokenized
             ]
 
     def _groupby(
@@ -531,1003 +903,2226 @@ class String(str):
         pattern=None,
         exclude=False,
     ):
-        lines = self._lines_from_impl(
+        lines = self._iter_lines(
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
         d = defaultdict(list)
+        for line in lines:
+            d[key_func(line)].append(line)  # new list is created automatically
+        return d
 
-        def groupby_rec(key_func: Callable[[str], str], d: dict,
-                        l: List) -> Dict:
-            if not l:
-                return d
-            head, *rest = l
-            key = key_func(head)
-            d[key].append(head)  # new list is created automatically
-            # recursively call self until list is empty
-            return groupby_rec(key_func, d, rest)
-
-        return groupby_rec(key_func, d, lines)
-
-    def _groupby_count(
+    def _aggregate(
         self,
-        key_func,
+        by,
+        aggregations=None,
+        sort=False,
+        reverse=False,
+        sep=None,
+        maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
-        lines = self._lines_from_impl(
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            lazy=True,
         )
-        return dict(Counter([key for key in map(key_func, lines)]))
+        return GroupBy(by, aggregations).update(tokenized).results(
+            sort=sort, reverse=reverse)
 
-    def _partial(
+    def _values(
         self,
-        func,
+        column,
+        type=None,
+        sep=None,
+        maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
-        lines = self._lines_from_impl(
+        # Streams a value, e.g. a column, or a key, from each split line.
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            lazy=True,
         )
-        return [partial(func, line) for line in lines]
-
-    ### End String Processing Private Methods ###
-
-    ### String Processing Public Methods Below ###
-
-    @property
-    def json_loads(self):
-        """
-        For JSON data written in input, attempt to convert to native data type.
-
-        Returns:
-            bool, int, string, dict, list: Unmarshaled JSON data.
-        """
-        return self._json_loads()
+        values = map(getter(column), tokenized)
+        return values if type is None else map(type, values)
 
-    def count(self, pattern=None, exclude=False):
-        """
-        Count number of lines in the supplied string.
-
-        Args:
-            pattern (str, optional): Select lines matching pattern. Defaults to None.
-            exclude (bool, optional): Invert pattern matching. Defaults to False.
-
-        Returns:
-            int: Count of lines in input.
-        """
-        return self._lines(pattern=pattern, exclude=exclude).__len__()
-
-    def skip_lines(
+    def _top_k(
         self,
-        skip_head=0,
-        skip_tail=0,
+        k,
+        column=0,
+        type=float,
+        smallest=False,
+        sep=None,
+        maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
-        """
-        Skips some number of lines from the beginning, i.e. the head of the
-        list of lines, and/or from the end, i.e. the tail of the list of lines
-        from input. If a pattern results in some subset of original lines,
-        this subset will be subject to application of 'skip_head' and/or
-        'skip_tail'. In other words, skipping of lines occurs after application
-        of `pattern` and `exclude` parameters, not before. Think about this in
-        terms of `grep` and `head` or `tail`, as in this example:
-        `$ some_command | head -5 | grep 'some string'`
-        ```
-        >>> from integraty.xstring import String
-        >>> s1 = String('first line\\nsecond line\\nthird line\\nfourth line\\nfifth line\\n')
-        >>> s1.skip_lines(skip_head=2)
-        ['third line', 'fourth line', 'fifth line']
-        >>> s1.skip_lines(skip_tail=2)
-        ['first line', 'second line', 'third line']
-        >>> s1.skip_lines(skip_head=1, skip_tail=1)
-        ['second line', 'third line', 'fourth line']
-        >>> s1.skip_lines(skip_head=1, skip_tail=1, pattern='third', exclude=True)
-        ['second line', 'fourth line']
-
-        ```
-
-        Args:
-            skip_head (int, optional): Number of lines to skip relative to beginning of data. Defaults to 0.
-            skip_tail (int, optional): Number of lines to skip relative to the end of the data. Defaults to 0.
-            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
-            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
-            pattern (str, optional): Select lines matching pattern. Defaults to None.
-            exclude (bool, optional): Invert pattern matching. Defaults to False.
-
-        Returns:
-            list: List of lines from input with some lines skipped from head and tail.
-        """
-        if skip_head < 0:
-            raise ValueError("skip_head cannot be less than 0")
-        if skip_tail < 0:
-            raise ValueError("skip_tail cannot be less than 0")
-        lines = self._lines(
+        split = splitter(sep=sep, maxsplit=maxsplit)
+        get = getter(column)
+        lines = self._iter_lines(
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            lazy=True,
         )
-        return lines[skip_head:len(lines) - skip_tail]
+        # A heap of `k` lines is kept, never all of them.
+        select = heapq.nsmallest if smallest else heapq.nlargest
+        return select(k, lines, key=lambda line: type(get(split(line))))
 
-    def to_dict_func(
+    def _most_common(
         self,
-        func,
+        k=10,
+        by=0,
+        capacity=None,
+        sep=None,
+        maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
-        """
-        Applies `func` to each line from input, adding resulting tuple
-        to dict. It is expected that result from `func` is a single
-        two-element tuple object, where first element becomes dict key and
-        second value for given key.
-        ```
-        >>> from integraty.xstring import String
-        >>> s1 = String('beta\\nalpha beta\\nbeta gamma\\nalpha delta beta\\nsigma epsilon\\n')
-        >>> f1 = lambda l: zip([l.split()[0]], [l.split()[1]])
-        >>> s1.to_dict_func(f1)
-        [{'alpha': 'beta'}, {'beta': 'gamma'}, {'alpha': 'delta'}, {'sigma': 'epsilon'}]
+        keys = self._values(
+            by,
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        if capacity:
+            return SpaceSaving(max(capacity, k)).update(keys).most_common(k)
+        counts = Counter(keys)
+        return heapq.nlargest(k, counts.items(), key=itemgetter(1))
+
+    def _distinct_count(
+        self,
+        by=0,
+        approximate=False,
+        precision=14,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        keys = self._values(
+            by,
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        if approximate:
+            return HyperLogLog(precision).update(keys).count()
+        return len(set(keys))
+
+    def _quantiles(
+        self,
+        column,
+        qs=(0.5, 0.9, 0.99),
+        type=float,
+        sample_size=None,
+        seed=None,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        values = self._values(
+            column,
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        if sample_size:
+            # Only sampled tokens are ever converted.
+            sample = Reservoir(sample_size, seed=seed).update(values).sample
+            return quantiles(list(map(type, sample)), qs)
+        if type in TYPECODES:
+            # Half as much memory as a list of floats, or less.
+            return quantiles(array.array(TYPECODES[type], map(type, values)),
+                             qs)
+        return quantiles(list(map(type, values)), qs)
+
+    def _histogram(
+        self,
+        column,
+        bins,
+        type=float,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        values = self._values(
+            column,
+            type=type,
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        return Histogram(bins).update(values).results()
+
+    def _groupby_count(
+        self,
+        key_func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        workers=None,
+    ):
+        chunks = self._map_chunks(
+            partial(_count_task, key_func),
+            workers=workers,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        # Counts of chunks are merged in order, so groups keep the order in
+        # which they were first seen, as with a single chunk.
+        counts = chunks[0]
+        for c in chunks[1:]:
+            counts.update(c)
+        return dict(counts)
+
+    def _partial(
+        self,
+        func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        lines = self._lines_from_impl(
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        return [partial(func, line) for line in lines]
+
+    def _iter_line_tuples(
+        self,
+        sep=None,
+        maxsplit=-1,
+        strip_punct=False,
+        strip_chars=PCHARS,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            lazy=True,
+        )
+        if strip_punct:
+            return (tuple(stripper(tok, strip_chars) for tok in tokens)
+                    for tokens in tokenized if tokens)
+        return (tuple(tokens) for tokens in tokenized if tokens)
+
+    def _iter_take_column(
+        self,
+        sep=None,
+        maxsplit=-1,
+        column=0,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            lazy=True,
+        )
+        return (tokens[column].strip() for tokens in tokenized)
+
+    def _iter_fields(
+        self,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+
+        def tokenized():
+            return self._iter_tokens(
+                sub_pattern=sub_pattern,
+                replacement=replacement,
+                pattern=pattern,
+                exclude=exclude,
+                lazy=True,
+            )
+
+        # Like zip(), stop at the shortest line. Each column is collected
+        # with a separate pass, so only one column is held at a time.
+        width = min(map(len, tokenized()), default=0)
+        for column in range(width):
+            yield tuple(tokens[column] for tokens in tokenized())
+
+    def _iter_map_func(
+        self,
+        func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        lines = self._iter_lines(
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            lazy=True,
+        )
+        return map(func, lines)
+
+    def _iter_filtered_map(
+        self,
+        map_func,
+        filter_func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        lines = self._iter_lines(
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            lazy=True,
+        )
+        c = Map(filter_func, map_func)
+        return c(lines)
+
+    def _iter_pairs(
+        self,
+        as_dict=False,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        compact=False,
+    ):
+        tokenized = self._iter_tokens(
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            lazy=True,
+        )
+        if as_dict and compact:
+            return iter_pairs_records(tokenized)
+        if as_dict:
+            return (dict(zip(tokens[::2], tokens[1::2]))
+                    for tokens in tokenized)
+        return (tuple(zip(tokens[::2], tokens[1::2])) for tokens in tokenized)
+
+    def _iter_groupby_count(
+        self,
+        key_func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        lines = self._iter_lines(
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            lazy=True,
+        )
+        # Only counters are kept, one per distinct key, never the lines.
+        yield from Counter(map(key_func, lines)).items()
+
+    def _columns(
+        self,
+        columns=(0, ),
+        types=str,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        use_numpy=None,
+    ):
+        # Tokens are produced anew for each column, see `to_columns`.
+        tokenized = partial(
+            self._iter_tokens,
+            sep=sep,
+            maxsplit=maxsplit,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        return to_columns(tokenized,
+                          types,
+                          columns=columns,
+                          use_numpy=use_numpy)
+
+    ### End String Processing Private Methods ###
+
+    ### String Processing Public Methods Below ###
+
+    @property
+    def json_loads(self):
+        """
+        For JSON data written in input, attempt to convert to native data type.
+
+        Returns:
+            bool, int, string, dict, list: Unmarshaled JSON data.
+        """
+        return self._json_loads()
+
+    def count(self, pattern=None, exclude=False):
+        """
+        Count number of lines in the supplied string.
+
+        Args:
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            int: Count of lines in input.
+        """
+        return self._lines(pattern=pattern, exclude=exclude).__len__()
+
+    def skip_lines(
+        self,
+        skip_head=0,
+        skip_tail=0,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Skips some number of lines from the beginning, i.e. the head of the
+        list of lines, and/or from the end, i.e. the tail of the list of lines
+        from input. If a pattern results in some subset of original lines,
+        this subset will be subject to application of 'skip_head' and/or
+        'skip_tail'. In other words, skipping of lines occurs after application
+        of `pattern` and `exclude` parameters, not before. Think about this in
+        terms of `grep` and `head` or `tail`, as in this example:
+        `$ some_command | head -5 | grep 'some string'`
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String('first line\\nsecond line\\nthird line\\nfourth line\\nfifth line\\n')
+        >>> s1.skip_lines(skip_head=2)
+        ['third line', 'fourth line', 'fifth line']
+        >>> s1.skip_lines(skip_tail=2)
+        ['first line', 'second line', 'third line']
+        >>> s1.skip_lines(skip_head=1, skip_tail=1)
+        ['second line', 'third line', 'fourth line']
+        >>> s1.skip_lines(skip_head=1, skip_tail=1, pattern='third', exclude=True)
+        ['second line', 'fourth line']
+
+        ```
+
+        Args:
+            skip_head (int, optional): Number of lines to skip relative to beginning of data. Defaults to 0.
+            skip_tail (int, optional): Number of lines to skip relative to the end of the data. Defaults to 0.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lines from input with some lines skipped from head and tail.
+        """
+        if skip_head < 0:
+            raise ValueError("skip_head cannot be less than 0")
+        if skip_tail < 0:
+            raise ValueError("skip_tail cannot be less than 0")
+        lines = self._lines(
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+        return lines[skip_head:len(lines) - skip_tail]
+
+    def to_dict_func(
+        self,
+        func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        compact=False,
+    ):
+        """
+        Applies `func` to each line from input, adding resulting tuple
+        to dict. It is expected that result from `func` is a single
+        two-element tuple object, where first element becomes dict key and
+        second value for given key.
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String('beta\\nalpha beta\\nbeta gamma\\nalpha delta beta\\nsigma epsilon\\n')
+        >>> f1 = lambda l: zip([l.split()[0]], [l.split()[1]])
+        >>> s1.to_dict_func(f1)
+        [{'alpha': 'beta'}, {'beta': 'gamma'}, {'alpha': 'delta'}, {'sigma': 'epsilon'}]
+
+        ```
+        Args:
+            func (str): Conversion function from string to two-element tuple.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+            compact (bool, optional): Return a `Record` instead of a dict for each line, for up to `MAX_RECORD_TYPES` distinct sets of keys, leaving lines with any others as dicts. Defaults to False.
+
+        Returns:
+            list: List of dicts made from tuples for each line over which `func`
+            was applied.
+        """
+        return self._to_dict_func(
+            func=func,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            compact=compact,
+        )
+
+    def to_dict(self,
+                keys=None,
+                sep=None,
+                maxsplit=-1,
+                pattern=None,
+                exclude=False,
+                compact=False):
+        """
+        Converts input lines into dicts, where `keys` is a list of keys which 
+        should be zip(able) with contents of split line. This means that the
+        following expression should be true: len(keys) == len(Split(line)(sep=sep, maxsplit=maxsplit))
+        for each line. If len(line) > len(keys), only len(keys) elements are
+        taken from each split line. Reverse of this is true also. This is done
+        so that equal number of _key=value_ pairs was available for establishing
+        a mapping.
+        If keys == None, then after a line is split, it is zipped with a range
+        object generated from length of split line. In other words, if
+        len(line) == 3, resulting dict is {0: line[0], 1: line[1], 2: line[2]}.
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String('first line\\nsecond line\\nthird line\\nfourth line\\nfifth line\\n')
+        >>> s1.to_dict(keys=('key', 'value'))
+        [{'key': 'first', 'value': 'line'}, {'key': 'second', 'value': 'line'}, {'key': 'third', 'value': 'line'}, {'key': 'fourth', 'value': 'line'}, {'key': 'fifth', 'value': 'line'}]
+        >>> s1.to_dict(keys=('key', 'value'), pattern='(first|second)')
+        [{'key': 'first', 'value': 'line'}, {'key': 'second', 'value': 'line'}]
+        >>> s1.to_dict()
+        [{0: 'first', 1: 'line'}, {0: 'second', 1: 'line'}, {0: 'third', 1: 'line'}, {0: 'fourth', 1: 'line'}, {0: 'fifth', 1: 'line'}]
+
+        ```
+        Large outputs are cheaper to hold as records, see `Record`, which
+        share their keys instead of carrying a hash table each, and still
+        allow lookups by key.
+        ```
+        >>> rows = s1.to_dict(keys=('key', 'value'), compact=True)
+        >>> rows[0]
+        Record(key='first', value='line')
+        >>> rows[0]['value'], rows[1].key
+        ('line', 'second')
+
+        ```
+        Args:
+            keys (Sequence, optional): A list of keys to build a dict from line. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sep (str, optional): Separator character. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+            compact (bool, optional): Return a `Record` instead of a dict for each line. Defaults to False.
+
+        Returns:
+            list: List of dictionaries, or records, generated from lines.
+        """
+        return self._to_dict(keys=keys,
+                             sep=sep,
+                             maxsplit=maxsplit,
+                             pattern=pattern,
+                             exclude=exclude,
+                             compact=compact)
+
+    def firstn(self,
+               n=1,
+               sub_pattern=None,
+               replacement=None,
+               pattern=None,
+               exclude=None):
+        """
+        Select first n lines from input.
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String("first line\\nsecond line\\nthird line\\nfourth line\\nfifth line\\n")
+        >>> s1.firstn(3)
+        ['first line', 'second line', 'third line']
+
+        ```
+        Args:
+            n (int, optional): Number of lines to select. Defaults to 1.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lines 0 through n.
+        """
+        return self._first_last_n(n=n,
+                                  sub_pattern=sub_pattern,
+                                  replacement=replacement,
+                                  pattern=pattern,
+                                  exclude=exclude)
+
+    def lastn(self,
+              n=1,
+              sub_pattern=None,
+              replacement=None,
+              pattern=None,
+              exclude=None):
+        """
+        Select last n lines from input.
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String("first line\\nsecond line\\nthird line\\nfourth line\\nfifth line\\n")
+        >>> s1.lastn(3)
+        ['third line', 'fourth line', 'fifth line']
+
+        ```
+        Args:
+            n (int, optional): Number of lines to select. Defaults to 1.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lines len(lines) - n through len(lines).
+        """
+        return self._first_last_n(n=n,
+                                  first=False,
+                                  sub_pattern=sub_pattern,
+                                  replacement=replacement,
+                                  pattern=pattern,
+                                  exclude=exclude)
+
+    def head(
+        self,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Select first column of each line from input, after splitting on `sep`.
+        Substitution of all `sub_pattern` matches for `replacement` occurs
+        after lines have been filtered based on `pattern`, not before.
+
+        This method is meant to be similar to recursive list iteration in
+        functional languages. Where a list is a combination of a _head_, first
+        element, and _rest_ or _tail_, which is the remainder of the list.
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String('123 abc def\\n456 ghi jkl\\n789 mno pqr\\n') 
+        >>> s1.head()
+        ['123', '456', '789']
+        >>> s1.head(pattern='123')
+        ['123']
+        >>> s1.head(pattern='123', exclude=True)
+        ['456', '789']
+
+        ```
+        Args:
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of first element of each split line.
+        """
+        return self._head(
+            sep=sep,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def tail(
+        self,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Select all but first column of each line from input, after splitting on 
+        `sep`. Substitution of all `sub_pattern` matches for `replacement`
+        occurs after lines have been filtered based on `pattern`, not before.
+
+        This method is meant to be similar to recursive list iteration in
+        functional languages. Where a list is a combination of a _head_, first
+        element, and _rest_ or _tail_, which is the remainder of the list.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('123 abc def\\n456 ghi jkl\\n789 mno pqr\\n') 
+        >>> s.tail()
+        [('abc', 'def'), ('ghi', 'jkl'), ('mno', 'pqr')]
+        >>> s.tail(pattern='mno')
+        [('mno', 'pqr')]
+        >>> s.tail(pattern='123', exclude=True)
+        [('ghi', 'jkl'), ('mno', 'pqr')]
+
+        ```
+        Args:
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples with all but first element of each split line.
+        """
+        return self._tail(
+            sep=sep,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def fields(
+        self,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Split each line from input into fields and join each column into a
+        tuple. This is meant to be used with text where multiple lines contain
+        same number of fields (sub-strings), and result of this is a list of
+        tuples where each tuple contains elements from a given position across
+        all lines.
+        Given a string: 'alpha beta gamma\\ndelta epsilon zeta\\n',
+        this produces: [('alpha', 'delta'), ('beta', 'epsilon'), ('gamma', 
+        'zeta')].
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String('alpha beta gamma\\ndelta epsilon zeta\\n')
+        >>> s1.fields()
+        [('alpha', 'delta'), ('beta', 'epsilon'), ('gamma', 'zeta')]
+
+        ```
+        Args:
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples from each split line.
+        """
+        return self._fields(
+            sep=sep,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def take_column(
+        self,
+        sep=None,
+        maxsplit=-1,
+        column=0,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Take a single column out of each line from input, after splitting the
+        line on `sep`.
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String('a b c d\\ne f g h h i j k\\nl m n o\\n')
+        >>> s1.take_column(column=0)
+        ['a', 'e', 'l']
+        >>> s1.take_column(column=1)
+        ['b', 'f', 'm']
+        >>> s1.take_column(column=2)
+        ['c', 'g', 'n']
+
+        ```
+        Args:
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            column (int, optional): Select column matching this index. Defaults to 0.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of elements extracted from each split line.
+        """
+        return self._take_column(
+            sep=sep,
+            column=column,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def compress(
+        self,
+        sep=None,
+        maxsplit=-1,
+        indexes=(),
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Select one or more fields from each line from input, after splitting
+        the line on `sep`.
+        To make this more concrete let's take this example.
+        Given the line: `The quick brown fox jumps over the lazy dog`
+        to select words _quick_, _jumps_, _lazy_ and _dog_, indexes field
+        would be set to (1, 4, 7, 8).
+
+        Each line of text consists of zero or more substrings. An empty line
+        consists of zero substrings and cannot be indexed into. Any line with
+        one or more substrings, once split on `sep` is going to have 
+        `len(line)-1` positions or indexes if you think of this line as a list
+        of tokens. By specifying only certain indexes one can extract
+        substrings of interest.
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String('a b c d\\ne f g h h i j k\\nl m n o\\n')
+        >>> s1.compress(indexes=(0,3))
+        [('a', 'd'), ('e', 'h'), ('l', 'o')]
+        >>> s1.compress(indexes=(0,2,3))
+        [('a', 'c', 'd'), ('e', 'g', 'h'), ('l', 'n', 'o')]
+
+        ```
+        Args:
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            indexes (tuple, optional): Sequence of column indexes. Defaults to ().
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples, where each tuple contains one or more fields from each split line.
+        """
+        return self._compress(
+            sep=sep,
+            indexes=indexes,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def take_range_fields(
+        self,
+        sep=None,
+        maxsplit=-1,
+        slc_range=(0, 1, 1),
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Select multiple fields within the 'slc_range' range from each line
+        from input, after splitting the line on `sep`.
+
+        Args:
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            slc_range (tuple, optional): Range (start, end, stride). Defaults to (0, 1, 1).
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples, where each tuple contains one or more fields from each split line.
+        """
+        return self._take_range_fields(
+            sep=sep,
+            slc_range=slc_range,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def line_tuples(
+        self,
+        sep=None,
+        maxsplit=-1,
+        strip_punct=False,
+        strip_chars=PCHARS,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Split lines in supplied string into tuples with `sep` as optional
+        separator, where each line is converted into a N-tuple containing
+        all (N) tokens after the split of that line.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('# alpha Ω\\n# beta Ω\\n# gamma Ω\\n# delta Δ\\n') 
+        >>> s.line_tuples()
+        [('#', 'alpha', 'Ω'), ('#', 'beta', 'Ω'), ('#', 'gamma', 'Ω'), ('#', 'delta', 'Δ')]
+        >>> s.line_tuples(pattern='ta')
+        [('#', 'beta', 'Ω'), ('#', 'delta', 'Δ')]
+        >>> s.line_tuples(pattern='ta', exclude=True)
+        [('#', 'alpha', 'Ω'), ('#', 'gamma', 'Ω')]
+
+        >>> s = String('alpha Ω,# beta Ω,# gamma Ω,# delta Δ')
+        >>> s.lines()
+        ['alpha Ω,# beta Ω,# gamma Ω,# delta Δ']
+        >>> s.line_tuples(sep=',')
+        [('alpha Ω', '# beta Ω', '# gamma Ω', '# delta Δ')]
+
+        ```
+        Args:
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            strip_punct (bool, optional): Enable punctuation stripping. Defaults to False.
+            strip_chars (str, optional): Characters to strip if 'strip_punct' is True. Defaults to PCHARS.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of tuples, where each tuple contains fields from each split line.
+        """
+        return self._line_tuples(
+            sep=sep,
+            strip_punct=strip_punct,
+            strip_chars=strip_chars,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def lines(self,
+              sub_pattern=None,
+              replacement=None,
+              pattern=None,
+              exclude=False):
+        """
+        Lines from supplied str, optionally filtered with regular expression
+        in `pattern`.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('2020-01-02 alpha Ω\\n2020-01-02 beta Ω\\n2020-02-01 gamma Ω\\n2020-02-03 delta Δ\\n')
+        >>> s.lines(sub_pattern=r'\\d{4}-\\d{2}-\\d{2} ', replacement='')
+        ['alpha Ω', 'beta Ω', 'gamma Ω', 'delta Δ']
+        >>> s.lines(sub_pattern=r'^\\S+ ', replacement='')
+        ['alpha Ω', 'beta Ω', 'gamma Ω', 'delta Δ']
+        >>> s.lines(sub_pattern=r'^\\S+', replacement='*'*5)
+        ['***** alpha Ω', '***** beta Ω', '***** gamma Ω', '***** delta Δ']
+        >>> s.lines(sub_pattern=r'^\\S+', replacement='*'*5, pattern='ha')
+        ['***** alpha Ω']
+        >>> s.lines(sub_pattern=r'^\\S+', replacement='*'*5, pattern='ha', exclude=True)
+        ['***** beta Ω', '***** gamma Ω', '***** delta Δ']
+
+        ```
+        Args:
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+        
+        Returns:
+            list: List of lines from input.
+        """
+        return self._lines(
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def trim_prefix(
+        self,
+        prefix,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Trim substring in `prefix` from beginning of each line of input, after
+        splitting, assuming substring is present.
+
+        Args:
+            prefix (str): Prefix to trim from beginning of each line.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lines with prefix trimmed from each.
+        """
+        return self._trim_prefix(
+            prefix=prefix,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def trim_suffix(
+        self,
+        suffix,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Trim substring in `suffix` from beginning of each line of input, after
+        splitting, assuming substring is present.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('Α alpha beta gamma ;;\\nΒ beta gamma delta ;;\\nΔ delta sigma lambda ;;\\nΕ epsilon tau ;;\\n')
+        >>> s.trim_suffix(' ;;')
+        ['Α alpha beta gamma', 'Β beta gamma delta', 'Δ delta sigma lambda', 'Ε epsilon tau']
+
+        ```
+        Args:
+            suffix (str): Suffix to trim from end of each line.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: List of lines with suffix trimmed from each.
+        """
+        return self._trim_suffix(
+            suffix=suffix,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def with_prefix(
+        self,
+        prefix,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Limits included lines from input to those matching given prefix.
+        If a pattern results in some subset of original lines, this subset
+        will be subject to application of `prefix`. In other words, lines with
+        `prefix` may be excluded as a result of pattern matching, because
+        prefix checking occurs after application of `pattern` and `exclude`
+        parameters, not before.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('# alpha Ω\\n# beta Ω\\n# gamma Ω\\n# delta Δ\\n')
+        >>> s.with_prefix('#')
+        ['# alpha Ω', '# beta Ω', '# gamma Ω', '# delta Δ']
+        >>> s.with_prefix(prefix='%', sub_pattern='#', replacement='%')  
+        ['% alpha Ω', '% beta Ω', '% gamma Ω', '% delta Δ']
+
+        ```
+        Args:
+            prefix (str): Lines with given prefix should be included.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: Lines matching given prefix.
+        """
+        return self._with_prefix(
+            prefix=prefix,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def with_suffix(
+        self,
+        suffix,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Limits included lines from input to those matching given suffix.
+        If a pattern results in some subset of original lines, this subset
+        will be subject to application of `suffix`. In other words, lines with
+        `suffix` may be excluded as a result of pattern matching, because
+        suffix checking occurs after application of `pattern` and `exclude`
+        parameters, not before.
+
+        Args:
+            suffix (str): Lines with given prefix should be included.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            list: Lines matching given suffix.
+        """
+        return self._with_suffix(
+            suffix=suffix,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def match_many(
+        self,
+        patterns,
+        ignore_case=False,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Lines matching each of many patterns, found in one go, instead of
+        calling `lines` once per pattern, or matching an alternation like
+        `(alpha|beta|gamma)`, which cannot tell which of the alternatives
+        matched. Patterns which are plain substrings are matched as literals,
+        see `multipattern.MultiPattern`, which may also be given directly, to
+        reuse it across many calls.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('alpha beta\\nbeta gamma\\ngamma 42\\n')
+        >>> s.match_many(['alpha', 'gamma', r'\\d+'])
+        {'alpha': ['alpha beta'], 'gamma': ['beta gamma', 'gamma 42'], '\\\\d+': ['gamma 42']}
+
+        ```
+        Args:
+            patterns (Iterable[str], MultiPattern): Patterns to match.
+            ignore_case (bool, optional): Match regardless of case. Defaults to False.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+        Returns:
+            Dict[str, List[str]]: Matching lines by pattern, of all patterns.
+        """
+        return self._match_many(
+            patterns=patterns,
+            ignore_case=ignore_case,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def count_many(
+        self,
+        patterns,
+        ignore_case=False,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
+        """
+        Number of lines matching each of many patterns, counted in one go,
+        see `match_many`.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('alpha beta\\nbeta gamma\\ngamma 42\\n')
+        >>> s.count_many(['beta', 'delta', 'gam+a'])
+        {'beta': 2, 'delta': 0, 'gam+a': 2}
+
+        ```
+        Args:
+            patterns (Iterable[str], MultiPattern): Patterns to match.
+            ignore_case (bool, optional): Match regardless of case. Defaults to False.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+        Returns:
+            Dict[str, int]: Count of matching lines by pattern, of all patterns.
+        """
+        return self._match_many(
+            patterns=patterns,
+            ignore_case=ignore_case,
+            counts=True,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
+
+    def count_substrs(self, substr=None, pattern=None, exclude=False):
+        """
+        Counts lines in supplied string where at least one match for substring
+        given in `substr` is found. This is a count of matching lines, not a
+        total count of substrings, which could be greater if any given line
+        contains more than a single matching substring.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('alpha Ω\\nbeta Ω\\ngamma Ω\\ndelta Δ\\n')
+        >>> s.count_substrs(substr='Ω')
+        3
+        >>> s.count_substrs(substr='Ω', pattern='alpha', exclude=True)
+        2
+        >>> s.count_substrs(substr='Ω', pattern='alpha')
+        1
+
+        ```
+        Args:
+            substr (str, optional): Substring to find in each line. Defaults to None.
+            pattern (str, optional): Select lines matching pattern. Defaults to None.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Returns:
+            int: Count of lines with at least one substring match.
+        """
+        return self._count_substrs(substr=substr,
+                                   pattern=pattern,
+                                   exclude=exclude)
+
+    def at_least_n_substr(self, substr=None, n=0):
+        return self._at_least_n_substr(substr, n)
+
+    def at_most_n_substr(self, substr=None, n=0):
+        return self._at_most_n_substr(substr, n)
+
+    def filter_func(
+        self,
+        func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        workers=None,
+    ):
+        """
+        Filters lines from supplied string with a filtering function in
+        `func` argument. This function should expect a single string argument
+        which will be a line and return a boolean. Any lines that cause this
+        function to return `True` will be included in the resulting list, and
+        those that result in `False` will be excluded, unless `exclude` is
+        `True`, which inverts this logic.
+        ```
+        from integraty.xstring import String
+        >>> s = String('alpha beta gamma\\ndelta epsilon zeta\\n')
+        >>> s.filter_func(lambda x: 'zeta' in x.split())
+        ['delta epsilon zeta']
+        >>> s.filter_func(lambda x: 'zeta' in x.split(), exclude=True) 
+        ['alpha beta gamma']
 
         ```
         Args:
-            func (str): Conversion function from string to two-element tuple.
+            func ((s: str) -> bool): Filtering function emitting a boolean.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
-            exclude (bool, optional): Invert pattern matching. Defaults to False.
-
+            exclude (bool, optional): Invert filtering logic. Defaults to False.
+            workers (int, optional): Number of processes among which to split input of at least `parallel.PARALLEL_MIN_LINES` lines. Defaults to None, serial.
         Returns:
-            list: List of dicts made from tuples for each line over which `func`
-            was applied.
+            list: List of lines after filtering function is applied.
         """
-        return self._to_dict_func(
+        return self._filter_func(
             func=func,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            workers=workers,
         )
 
-    def to_dict(self,
-                keys=None,
-                sep=None,
-                maxsplit=-1,
-                pattern=None,
-                exclude=False):
-        """
-        Converts input lines into dicts, where `keys` is a list of keys which 
-        should be zip(able) with contents of split line. This means that the
-        following expression should be true: len(keys) == len(Split(line)(sep=sep, maxsplit=maxsplit))
-        for each line. If len(line) > len(keys), only len(keys) elements are
-        taken from each split line. Reverse of this is true also. This is done
-        so that equal number of _key=value_ pairs was available for establishing
-        a mapping.
-        If keys == None, then after a line is split, it is zipped with a range
-        object generated from length of split line. In other words, if
-        len(line) == 3, resulting dict is {0: line[0], 1: line[1], 2: line[2]}.
-        ```
-        >>> from integraty.xstring import String
-        >>> s1 = String('first line\\nsecond line\\nthird line\\nfourth line\\nfifth line\\n')
-        >>> s1.to_dict(keys=('key', 'value'))
-        [{'key': 'first', 'value': 'line'}, {'key': 'second', 'value': 'line'}, {'key': 'third', 'value': 'line'}, {'key': 'fourth', 'value': 'line'}, {'key': 'fifth', 'value': 'line'}]
-        >>> s1.to_dict(keys=('key', 'value'), pattern='(first|second)')
-        [{'key': 'first', 'value': 'line'}, {'key': 'second', 'value': 'line'}]
-        >>> s1.to_dict()
-        [{0: 'first', 1: 'line'}, {0: 'second', 1: 'line'}, {0: 'third', 1: 'line'}, {0: 'fourth', 1: 'line'}, {0: 'fifth', 1: 'line'}]
-
-        ```
-        Args:
-            keys (Sequence, optional): A list of keys to build a dict from line. Defaults to None.
-            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
-            sep (str, optional): Separator character. Defaults to None.
-            pattern (str, optional): Select lines matching pattern. Defaults to None.
-            exclude (bool, optional): Invert pattern matching. Defaults to False.
-
-        Returns:
-            list: List of dictionaries generated from lines.
+    def map_func(
+        self,
+        func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        workers=None,
+    ):
         """
-        return self._to_dict(keys=keys,
-                             sep=sep,
-                             pattern=pattern,
-                             exclude=exclude)
+        Applies function in 'func' to each line written in input.
+        Transformations from these map operations will be included in
+        the resulting list. Result of calling 'func' should not be None.
 
-    def firstn(self,
-               n=1,
-               sub_pattern=None,
-               replacement=None,
-               pattern=None,
-               exclude=None):
-        """
-        Select first n lines from input.
-        ```
-        >>> from integraty.xstring import String
-        >>> s1 = String("first line\\nsecond line\\nthird line\\nfourth line\\nfifth line\\n")
-        >>> s1.firstn(3)
-        ['first line', 'second line', 'third line']
+        Large inputs can be processed on several CPU cores, by giving a
+        number of `workers`. Lines are then split into chunks, each one
+        filtered and mapped in a separate process, and results are joined in
+        order of input, so they are the same as without `workers`. Results,
+        but not `func`, must be picklable.
 
-        ```
         Args:
-            n (int, optional): Number of lines to select. Defaults to 1.
+            func ((s: str) -> Any): Mapping function receiving a string and emitting Any other type.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
+            workers (int, optional): Number of processes among which to split input of at least `parallel.PARALLEL_MIN_LINES` lines. Defaults to None, serial.
 
         Returns:
-            list: List of lines 0 through n.
+            list: List of results from application of mapping function.
         """
-        return self._first_last_n(n=n,
-                                  sub_pattern=sub_pattern,
-                                  replacement=replacement,
-                                  pattern=pattern,
-                                  exclude=exclude)
+        return self._map_func(
+            func=func,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            workers=workers,
+        )
 
-    def lastn(self,
-              n=1,
-              sub_pattern=None,
-              replacement=None,
-              pattern=None,
-              exclude=None):
+    def filtered_map(
+        self,
+        map_func,
+        filter_func,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+        workers=None,
+    ):
         """
-        Select last n lines from input.
+        Higher-order function taking a mapping function and a filtering
+        function.
+        For every line for which `filter_func` returns `True`, `map_func` is
+        applied over it, producing subset of transformed lines. Filtering and
+        mapping occur after optional substitution and selection or excludion
+        of lines matching a pattern. This method is meant to give user much
+        more control over how to select lines and what to do with them, before
+        having them returned as a list.
         ```
         >>> from integraty.xstring import String
-        >>> s1 = String("first line\\nsecond line\\nthird line\\nfourth line\\nfifth line\\n")
-        >>> s1.lastn(3)
-        ['third line', 'fourth line', 'fifth line']
+        >>> s = String('Α alpha beta gamma\\nΒ beta gamma delta\\nΔ delta sigma lambda\\nΕ epsilon tau\\n')
+        >>> s.filtered_map(lambda l: l.replace(' ', '_'), lambda l: l.find('sigma') >= 0)
+        ['Δ_delta_sigma_lambda']
+        >>> s.filtered_map(lambda l: l.replace(' ', '_'), lambda l: l.find('alpha') >= 0)
+        ['Α_alpha_beta_gamma']
 
         ```
         Args:
-            n (int, optional): Number of lines to select. Defaults to 1.
+            map_func (Callable[[Any], Any]): Function to apply over given lines.
+            filter_func (Callable[[Any], bool]): Function to select lines.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
+            workers (int, optional): Number of processes among which to split input of at least `parallel.PARALLEL_MIN_LINES` lines. Defaults to None, serial.
 
         Returns:
-            list: List of lines len(lines) - n through len(lines).
+            list: List of filtered results over which mapping function was applied.
         """
-        return self._first_last_n(n=n,
-                                  first=False,
-                                  sub_pattern=sub_pattern,
-                                  replacement=replacement,
-                                  pattern=pattern,
-                                  exclude=exclude)
+        return self._filtered_map(
+            map_func=map_func,
+            filter_func=filter_func,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+            workers=workers,
+        )
 
-    def head(
+    def fold_funcs(
         self,
-        sep=None,
-        maxsplit=-1,
+        *funcs,
         sub_pattern=None,
         replacement=None,
         pattern=None,
-        exclude=False,
+        exclude=None,
     ):
         """
-        Select first column of each line from input, after splitting on `sep`.
-        Substitution of all `sub_pattern` matches for `replacement` occurs
-        after lines have been filtered based on `pattern`, not before.
+        Higher-order function taking one or more functions composing them
+        together, then applying the composed function over each line from
+        input.
+        This method is meant to emulate a unix pipeline, where information
+        is piped through multiple programs and possibly mutated throughout the
+        pipeline. Each function passed in is assumed to have a single argument.
+        First function in the chain will receive a single complete line, but
+        every other function will receive output of previous function.
 
-        This method is meant to be similar to recursive list iteration in
-        functional languages. Where a list is a combination of a _head_, first
-        element, and _rest_ or _tail_, which is the remainder of the list.
+        Assuming there are three functions that must be applied to each line
+        and these functions are called `a`, `b`, and `c`, where `a` is the
+        first function, `b` second, and `c` last, the sequence as a pipeline
+        looks like this: `line |> a |> b |> c`, or in mathematical terms it
+        looks like this:
+        ```
+        a(line)
+        b(a(line))
+        c(b(a(line)))
+        ```
         ```
         >>> from integraty.xstring import String
-        >>> s1 = String('123 abc def\\n456 ghi jkl\\n789 mno pqr\\n') 
-        >>> s1.head()
-        ['123', '456', '789']
-        >>> s1.head(pattern='123')
-        ['123']
-        >>> s1.head(pattern='123', exclude=True)
-        ['456', '789']
+        >>> s = String('Α alpha beta gamma\\nΒ beta gamma delta\\nΔ delta sigma lambda\\nΕ epsilon tau\\n')
+        >>> s.fold_funcs(lambda l: l[2:], lambda l: tuple(l.title().split()), lambda l: sorted(l))
+        [['Alpha', 'Beta', 'Gamma'], ['Beta', 'Delta', 'Gamma'], ['Delta', 'Lambda', 'Sigma'], ['Epsilon', 'Tau']]
 
         ```
+
         Args:
-            sep (str, optional): Separator character. Defaults to None.
-            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            *funcs (Sequence[Callable[(s: str) -> string]]): A sequence of functions, each with a single argument, returning a single value.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: List of first element of each split line.
+            list: List of results from application of sequence of callables.
         """
-        return self._head(
-            sep=sep,
+        return self._fold_funcs(
+            funcs,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def tail(
+    def pairs(
         self,
+        as_dict=False,
         sep=None,
         maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
+        compact=False,
     ):
         """
-        Select all but first column of each line from input, after splitting on 
-        `sep`. Substitution of all `sub_pattern` matches for `replacement`
-        occurs after lines have been filtered based on `pattern`, not before.
+        Break-up each line from input into pairs, optionally placing these
+        pairs into dicts, with one dict per line. Pairs are effectively
+        adjacent strings. To make this more clear, given this line:
+        `name abc path /var/log/abc.log`, result is a tuple of 2-tuples:
+        `(('name', 'abc'), ('path', '/var/log/abc.log'))`, and converted to
+        dict it becomes: {'name': 'abc', 'path': '/var/log/abc.log'}.
 
-        This method is meant to be similar to recursive list iteration in
-        functional languages. Where a list is a combination of a _head_, first
-        element, and _rest_ or _tail_, which is the remainder of the list.
+        If a line contains odd number of tokens after being split, last token
+        in the split line will be discarded.
         ```
         >>> from integraty.xstring import String
-        >>> s = String('123 abc def\\n456 ghi jkl\\n789 mno pqr\\n') 
-        >>> s.tail()
-        [('abc', 'def'), ('ghi', 'jkl'), ('mno', 'pqr')]
-        >>> s.tail(pattern='mno')
-        [('mno', 'pqr')]
-        >>> s.tail(pattern='123', exclude=True)
-        [('ghi', 'jkl'), ('mno', 'pqr')]
+        >>> s = String('Α alpha beta gamma\\nΒ beta gamma delta\\nΔ delta sigma lambda\\nΕ epsilon tau\\n')
+        >>> s.pairs()
+        [(('Α', 'alpha'), ('beta', 'gamma')), (('Β', 'beta'), ('gamma', 'delta')), (('Δ', 'delta'), ('sigma', 'lambda')), (('Ε', 'epsilon'),)]
 
         ```
         Args:
-            sep (str, optional): Separator character. Defaults to None.
+            as_dict (bool, optional): Should pairs be inserted into a dict. Defaults to False.
             maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            sep (str, optional): Separator character. Defaults to None.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
+            compact (bool, optional): With `as_dict`, return a `Record` instead of a dict for each line, for up to `MAX_RECORD_TYPES` distinct sets of keys, leaving lines with any others as dicts. Defaults to False.
 
         Returns:
-            list: List of tuples with all but first element of each split line.
+            list: List of tuples of tuples or list of dicts.
         """
-        return self._tail(
+        return self._pairs(
+            as_dict=as_dict,
             sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            compact=compact,
         )
 
-    def fields(
+    def groupby(
         self,
-        sep=None,
-        maxsplit=-1,
+        key_func,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Split each line from input into fields and join each column into a
-        tuple. This is meant to be used with text where multiple lines contain
-        same number of fields (sub-strings), and result of this is a list of
-        tuples where each tuple contains elements from a given position across
-        all lines.
-        Given a string: 'alpha beta gamma\\ndelta epsilon zeta\\n',
-        this produces: [('alpha', 'delta'), ('beta', 'epsilon'), ('gamma', 
-        'zeta')].
+        A groupby function, which for each line based on the key function in
+        `key_func` adds the line to an already existing group, or creates and
+        adds it to a new group if the derived key is first seen. The final
+        product is a dictionary where each key maps to a list of one or more
+        lines.
         ```
         >>> from integraty.xstring import String
-        >>> s1 = String('alpha beta gamma\\ndelta epsilon zeta\\n')
-        >>> s1.fields()
-        [('alpha', 'delta'), ('beta', 'epsilon'), ('gamma', 'zeta')]
+        >>> s = String('Θ alpha beta\\nψ beta gamma\\nΘ delta sigma\\nψ epsilon tau\\n')
+        >>> s.groupby(lambda l: l[0])
+        defaultdict(<class 'list'>, {'Θ': ['Θ alpha beta', 'Θ delta sigma'], 'ψ': ['ψ beta gamma', 'ψ epsilon tau']})
 
         ```
+
         Args:
-            sep (str, optional): Separator character. Defaults to None.
-            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            key_func (Callable[[str], Any]): For each line generate a key to establish a group to which the line will be added.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: List of tuples from each split line.
+            dict: A dictionary of str -> List[str] with grouped lines.
         """
-        return self._fields(
-            sep=sep,
+        return self._groupby(
+            key_func=key_func,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def take_column(
+    def aggregate(
         self,
+        by,
+        aggregations=None,
+        sort=False,
+        reverse=False,
         sep=None,
         maxsplit=-1,
-        column=0,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Take a single column out of each line from input, after splitting the
-        line on `sep`.
+        Groups lines by one or more of their columns, computing aggregations
+        of each group, like count of lines, or sum of a numeric column, see
+        `integraty.aggregate`. Lines are split, grouped and aggregated as
+        they are read from input, in a single pass, and only aggregated
+        values are kept for each group. Keys and columns of aggregations are
+        column indexes of split lines, or callables taking a split line.
         ```
         >>> from integraty.xstring import String
-        >>> s1 = String('a b c d\\ne f g h h i j k\\nl m n o\\n')
-        >>> s1.take_column(column=0)
-        ['a', 'e', 'l']
-        >>> s1.take_column(column=1)
-        ['b', 'f', 'm']
-        >>> s1.take_column(column=2)
-        ['c', 'g', 'n']
+        >>> from integraty.aggregate import Count, Max, Sum
+        >>> s = String('eth0 rx 100\\neth1 rx 20\\neth0 tx 50\\neth0 rx 300\\n')
+        >>> s.aggregate(0, {'n': Count(), 'bytes': Sum(2, int)})
+        {'eth0': Group(n=3, bytes=450), 'eth1': Group(n=1, bytes=20)}
+        >>> s.aggregate((0, 1), {'max': Max(2, int)}, sort=True)
+        {('eth0', 'rx'): Group(max=300), ('eth0', 'tx'): Group(max=50), ('eth1', 'rx'): Group(max=20)}
 
         ```
         Args:
+            by (int, Callable, tuple): Key of each line, or a tuple of keys.
+            aggregations (Mapping[str, Aggregation], optional): Aggregations by name. Defaults to a `Count` named 'count'.
+            sort (bool, Callable, optional): Sort groups by key if True, or by result of calling it with key and record of each group. Defaults to False, order of first appearance.
+            reverse (bool, optional): Sort in descending order. Defaults to False.
             sep (str, optional): Separator character. Defaults to None.
             maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
-            column (int, optional): Select column matching this index. Defaults to 0.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: List of elements extracted from each split line.
+            dict: Mapping of group keys to records of aggregated values.
         """
-        return self._take_column(
+        return self._aggregate(
+            by=by,
+            aggregations=aggregations,
+            sort=sort,
+            reverse=reverse,
             sep=sep,
-            column=column,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def compress(
+    def groupby_count(
         self,
-        sep=None,
-        maxsplit=-1,
-        indexes=(),
+        key_func,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
+        workers=None,
     ):
         """
-        Select one or more fields from each line from input, after splitting
-        the line on `sep`.
-        To make this more concrete let's take this example.
-        Given the line: `The quick brown fox jumps over the lazy dog`
-        to select words _quick_, _jumps_, _lazy_ and _dog_, indexes field
-        would be set to (1, 4, 7, 8).
-
-        Each line of text consists of zero or more substrings. An empty line
-        consists of zero substrings and cannot be indexed into. Any line with
-        one or more substrings, once split on `sep` is going to have 
-        `len(line)-1` positions or indexes if you think of this line as a list
-        of tokens. By specifying only certain indexes one can extract
-        substrings of interest.
+        A groupby histogram function, which for each line based on the key
+        function in `key_func` increments count of an existing group or adds a
+        new group to collection of groups. The intent of this function is to
+        give a flexible mechanism for group results without keeping all the
+        lines, and instead just a histogram of the data. This is most useful
+        when we know for example that we expect at least X number of items in
+        a particular group.
         ```
         >>> from integraty.xstring import String
-        >>> s1 = String('a b c d\\ne f g h h i j k\\nl m n o\\n')
-        >>> s1.compress(indexes=(0,3))
-        [('a', 'd'), ('e', 'h'), ('l', 'o')]
-        >>> s1.compress(indexes=(0,2,3))
-        [('a', 'c', 'd'), ('e', 'g', 'h'), ('l', 'n', 'o')]
+        >>> s = String('Θ alpha beta\\nψ beta gamma\\nΘ delta sigma\\nψ epsilon tau\\n')
+        >>> s.groupby_count(lambda l: l[0])
+        {'Θ': 2, 'ψ': 2}
 
         ```
         Args:
-            sep (str, optional): Separator character. Defaults to None.
-            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
-            indexes (tuple, optional): Sequence of column indexes. Defaults to ().
+            key_func (Callable[[str], Any]): For each line generate a key to establish a group to which the line will be added.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
+            workers (int, optional): Number of processes among which to split input of at least `parallel.PARALLEL_MIN_LINES` lines. Defaults to None, serial.
 
         Returns:
-            list: List of tuples, where each tuple contains one or more fields from each split line.
+            dict: A dictionary of Any -> int with count for each distinct group.
         """
-        return self._compress(
-            sep=sep,
-            indexes=indexes,
+        return self._groupby_count(
+            key_func=key_func,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            workers=workers,
         )
 
-    def take_range_fields(
+    def top_k(
         self,
+        k,
+        column=0,
+        type=float,
+        smallest=False,
         sep=None,
         maxsplit=-1,
-        slc_range=(0, 1, 1),
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Select multiple fields within the 'slc_range' range from each line
-        from input, after splitting the line on `sep`.
+        Lines with `k` largest values of `column`, in descending order, like
+        `sort -rn -k column | head -n k`, or smallest ones, in ascending
+        order, with `smallest`. Lines are read in a single pass, keeping a
+        heap of at most `k` lines.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('a.com 300\\nb.com 60\\nc.com 3600\\nd.com 30\\n')
+        >>> s.top_k(2, column=1)
+        ['c.com 3600', 'a.com 300']
+        >>> s.top_k(1, column=1, smallest=True)
+        ['d.com 30']
 
+        ```
         Args:
+            k (int): Number of lines.
+            column (int, Callable, optional): Column, or callable taking a split line, to rank lines by. Defaults to 0.
+            type (Callable, optional): Conversion of values to compare. Defaults to float.
+            smallest (bool, optional): Select smallest values instead. Defaults to False.
             sep (str, optional): Separator character. Defaults to None.
             maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
-            slc_range (tuple, optional): Range (start, end, stride). Defaults to (0, 1, 1).
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: List of tuples, where each tuple contains one or more fields from each split line.
+            list: Selected lines.
         """
-        return self._take_range_fields(
+        return self._top_k(
+            k=k,
+            column=column,
+            type=type,
+            smallest=smallest,
             sep=sep,
-            slc_range=slc_range,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def line_tuples(
+    def most_common(
         self,
+        k=10,
+        by=0,
+        capacity=None,
         sep=None,
         maxsplit=-1,
-        strip_punct=False,
-        strip_chars=PCHARS,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Split lines in supplied string into tuples with `sep` as optional
-        separator, where each line is converted into a N-tuple containing
-        all (N) tokens after the split of that line.
+        Most frequent values of a column, and their counts, in descending
+        order of counts, like `uniq -c | sort -rn | head -n k`, in a single
+        pass, with no sorting of all counts. Memory is proportional to the
+        number of distinct values, unless `capacity` is given, in which case
+        counts are approximate, see `aggregate.SpaceSaving`, though never
+        below true counts, and at most `2 * capacity` values are counted.
         ```
         >>> from integraty.xstring import String
-        >>> s = String('# alpha Ω\\n# beta Ω\\n# gamma Ω\\n# delta Δ\\n') 
-        >>> s.line_tuples()
-        [('#', 'alpha', 'Ω'), ('#', 'beta', 'Ω'), ('#', 'gamma', 'Ω'), ('#', 'delta', 'Δ')]
-        >>> s.line_tuples(pattern='ta')
-        [('#', 'beta', 'Ω'), ('#', 'delta', 'Δ')]
-        >>> s.line_tuples(pattern='ta', exclude=True)
-        [('#', 'alpha', 'Ω'), ('#', 'gamma', 'Ω')]
-
-        >>> s = String('alpha Ω,# beta Ω,# gamma Ω,# delta Δ')
-        >>> s.lines()
-        ['alpha Ω,# beta Ω,# gamma Ω,# delta Δ']
-        >>> s.line_tuples(sep=',')
-        [('alpha Ω', '# beta Ω', '# gamma Ω', '# delta Δ')]
+        >>> s = String('a.com A\\nb.com A\\na.com MX\\na.com AAAA\\nb.com A\\nc.com A\\n')
+        >>> s.most_common(2)
+        [('a.com', 3), ('b.com', 2)]
+        >>> s.most_common(1, by=(0, 1))
+        [(('b.com', 'A'), 2)]
 
         ```
         Args:
+            k (int, optional): Number of values. Defaults to 10.
+            by (int, Callable, tuple, optional): Column, callable taking a split line, or a tuple of those. Defaults to 0.
+            capacity (int, optional): Number of counters for approximate counting. Defaults to None, exact.
             sep (str, optional): Separator character. Defaults to None.
             maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
-            strip_punct (bool, optional): Enable punctuation stripping. Defaults to False.
-            strip_chars (str, optional): Characters to strip if 'strip_punct' is True. Defaults to PCHARS.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: List of tuples, where each tuple contains fields from each split line.
+            List[Tuple[Any, int]]: Value and count pairs.
         """
-        return self._line_tuples(
+        return self._most_common(
+            k=k,
+            by=by,
+            capacity=capacity,
             sep=sep,
-            strip_punct=strip_punct,
-            strip_chars=strip_chars,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def lines(self,
-              sub_pattern=None,
-              replacement=None,
-              pattern=None,
-              exclude=False):
+    def distinct_count(
+        self,
+        by=0,
+        approximate=False,
+        precision=14,
+        sep=None,
+        maxsplit=-1,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
         """
-        Lines from supplied str, optionally filtered with regular expression
-        in `pattern`.
+        Number of distinct values of a column, like `sort -u | wc -l`,
+        counted exactly, in a set of values, or approximately, with
+        `aggregate.HyperLogLog`, in `2 ** precision` bytes, however many
+        values there are.
         ```
         >>> from integraty.xstring import String
-        >>> s = String('2020-01-02 alpha Ω\\n2020-01-02 beta Ω\\n2020-02-01 gamma Ω\\n2020-02-03 delta Δ\\n')
-        >>> s.lines(sub_pattern=r'\\d{4}-\\d{2}-\\d{2} ', replacement='')
-        ['alpha Ω', 'beta Ω', 'gamma Ω', 'delta Δ']
-        >>> s.lines(sub_pattern=r'^\\S+ ', replacement='')
-        ['alpha Ω', 'beta Ω', 'gamma Ω', 'delta Δ']
-        >>> s.lines(sub_pattern=r'^\\S+', replacement='*'*5)
-        ['***** alpha Ω', '***** beta Ω', '***** gamma Ω', '***** delta Δ']
-        >>> s.lines(sub_pattern=r'^\\S+', replacement='*'*5, pattern='ha')
-        ['***** alpha Ω']
-        >>> s.lines(sub_pattern=r'^\\S+', replacement='*'*5, pattern='ha', exclude=True)
-        ['***** beta Ω', '***** gamma Ω', '***** delta Δ']
+        >>> s = String('a.com A\\nb.com A\\na.com MX\\na.com AAAA\\n')
+        >>> s.distinct_count(), s.distinct_count(by=1), s.distinct_count(by=(0, 1))
+        (2, 3, 4)
+        >>> s.distinct_count(approximate=True)
+        2
 
         ```
         Args:
+            by (int, Callable, tuple, optional): Column, callable taking a split line, or a tuple of those. Defaults to 0.
+            approximate (bool, optional): Estimate count in bounded memory. Defaults to False.
+            precision (int, optional): Precision of estimate, see `aggregate.HyperLogLog`. Defaults to 14.
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
-        
+
         Returns:
-            list: List of lines from input.
+            int: Number of distinct values.
         """
-        return self._lines(
+        return self._distinct_count(
+            by=by,
+            approximate=approximate,
+            precision=precision,
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def trim_prefix(
+    def quantiles(
         self,
-        prefix,
+        column,
+        qs=(0.5, 0.9, 0.99),
+        type=float,
+        sample_size=None,
+        seed=None,
+        sep=None,
+        maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Trim substring in `prefix` from beginning of each line of input, after
-        splitting, assuming substring is present.
+        Quantiles of a numeric column, e.g. median and tail latencies,
+        interpolated linearly between closest values. Values are converted
+        and kept in a compact array, unless `sample_size` is given, in which
+        case quantiles are estimated from a uniform random sample of at most
+        that many values, see `aggregate.Reservoir`, in bounded memory.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('GET 12.5\\nGET 3.0\\nPUT 40.0\\nGET 7.5\\nGET 5.0\\n')
+        >>> s.quantiles(1, qs=(0.5, 0.75, 1))
+        {0.5: 7.5, 0.75: 12.5, 1: 40.0}
+        >>> s.quantiles(1, qs=(0.5, ), pattern='GET')
+        {0.5: 6.25}
 
+        ```
         Args:
-            prefix (str): Prefix to trim from beginning of each line.
+            column (int, Callable): Column, or callable taking a split line.
+            qs (Iterable[float], optional): Quantiles, each between 0 and 1. Defaults to (0.5, 0.9, 0.99).
+            type (Callable, optional): Conversion of values. Defaults to float.
+            sample_size (int, optional): Size of sample to estimate quantiles from. Defaults to None, exact.
+            seed (optional): Seed of sampling. Defaults to None.
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: List of lines with prefix trimmed from each.
+            Dict[float, float]: Value of each quantile, None without any lines.
         """
-        return self._trim_prefix(
-            prefix=prefix,
+        return self._quantiles(
+            column=column,
+            qs=qs,
+            type=type,
+            sample_size=sample_size,
+            seed=seed,
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def trim_suffix(
+    def histogram(
         self,
-        suffix,
+        column,
+        bins,
+        type=float,
+        sep=None,
+        maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Trim substring in `suffix` from beginning of each line of input, after
-        splitting, assuming substring is present.
+        Counts values of a numeric column in buckets of width `bins`, or
+        between consecutive edges, if `bins` is a sequence of edges, in a
+        single pass, keeping only a count per bucket, see
+        `aggregate.Histogram`.
         ```
         >>> from integraty.xstring import String
-        >>> s = String('Α alpha beta gamma ;;\\nΒ beta gamma delta ;;\\nΔ delta sigma lambda ;;\\nΕ epsilon tau ;;\\n')
-        >>> s.trim_suffix(' ;;')
-        ['Α alpha beta gamma', 'Β beta gamma delta', 'Δ delta sigma lambda', 'Ε epsilon tau']
+        >>> s = String('GET 12.5\\nGET 3.0\\nPUT 40.0\\nGET 7.5\\nGET 5.0\\n')
+        >>> s.histogram(1, 10)
+        {(0, 10): 3, (10, 20): 1, (40, 50): 1}
+        >>> s.histogram(1, [5, 10])
+        {(-inf, 5): 1, (5, 10): 2, (10, inf): 2}
 
         ```
         Args:
-            suffix (str): Suffix to trim from end of each line.
+            column (int, Callable): Column, or callable taking a split line.
+            bins (float, Sequence[float]): Width of buckets, or their edges.
+            type (Callable, optional): Conversion of values. Defaults to float.
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: List of lines with suffix trimmed from each.
+            Dict[Tuple[float, float], int]: Count of values of each bucket, by lower and upper edge.
         """
-        return self._trim_suffix(
-            suffix=suffix,
+        return self._histogram(
+            column=column,
+            bins=bins,
+            type=type,
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def with_prefix(
+    def partial(
         self,
-        prefix,
+        func,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Limits included lines from input to those matching given prefix.
-        If a pattern results in some subset of original lines, this subset
-        will be subject to application of `prefix`. In other words, lines with
-        `prefix` may be excluded as a result of pattern matching, because
-        prefix checking occurs after application of `pattern` and `exclude`
-        parameters, not before.
+        A partial application method, which for each line from input partially
+        applies function in `func` supplying the line from input as first
+        positional argument to function effectively reducing the arity of
+        function in `func` by one argument. This method is useful for situations
+        where doing something more with the contents of line than
+        simple splitting and/or field extraction is necessary. A good example
+        is converting a line into a dictionary after selecting only certain
+        tokens in the line, and then having to supply keys in order to create
+        _key:value_ pairs and convert these _key:value_ pairs into a dict.
         ```
-        >>> from integraty.xstring import String
-        >>> s = String('# alpha Ω\\n# beta Ω\\n# gamma Ω\\n# delta Δ\\n')
-        >>> s.with_prefix('#')
-        ['# alpha Ω', '# beta Ω', '# gamma Ω', '# delta Δ']
-        >>> s.with_prefix(prefix='%', sub_pattern='#', replacement='%')  
-        ['% alpha Ω', '% beta Ω', '% gamma Ω', '% delta Δ']
+        from integraty.xstring import String
+        >>> s = String('alpha beta gamma\\nbeta gamma delta\\n')
+        >>> partially_applied = s.partial(lambda l, keys: dict(zip(keys, l.split())))
+        >>> keys = ['first', 'second', 'third']
+        >>> [f(keys) for f in partially_applied]
+        [{'first': 'alpha', 'second': 'beta', 'third': 'gamma'}, {'first': 'beta', 'second': 'gamma', 'third': 'delta'}]
 
         ```
         Args:
-            prefix (str): Lines with given prefix should be included.
+            func (Callable[[Any,...], Any]): Partially apply `func` to each line in input.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: Lines matching given prefix.
+            list: List of partially applied functions; one per line.
         """
-        return self._with_prefix(
-            prefix=prefix,
+        return self._partial(
+            func=func,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def with_suffix(
-        self,
-        suffix,
-        sub_pattern=None,
-        replacement=None,
-        pattern=None,
-        exclude=False,
-    ):
+    def iter_lines(self,
+                   sub_pattern=None,
+                   replacement=None,
+                   pattern=None,
+                   exclude=False):
         """
-        Limits included lines from input to those matching given suffix.
-        If a pattern results in some subset of original lines, this subset
-        will be subject to application of `suffix`. In other words, lines with
-        `suffix` may be excluded as a result of pattern matching, because
-        suffix checking occurs after application of `pattern` and `exclude`
-        parameters, not before.
+        Streaming variant of `lines`. Lines are read from input and yielded
+        one at a time, so memory use does not grow with size of input.
+        ```
+        >>> from integraty.xstring import String
+        >>> s = String('alpha Ω\\nbeta Ω\\ngamma Ω\\ndelta Δ\\n')
+        >>> lines = s.iter_lines(pattern='Ω', exclude=True)
+        >>> next(lines)
+        'delta Δ'
+        >>> list(s.iter_lines(sub_pattern='Ω', replacement='O', pattern='^[ab]'))
+        ['alpha O', 'beta O']
 
+        ```
         Args:
-            suffix (str): Lines with given prefix should be included.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
-        Returns:
-            list: Lines matching given suffix.
+        Yields:
+            str: Lines from input.
         """
-        return self._with_suffix(
-            suffix=suffix,
+        return self._iter_lines(
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            lazy=True,
         )
 
-    def count_substrs(self, substr=None, pattern=None, exclude=False):
+    def iter_line_tuples(
+        self,
+        sep=None,
+        maxsplit=-1,
+        strip_punct=False,
+        strip_chars=PCHARS,
+        sub_pattern=None,
+        replacement=None,
+        pattern=None,
+        exclude=False,
+    ):
         """
-        Counts lines in supplied string where at least one match for substring
-        given in `substr` is found. This is a count of matching lines, not a
-        total count of substrings, which could be greater if any given line
-        contains more than a single matching substring.
+        Streaming variant of `line_tuples`, yielding a tuple of tokens for
+        each line as it is read from input.
         ```
         >>> from integraty.xstring import String
-        >>> s = String('alpha Ω\\nbeta Ω\\ngamma Ω\\ndelta Δ\\n')
-        >>> s.count_substrs(substr='Ω')
-        3
-        >>> s.count_substrs(substr='Ω', pattern='alpha', exclude=True)
-        2
-        >>> s.count_substrs(substr='Ω', pattern='alpha')
-        1
+        >>> s = String('# alpha Ω\\n# beta Ω\\n# gamma Ω\\n# delta Δ\\n')
+        >>> list(s.iter_line_tuples(pattern='ta'))
+        [('#', 'beta', 'Ω'), ('#', 'delta', 'Δ')]
 
         ```
         Args:
-            substr (str, optional): Substring to find in each line. Defaults to None.
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            strip_punct (bool, optional): Enable punctuation stripping. Defaults to False.
+            strip_chars (str, optional): Characters to strip if 'strip_punct' is True. Defaults to PCHARS.
+            sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
+            replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
-        Returns:
-            int: Count of lines with at least one substring match.
+        Yields:
+            tuple: Fields from each split line.
         """
-        return self._count_substrs(substr=substr,
-                                   pattern=pattern,
-                                   exclude=exclude)
-
-    def at_least_n_substr(self, substr=None, n=0):
-        return self._at_least_n_substr(substr, n)
-
-    def at_most_n_substr(self, substr=None, n=0):
-        return self._at_most_n_substr(substr, n)
+        return self._iter_line_tuples(
+            sep=sep,
+            maxsplit=maxsplit,
+            strip_punct=strip_punct,
+            strip_chars=strip_chars,
+            sub_pattern=sub_pattern,
+            replacement=replacement,
+            pattern=pattern,
+            exclude=exclude,
+        )
 
-    def filter_func(
+    def iter_take_column(
         self,
-        func,
+        sep=None,
+        maxsplit=-1,
+        column=0,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Filters lines from supplied string with a filtering function in
-        `func` argument. This function should expect a single string argument
-        which will be a line and return a boolean. Any lines that cause this
-        function to return `True` will be included in the resulting list, and
-        those that result in `False` will be excluded, unless `exclude` is
-        `True`, which inverts this logic.
+        Streaming variant of `take_column`, yielding a single column out of
+        each line as it is read from input.
         ```
-        from integraty.xstring import String
-        >>> s = String('alpha beta gamma\\ndelta epsilon zeta\\n')
-        >>> s.filter_func(lambda x: 'zeta' in x.split())
-        ['delta epsilon zeta']
-        >>> s.filter_func(lambda x: 'zeta' in x.split(), exclude=True) 
-        ['alpha beta gamma']
+        >>> from integraty.xstring import String
+        >>> s1 = String('a b c d\\ne f g h h i j k\\nl m n o\\n')
+        >>> list(s1.iter_take_column(column=2))
+        ['c', 'g', 'n']
 
         ```
         Args:
-            func ((s: str) -> bool): Filtering function emitting a boolean.
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
+            column (int, optional): Select column matching this index. Defaults to 0.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
-            exclude (bool, optional): Invert filtering logic. Defaults to False.
-        Returns:
-            list: List of lines after filtering function is applied.
+            exclude (bool, optional): Invert pattern matching. Defaults to False.
+
+        Yields:
+            str: Element extracted from each split line.
         """
-        return self._filter_func(
-            func=func,
+        return self._iter_take_column(
+            sep=sep,
+            maxsplit=maxsplit,
+            column=column,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def map_func(
+    def iter_fields(
         self,
-        func,
+        sep=None,
+        maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Applies function in 'func' to each line written in input.
-        Transformations from these map operations will be included in
-        the resulting list. Result of calling 'func' should not be None.
+        Streaming variant of `fields`. Each tuple spans all lines, therefore
+        input is read once more for every column, but only a single column is
+        held in memory at any time.
+        ```
+        >>> from integraty.xstring import String
+        >>> s1 = String('alpha beta gamma\\ndelta epsilon zeta\\n')
+        >>> list(s1.iter_fields())
+        [('alpha', 'delta'), ('beta', 'epsilon'), ('gamma', 'zeta')]
 
+        ```
         Args:
-            func ((s: str) -> Any): Mapping function receiving a string and emitting Any other type.
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
-        Returns:
-            list: List of results from application of mapping function.
+        Yields:
+            tuple: Elements from a given position across all lines.
         """
-        return self._map_func(
-            func=func,
+        return self._iter_fields(
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def filtered_map(
+    def iter_map_func(
         self,
-        map_func,
-        filter_func,
+        func,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
     ):
         """
-        Higher-order function taking a mapping function and a filtering
-        function.
-        For every line for which `filter_func` returns `True`, `map_func` is
-        applied over it, producing subset of transformed lines. Filtering and
-        mapping occur after optional substitution and selection or excludion
-        of lines matching a pattern. This method is meant to give user much
-        more control over how to select lines and what to do with them, before
-        having them returned as a list.
+        Streaming variant of `map_func`, applying function in 'func' to each
+        line as it is read from input.
         ```
         >>> from integraty.xstring import String
-        >>> s = String('Α alpha beta gamma\\nΒ beta gamma delta\\nΔ delta sigma lambda\\nΕ epsilon tau\\n')
-        >>> s.filtered_map(lambda l: l.replace(' ', '_'), lambda l: l.find('sigma') >= 0)
-        ['Δ_delta_sigma_lambda']
-        >>> s.filtered_map(lambda l: l.replace(' ', '_'), lambda l: l.find('alpha') >= 0)
-        ['Α_alpha_beta_gamma']
+        >>> s = String('alpha beta gamma\\ndelta epsilon zeta\\n')
+        >>> list(s.iter_map_func(lambda l: l.split()[-1]))
+        ['gamma', 'zeta']
 
         ```
         Args:
-            map_func (Callable[[Any], Any]): Function to apply over given lines.
-            filter_func (Callable[[Any], bool]): Function to select lines.
+            func ((s: str) -> Any): Mapping function receiving a string and emitting Any other type.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
-        Returns:
-            list: List of filtered results over which mapping function was applied.
+        Yields:
+            Any: Result from application of mapping function.
         """
-        return self._filtered_map(
-            map_func=map_func,
-            filter_func=filter_func,
+        return self._iter_map_func(
+            func=func,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def fold_funcs(
+    def iter_filtered_map(
         self,
-        *funcs,
+        map_func,
+        filter_func,
         sub_pattern=None,
         replacement=None,
         pattern=None,
-        exclude=None,
+        exclude=False,
     ):
         """
-        Higher-order function taking one or more functions composing them
-        together, then applying the composed function over each line from
-        input.
-        This method is meant to emulate a unix pipeline, where information
-        is piped through multiple programs and possibly mutated throughout the
-        pipeline. Each function passed in is assumed to have a single argument.
-        First function in the chain will receive a single complete line, but
-        every other function will receive output of previous function.
-
-        Assuming there are three functions that must be applied to each line
-        and these functions are called `a`, `b`, and `c`, where `a` is the
-        first function, `b` second, and `c` last, the sequence as a pipeline
-        looks like this: `line |> a |> b |> c`, or in mathematical terms it
-        looks like this:
-        ```
-        a(line)
-        b(a(line))
-        c(b(a(line)))
-        ```
+        Streaming variant of `filtered_map`, applying `map_func` to each line
+        selected by `filter_func` as it is read from input.
         ```
         >>> from integraty.xstring import String
         >>> s = String('Α alpha beta gamma\\nΒ beta gamma delta\\nΔ delta sigma lambda\\nΕ epsilon tau\\n')
-        >>> s.fold_funcs(lambda l: l[2:], lambda l: tuple(l.title().split()), lambda l: sorted(l))
-        [['Alpha', 'Beta', 'Gamma'], ['Beta', 'Delta', 'Gamma'], ['Delta', 'Lambda', 'Sigma'], ['Epsilon', 'Tau']]
+        >>> list(s.iter_filtered_map(lambda l: l.replace(' ', '_'), lambda l: l.find('sigma') >= 0))
+        ['Δ_delta_sigma_lambda']
 
         ```
-
         Args:
-            *funcs (Sequence[Callable[(s: str) -> string]]): A sequence of functions, each with a single argument, returning a single value.
+            map_func (Callable[[Any], Any]): Function to apply over given lines.
+            filter_func (Callable[[Any], bool]): Function to select lines.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
-        Returns:
-            list: List of results from application of sequence of callables.
+        Yields:
+            Any: Filtered result over which mapping function was applied.
         """
-        return self._fold_funcs(
-            funcs,
+        return self._iter_filtered_map(
+            map_func=map_func,
+            filter_func=filter_func,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
         )
 
-    def pairs(
+    def iter_pairs(
         self,
         as_dict=False,
         sep=None,
@@ -1536,46 +3131,43 @@ class String(str):
         replacement=None,
         pattern=None,
         exclude=False,
+        compact=False,
     ):
         """
-        Break-up each line from input into pairs, optionally placing these
-        pairs into dicts, with one dict per line. Pairs are effectively
-        adjacent strings. To make this more clear, given this line:
-        `name abc path /var/log/abc.log`, result is a tuple of 2-tuples:
-        `(('name', 'abc'), ('path', '/var/log/abc.log'))`, and converted to
-        dict it becomes: {'name': 'abc', 'path': '/var/log/abc.log'}.
-
-        If a line contains odd number of tokens after being split, last token
-        in the split line will be discarded.
+        Streaming variant of `pairs`, breaking up each line into pairs as it
+        is read from input.
         ```
         >>> from integraty.xstring import String
-        >>> s = String('Α alpha beta gamma\\nΒ beta gamma delta\\nΔ delta sigma lambda\\nΕ epsilon tau\\n')
-        >>> s.pairs()
-        [(('Α', 'alpha'), ('beta', 'gamma')), (('Β', 'beta'), ('gamma', 'delta')), (('Δ', 'delta'), ('sigma', 'lambda')), (('Ε', 'epsilon'),)]
+        >>> s = String('name abc path /var/log/abc.log\\nname xyz path /var/log/xyz.log\\n')
+        >>> list(s.iter_pairs(as_dict=True, pattern='xyz'))
+        [{'name': 'xyz', 'path': '/var/log/xyz.log'}]
 
         ```
         Args:
             as_dict (bool, optional): Should pairs be inserted into a dict. Defaults to False.
-            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
             sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
+            compact (bool, optional): With `as_dict`, yield a `Record` instead of a dict for each line, for up to `MAX_RECORD_TYPES` distinct sets of keys, leaving lines with any others as dicts. Defaults to False.
 
-        Returns:
-            list: List of tuples of tuples or list of dicts.
+        Yields:
+            tuple, dict: Tuple of tuples or dict for each line.
         """
-        return self._pairs(
+        return self._iter_pairs(
             as_dict=as_dict,
             sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            compact=compact,
         )
 
-    def groupby(
+    def iter_groupby_count(
         self,
         key_func,
         sub_pattern=None,
@@ -1584,19 +3176,17 @@ class String(str):
         exclude=False,
     ):
         """
-        A groupby function, which for each line based on the key function in
-        `key_func` adds the line to an already existing group, or creates and
-        adds it to a new group if the derived key is first seen. The final
-        product is a dictionary where each key maps to a list of one or more
-        lines.
+        Streaming variant of `groupby_count`. Lines are consumed as they are
+        read from input, keeping only a counter for each distinct group,
+        after which `(group, count)` tuples are yielded in order in which
+        groups were first seen.
         ```
         >>> from integraty.xstring import String
         >>> s = String('Θ alpha beta\\nψ beta gamma\\nΘ delta sigma\\nψ epsilon tau\\n')
-        >>> s.groupby(lambda l: l[0])
-        defaultdict(<class 'list'>, {'Θ': ['Θ alpha beta', 'Θ delta sigma'], 'ψ': ['ψ beta gamma', 'ψ epsilon tau']})
+        >>> list(s.iter_groupby_count(lambda l: l[0]))
+        [('Θ', 2), ('ψ', 2)]
 
         ```
-
         Args:
             key_func (Callable[[str], Any]): For each line generate a key to establish a group to which the line will be added.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
@@ -1604,10 +3194,10 @@ class String(str):
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
-        Returns:
-            dict: A dictionary of str -> List[str] with grouped lines.
+        Yields:
+            tuple: Distinct group and count of lines in the group.
         """
-        return self._groupby(
+        return self._iter_groupby_count(
             key_func=key_func,
             sub_pattern=sub_pattern,
             replacement=replacement,
@@ -1615,90 +3205,105 @@ class String(str):
             exclude=exclude,
         )
 
-    def groupby_count(
+    def columns(
         self,
-        key_func,
+        columns=(0, ),
+        types=str,
+        sep=None,
+        maxsplit=-1,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
+        use_numpy=None,
     ):
         """
-        A groupby histogram function, which for each line based on the key
-        function in `key_func` increments count of an existing group or adds a
-        new group to collection of groups. The intent of this function is to
-        give a flexible mechanism for group results without keeping all the
-        lines, and instead just a histogram of the data. This is most useful
-        when we know for example that we expect at least X number of items in
-        a particular group.
+        Columnar counterpart of `take_column`, which extracts one or more
+        columns from each line from input, after splitting the line on `sep`,
+        into typed buffers, one per column. Columns of `int` and `float` are
+        NumPy arrays when NumPy is installed, or `array.array` otherwise,
+        either of which can be summed, sorted, etc. without a Python loop
+        over the values, and uses a fraction of memory of a list. Lines which
+        do not have all selected columns raise IndexError, and tokens which
+        are not valid numbers raise ValueError, hence `pattern` should be
+        used to skip headers and the like.
         ```
         >>> from integraty.xstring import String
-        >>> s = String('Θ alpha beta\\nψ beta gamma\\nΘ delta sigma\\nψ epsilon tau\\n')
-        >>> s.groupby_count(lambda l: l[0])
-        {'Θ': 2, 'ψ': 2}
+        >>> s = String('host rx tx\\nalpha 10 0.5\\nbeta 20 1.5\\n')
+        >>> host, rx, tx = s.columns((0, 1, 2), (str, int, float), pattern='^host', exclude=True, use_numpy=False)
+        >>> host, rx, tx
+        (['alpha', 'beta'], array('q', [10, 20]), array('d', [0.5, 1.5]))
+        >>> sum(rx), max(tx)
+        (30, 1.5)
 
         ```
         Args:
-            key_func (Callable[[str], Any]): For each line generate a key to establish a group to which the line will be added.
+            columns (tuple, optional): Indexes of columns to extract. Defaults to (0,).
+            types (type, Sequence, optional): Type of all columns, or of each column; `int`, `float`, `str` or an `array` typecode. Defaults to str.
+            sep (str, optional): Separator character. Defaults to None.
+            maxsplit (int, optional): Split line at most this many times. Defaults to `-1`, no limit.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
+            use_numpy (bool, optional): Build NumPy arrays, or never do, or if None, only if NumPy is installed. Defaults to None.
 
         Returns:
-            dict: A dictionary of Any -> int with count for each distinct group.
+            list: List of columns, in order of `columns`.
         """
-        return self._groupby_count(
-            key_func=key_func,
+        return self._columns(
+            columns=columns,
+            types=types,
+            sep=sep,
+            maxsplit=maxsplit,
             sub_pattern=sub_pattern,
             replacement=replacement,
             pattern=pattern,
             exclude=exclude,
+            use_numpy=use_numpy,
         )
 
-    def partial(
+    def parse(
         self,
-        func,
+        schema,
         sub_pattern=None,
         replacement=None,
         pattern=None,
         exclude=False,
-    ):
+    ) -> ParseResult:
         """
-        A partial application method, which for each line from input partially
-        applies function in `func` supplying the line from input as first
-        positional argument to function effectively reducing the arity of
-        function in `func` by one argument. This method is useful for situations
-        where doing something more with the contents of line than
-        simple splitting and/or field extraction is necessary. A good example
-        is converting a line into a dictionary after selecting only certain
-        tokens in the line, and then having to supply keys in order to create
-        _key:value_ pairs and convert these _key:value_ pairs into a dict.
+        Parses each line from input into a record with named and typed fields
+        described by `schema`. Unlike `map_func` and the like, lines which do
+        not fit the schema are not silently dropped, but reported in `errors`
+        of the result, along with the exception raised while parsing them.
         ```
-        from integraty.xstring import String
-        >>> s = String('alpha beta gamma\\nbeta gamma delta\\n')
-        >>> partially_applied = s.partial(lambda l, keys: dict(zip(keys, l.split())))
-        >>> keys = ['first', 'second', 'third']
-        >>> [f(keys) for f in partially_applied]
-        [{'first': 'alpha', 'second': 'beta', 'third': 'gamma'}, {'first': 'beta', 'second': 'gamma', 'third': 'delta'}]
+        >>> from integraty.xstring import String
+        >>> s = String('eth0 1500 up\\neth1 - down\\nlo 65536\\n')
+        >>> res = s.parse([('iface', str), ('mtu', int, True), ('state', str)])
+        >>> res.rows
+        [Row(iface='eth0', mtu=1500, state='up'), Row(iface='eth1', mtu=None, state='down')]
+        >>> res.errors[0].line, res.ok
+        ('lo 65536', False)
 
         ```
         Args:
-            func (Callable[[Any,...], Any]): Partially apply `func` to each line in input.
+            schema (Schema, Sequence): Schema of lines, or its columns.
             sub_pattern (str, optional): Substitution regex pattern. Defaults to None.
             replacement (str, optional): Text with which to replace all matches of `sub_pattern`. Defaults to None.
             pattern (str, optional): Select lines matching pattern. Defaults to None.
             exclude (bool, optional): Invert pattern matching. Defaults to False.
 
         Returns:
-            list: List of partially applied functions; one per line.
+            ParseResult: Records, and errors of lines which could not be parsed.
         """
-        return self._partial(
-            func=func,
-            sub_pattern=sub_pattern,
-            replacement=replacement,
-            pattern=pattern,
-            exclude=exclude,
-        )
+        if not isinstance(schema, Schema):
+            schema = Schema(schema)
+        return schema.parse(
+            self._iter_lines(
+                sub_pattern=sub_pattern,
+                replacement=replacement,
+                pattern=pattern,
+                exclude=exclude,
+            ))
 
     ### End String Processing Public Methods ###
@@ -16,6 +16,9 @@ setuptools.setup(
     install_requires=[
         "delegator.py>=0.1.1"
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import random
+import statistics
+import sys
+
+from collections import Counter
+
+import pytest
+
+from integraty.aggregate import Count, First, GroupBy, Last, Max, Min, Sum
+from integraty.aggregate import SpaceSaving
+from integraty.xstring import String
+
+TEXT = "".join("host%d %s %d\n" % (i % 5, "up" if i % 3 else "down", i)
+               for i in range(3 * sys.getrecursionlimit()))
+
+
+class TestGroupBy:
+
+    def test_groupby_beyond_recursion_limit(self):
+        xs = String(TEXT)
+        groups = xs.groupby(lambda l: l.split()[0])
+        assert list(groups) == ["host%d" % i for i in range(5)]
+        assert sum(map(len, groups.values())) == len(xs.lines())
+        assert groups["host1"][:2] == ["host1 up 1", "host1 down 6"]
+
+    def test_aggregations(self):
+        xs = String(TEXT)
+        n = len(xs.lines())
+        res = xs.aggregate((0, 1), {
+            "count": Count(),
+            "first": First(2, int),
+            "last": Last(2),
+            "min": Min(2, int),
+            "max": Max(2, int),
+            "total": Sum(2, int),
+        })
+        assert {k: g.count for k, g in res.items()} == xs.groupby_count(
+            lambda l: tuple(l.split()[:2]))
+        rows = [(int(i), k, s) for k, s, i in map(str.split, xs.lines())]
+        for (host, state), g in res.items():
+            values = [i for i, k, s in rows if (k, s) == (host, state)]
+            assert g == (len(values), values[0], str(values[-1]), min(values),
+                         max(values), sum(values))
+        assert sum(g.total for g in res.values()) == n * (n - 1) // 2
+
+    def test_streaming_and_sorting(self):
+        rows = [l.split() for l in String(TEXT).lines()]
+        g = GroupBy(lambda r: r[1])
+        for i in range(0, len(rows), 100):
+            g.update(iter(rows[i:i + 100]))
+        assert len(g) == 2
+        assert list(g.results()) == ["down", "up"]
+        assert list(g.results(sort=True, reverse=True)) == ["up", "down"]
+        by_count = g.results(sort=lambda key, group: group.count)
+        assert list(by_count) == ["down", "up"]
+        assert by_count["up"].count == 2 * by_count["down"].count
+
+
+RNG = random.Random(7)
+# Zipf-like keys, so that some are much more frequent than others.
+KEYS = [int(RNG.paretovariate(1.2)) for _ in range(20000)]
+SAMPLES = "".join("k%d %.3f\n" % (k, RNG.expovariate(0.1)) for k in KEYS)
+
+
+class TestSummaries:
+    keys = KEYS
+    xs = String(SAMPLES)
+
+    def test_top_k(self):
+        lines = self.xs.lines()
+        by_value = sorted(lines, key=lambda l: float(l.split()[1]))
+        assert self.xs.top_k(5, column=1) == by_value[::-1][:5]
+        assert self.xs.top_k(5, column=1, smallest=True) == by_value[:5]
+
+    def test_most_common(self):
+        counts = Counter("k%d" % k for k in self.keys)
+        assert self.xs.most_common(5) == counts.most_common(5)
+        approx = self.xs.most_common(5, capacity=20)
+        assert [k for k, _ in approx] == [k for k, _ in counts.most_common(5)]
+        s = SpaceSaving(20).update("k%d" % k for k in self.keys)
+        assert len(s.counts) <= 40
+        for key, count in s.most_common():
+            assert counts[key] <= count <= counts[key] + s.floor
+
+    def test_distinct_count(self):
+        exact = self.xs.distinct_count()
+        assert exact == len(set(self.keys))
+        approx = self.xs.distinct_count(approximate=True)
+        assert abs(approx - exact) <= 0.05 * exact
+        xs = String("".join("%d\n" % i for i in range(100000)))
+        assert abs(xs.distinct_count(approximate=True) - 100000) < 3000
+
+    def test_quantiles(self):
+        values = [float(l.split()[1]) for l in self.xs.lines()]
+        q = self.xs.quantiles(1, qs=(0.1, 0.5, 0.9))
+        deciles = statistics.quantiles(values, n=10, method="inclusive")
+        assert [q[0.1], q[0.5], q[0.9]] == pytest.approx(
+            [deciles[0], deciles[4], deciles[8]])
+        approx = self.xs.quantiles(1, qs=(0.5, ), sample_size=2000, seed=1)
+        assert abs(approx[0.5] - q[0.5]) < 0.1 * q[0.5]
+        assert String("").quantiles(0) == {0.5: None, 0.9: None, 0.99: None}
+
+    def test_histogram(self):
+        hist = self.xs.histogram(1, 10)
+        assert sum(hist.values()) == len(self.keys)
+        assert list(hist) == sorted(hist)
+        assert hist[(0, 10)] == sum(
+            0 <= float(l.split()[1]) < 10 for l in self.xs.lines())
+        edges = self.xs.histogram(1, [10, 20, 30])
+        assert list(edges)[1:3] == [(10, 20), (20, 30)]
+        assert edges[(float("-inf"), 10)] == hist[(0, 10)]
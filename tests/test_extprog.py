@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from unittest import mock
+
+import pexpect
+
+from integraty.case import IntegraTestCase
+from integraty.case import run_integra_tests
+from integraty import extprog
+from integraty.extprog import AsyncExternalProgram, ExternalProgram, LineBuffer
+from integraty.extprog import pid_exists
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def running(pid, wait=1.0):
+    """Is process still running after `wait` seconds, rather than gone or a
+    zombie?"""
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            with open("/proc/%d/stat" % pid) as f:
+                alive = f.read().rsplit(")", 1)[1].split()[0] not in "ZX"
+        except FileNotFoundError:
+            alive = pid_exists(pid)
+        if not alive or time.monotonic() >= deadline:
+            return alive
+        time.sleep(0.01)
+
+
+def on_terminal(script):
+    """Runs Python `script` on a pseudo terminal, in its foreground."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return pexpect.spawn(sys.executable, ["-c", script],
+                         env=env,
+                         encoding="utf-8",
+                         timeout=10)
+
+
+class ExtProg(IntegraTestCase):
+
+    def setUp(self):
+        # Tests of process groups expect commands to get one, even when
+        # tests are run from a terminal.
+        patcher = mock.patch.object(extprog, "_in_foreground",
+                                    return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_line_buffer(self):
+        self.log.info("Tests reassembly of lines split across chunks")
+        buf = LineBuffer("utf-8")
+        data = "  alpha Ω\r\n\nbeta\rgamma  \n   \ndelta".encode("utf-8")
+        lines = []
+        for i in range(len(data)):
+            lines.extend(buf.feed(data[i:i + 1]))
+        lines.extend(buf.feed(b"", final=True))
+        self.assertListEqual(lines, ['alpha Ω', 'beta', 'gamma', '', 'delta'])
+
+    def test_iter_out_streams_lines(self):
+        self.log.info("Tests that lines arrive while the command is running")
+        c = ExternalProgram('echo "first line"; sleep 10; echo "second line"')
+        start = time.monotonic()
+        lines = c.iter_out()
+        self.assertEqual(next(lines), 'first line')
+        self.assertLess(time.monotonic() - start, 5)
+        # Abandoning the generator must not leave the command running.
+        lines.close()
+        self.assertIsNotNone(c.subprocess.poll())
+
+        c = ExternalProgram('sleep 0.5; echo done', timeout=0.8)
+        lines = c.iter_out()
+        self.assertFalse(c.was_run)  # Nothing runs until lines are wanted.
+        time.sleep(0.5)
+        self.assertListEqual(list(lines), ['done'])
+        self.assertFalse(c.timed_out)
+
+        # Timeout holds after output is closed, too.
+        c = ExternalProgram('echo done; exec >&- 2>&-; sleep 10', timeout=0.5)
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            list(c.iter_out())
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(c.timed_out)
+
+    def test_iter_out_filters(self):
+        self.log.info("Tests String-style filters applied to streamed output")
+        errors = []
+        c = ExternalProgram(
+            'for i in 1 2 3 4; do echo "host$i 10.0.0.$i"; echo "warn $i" >&2;'
+            ' done')
+        results = list(
+            c.iter_out(column=1,
+                       pattern='host[13]',
+                       exclude=True,
+                       on_stderr=errors.append,
+                       chunk_size=7))
+        self.assertListEqual(results, ['10.0.0.2', '10.0.0.4'])
+        self.assertListEqual(errors, ['warn 1', 'warn 2', 'warn 3', 'warn 4'])
+        self.assertCommandSucceeded(c)
+        self.assertEqual(c.out, '')
+
+    def test_chain_os_pipe(self):
+        self.log.info("Tests pipelines connected by OS pipes")
+        c = extprog.chain("printf 'b x\\na y\\nc z\\n' | sort | cut -d ' ' -f 2",
+                          os_pipe=True)
+        self.assertCommandSucceeded(c)
+        self.assertListEqual(c.out.lines(), ['y', 'x', 'z'])
+        self.assertListEqual(c.return_codes, [0, 0, 0])
+        self.assertEqual(len(c.stages), 3)
+
+        c = extprog.chain("sh -c 'echo oops >&2; exit 3' | cat", os_pipe=True)
+        self.assertListEqual(c.return_codes, [3, 0])
+        self.assertEqual(c.stages[0].err, 'oops\n')
+        self.assertEqual(c.stages[0].out, '')
+
+    def test_pipe_os_pipe_runs_concurrently(self):
+        self.log.info("Tests that all stages of a pipeline run at once")
+        start = time.monotonic()
+        c = ExternalProgram('sleep 1; echo done').pipe('sh -c "sleep 1; cat"',
+                                                       os_pipe=True)
+        self.assertLess(time.monotonic() - start, 1.9)
+        self.assertEqual(c.out, 'done\n')
+        self.assertListEqual(c.return_codes, [0, 0])
+
+    def test_pipeline_timeout_stops_upstream(self):
+        self.log.info("Tests timeout of stage which outlives the last one")
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            ExternalProgram.pipeline(['sleep 6', 'true'], timeout=1)
+        self.assertLess(time.monotonic() - start, 2)
+        c, last = ExternalProgram('sleep 6', timeout=1), ExternalProgram('true')
+        with self.assertRaises(subprocess.TimeoutExpired):
+            ExternalProgram.pipeline([c, last])
+        self.assertTrue(last.timed_out)
+        self.assertTrue(c.timed_out)
+        self.assertListEqual(last.return_codes, [-signal.SIGTERM, 0])
+
+    def test_timeout_stops_process_group(self):
+        self.log.info("Tests that timeout stops everything command started")
+        c = ExternalProgram('sleep 30 & echo $!; wait', timeout=0.5)
+        c.run()
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            c.block()
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(c.timed_out)
+        self.assertFalse(running(int(c.out.strip())))
+        self.assertGreaterEqual(c.phases["run"], 0.5)
+        self.assertIn("terminate", c.phases)
+        self.assertNotIn("kill", c.phases)
+
+    def test_own_process_group_same_session(self):
+        self.log.info("Tests commands keep session of caller")
+        c = ExternalProgram('ps -o pgid= -o sid= -p $$')
+        c.run()
+        pgid, sid = map(int, c.out.split())
+        self.assertEqual(pgid, c.pid)
+        self.assertEqual(sid, os.getsid(0))
+
+    def test_interrupt_stops_process_group(self):
+        self.log.info("Tests interrupted block stops everything command started")
+
+        def interrupt(signum, frame):
+            raise KeyboardInterrupt
+
+        handler = signal.signal(signal.SIGALRM, interrupt)
+        self.addCleanup(signal.signal, signal.SIGALRM, handler)
+        c = ExternalProgram('sleep 30 & echo $!; wait')
+        c.run()
+        pid = int(c.std_out.readline())
+        signal.setitimer(signal.ITIMER_REAL, 0.3)
+        with self.assertRaises(KeyboardInterrupt):
+            c.block()
+        self.assertIsNotNone(c.return_code)
+        self.assertFalse(running(pid))
+
+    def test_foreground_of_terminal(self):
+        self.log.info("Tests commands run from a terminal can read it")
+        t = on_terminal(
+            "from integraty.extprog import ExternalProgram\n"
+            "c = ExternalProgram('read x < /dev/tty; echo got=$x', timeout=5)\n"
+            "c.exec()\n"
+            "print(c.out.strip(), c.timed_out)\n")
+        t.sendline("hello")
+        t.expect("got=hello False")
+        t.expect(pexpect.EOF)
+
+        with tempfile.NamedTemporaryFile("r") as f:
+            t = on_terminal(
+                "from integraty.extprog import ExternalProgram\n"
+                "ExternalProgram('echo $$ > %s; exec sleep 37.5').exec()\n" %
+                f.name)
+            deadline = time.monotonic() + 5
+            while not f.read().strip() and time.monotonic() < deadline:
+                f.seek(0)
+                time.sleep(0.05)
+            f.seek(0)
+            pid = int(f.read())
+            t.sendintr()
+            t.expect("KeyboardInterrupt")
+            t.expect(pexpect.EOF)
+            self.assertFalse(running(pid))
+
+    def test_stop_escalates_to_kill(self):
+        self.log.info("Tests SIGKILL of commands which ignore SIGTERM")
+        c = ExternalProgram("trap '' TERM; sleep 30 & echo $!; wait")
+        c.run()
+        pid = int(c.std_out.readline())
+        c.stop(grace=0.3)
+        self.assertGreaterEqual(c.phases["terminate"], 0.3)
+        self.assertIn("kill", c.phases)
+        self.assertFalse(running(pid))
+
+    def test_stats(self):
+        self.log.info("Tests resource usage accounting of a command")
+        c = extprog.run(
+            'python3 -c "x = bytearray(1 << 27); sum(range(2000000))";'
+            ' echo out; echo error >&2; sleep 0.2')
+        stats = c.stats
+        self.assertGreaterEqual(stats.wall_time, 0.2)
+        self.assertGreater(stats.user_time, 0)
+        self.assertEqual(stats.cpu_time, stats.user_time + stats.sys_time)
+        self.assertGreaterEqual(stats.max_rss, 1 << 27)
+        self.assertEqual((stats.stdout_bytes, stats.stderr_bytes), (4, 6))
+
+        c = ExternalProgram('python3 -c "sum(range(2000000))"; sleep 30',
+                            timeout=1)
+        c.run()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            c.block()
+        self.assertGreater(c.stats.user_time, 0)
+
+        # Sizes are of bytes written, before newlines are translated.
+        c = extprog.run(r"printf 'a\r\nb\r\n\316\251'")
+        self.assertEqual(c.out, 'a\nb\nΩ')
+        self.assertEqual(c.stats.stdout_bytes, 8)
+
+        c = ExternalProgram('yes | head -n 1000')
+        self.assertIsNone(c.stats)
+        list(c.iter_out())
+        self.assertEqual(c.stats.stdout_bytes, 2000)
+
+    def test_stats_with_concurrent_polls(self):
+        self.log.info("Tests reaping while other threads poll the command")
+        from concurrent.futures import ThreadPoolExecutor
+        for _ in range(20):
+            c = ExternalProgram('sleep 0.01; exit 3')
+            c.run()
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                polls = [executor.submit(c.subprocess.poll) for _ in range(50)]
+                c.block()
+            self.assertEqual(c.return_code, 3)
+            self.assertTrue(all(p.result() in (None, 3) for p in polls))
+            self.assertIsNotNone(c.stats.user_time)
+
+    def test_binary_output(self):
+        self.log.info("Tests extraction from binary output of a command")
+        c = extprog.run(r"printf 'a \377 1\nb \376 2\n'", binary=True)
+        self.assertEqual(c.out, b"a \xff 1\nb \xfe 2\n")
+        self.assertListEqual(c.out.take_column(column=2), ['1', '2'])
+
+    def test_run_many(self):
+        self.log.info("Tests running many commands concurrently")
+        commands = ['sleep 0.5; echo %d' % i for i in range(6)]
+        batch = extprog.run_many(commands, max_workers=6)
+        self.assertTrue(batch.ok)
+        self.assertListEqual([c.out.lines() for c in batch],
+                             [[str(i)] for i in range(6)])
+        self.assertGreaterEqual(batch.total_time, 3)
+        self.assertLess(batch.wall_time, 2)
+        self.assertGreater(batch.speedup, 1.5)
+
+        batch = extprog.run_many(['sleep 10', 'sleep 0.2; echo late', 'true'],
+                                 timeout=1,
+                                 ordered=False)
+        self.assertListEqual([c.cmd for c in batch],
+                             ['true', 'sleep 0.2; echo late', 'sleep 10'])
+        self.assertListEqual([c.cmd for c in batch.timed_out], ['sleep 10'])
+        self.assertFalse(batch.ok)
+
+    def test_async_many(self):
+        self.log.info("Tests many commands running at once on an event loop")
+
+        async def main():
+            progs = [
+                AsyncExternalProgram('sleep 0.5; echo %d' % i)
+                for i in range(50)
+            ]
+            await asyncio.gather(*(p.exec() for p in progs))
+            return progs
+
+        start = time.monotonic()
+        progs = asyncio.run(main())
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertTrue(all(p.ok for p in progs))
+        self.assertListEqual([p.out.lines() for p in progs],
+                             [[str(i)] for i in range(50)])
+
+    def test_async_expect_send(self):
+        self.log.info("Tests interacting with a command from an event loop")
+
+        async def main():
+            async with AsyncExternalProgram(
+                    'while read l; do echo "got $l"; done; echo bye >&2',
+                    timeout=5) as p:
+                await p.run()
+                await p.send("one")
+                await p.expect("got (\\w+)")
+                first = p.after
+                await p.send("two")
+                p.sendeof()
+                await p.expect("never")
+                rest = p.before
+                await p.block()
+            return p, first, rest
+
+        p, first, rest = asyncio.run(main())
+        self.assertEqual(first, "got one")
+        self.assertEqual(rest.strip(), "got two")
+        self.assertListEqual(p.out.lines(), ["got one", "got two"])
+        self.assertEqual(p.err, "bye\n")
+        self.assertTrue(p.ok)
+
+    def test_async_block_closes_stdin(self):
+        self.log.info("Tests commands reading stdin complete when awaited")
+
+        async def main():
+            p = AsyncExternalProgram('cat; echo done', timeout=3)
+            await p.exec()
+            return p
+
+        start = time.monotonic()
+        p = asyncio.run(main())
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(p.timed_out)
+        self.assertEqual(p.out, "done\n")
+        self.assertTrue(p.ok)
+
+    def test_async_cancel_stops_process_group(self):
+        self.log.info("Tests cancelled block stops everything command started")
+
+        async def main():
+            p = AsyncExternalProgram('sleep 30 & echo $!; wait')
+            await p.run()
+            pid = int(await p.std_out.readline())
+            task = asyncio.ensure_future(p.block())
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return p, pid
+
+        p, pid = asyncio.run(main())
+        self.assertIsNotNone(p.return_code)
+        self.assertFalse(running(pid))
+
+    def test_async_timeout(self):
+        self.log.info("Tests timeouts of commands run from an event loop")
+
+        async def main():
+            p = AsyncExternalProgram('echo started; sleep 10', timeout=0.5)
+            with self.assertRaises(subprocess.TimeoutExpired):
+                await p.exec()
+            return p
+
+        start = time.monotonic()
+        p = asyncio.run(main())
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(p.timed_out)
+        self.assertEqual(p.out, "started\n")
+        self.assertIn("terminate", p.phases)
+
+
+if __name__ == "__main__":
+    run_integra_tests(catchbreak=True)
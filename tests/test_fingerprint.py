@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from integraty.case import Similarity
+from integraty.fingerprint import LSHIndex, MinHash, SimHash
+
+FIXTURE = os.path.join(os.path.dirname(__file__),
+                       "whois_iana_org_ip6_servers_arpa")
+
+with open(FIXTURE) as f:
+    TEXT = f.read()
+
+RNG = random.Random(11)
+WORDS = ["w%d" % i for i in range(300)]
+
+
+def mutate(text, fraction, rng):
+    words = text.split()
+    for i in rng.sample(range(len(words)), int(len(words) * fraction)):
+        words[i] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def jaccard(text1, text2, shingle=3):
+    s1 = set(Similarity._text2vec(text1, shingle))
+    s2 = set(Similarity._text2vec(text2, shingle))
+    return len(s1 & s2) / len(s1 | s2)
+
+
+class TestFingerprints:
+
+    def test_minhash_estimates_jaccard(self):
+        for fraction in (0.0, 0.05, 0.2, 0.5):
+            other = mutate(TEXT, fraction, RNG)
+            estimate = MinHash.from_text(TEXT, num_perm=256).similarity(
+                MinHash.from_text(other, num_perm=256))
+            assert estimate == pytest.approx(jaccard(TEXT, other), abs=0.1)
+        with pytest.raises(ValueError):
+            MinHash.from_text(TEXT).similarity(
+                MinHash.from_text(TEXT, seed=2))
+
+    def test_simhash_distance_grows_with_changes(self):
+        base = SimHash.from_text(TEXT)
+        assert base == SimHash.from_text(TEXT + "\n")
+        near = SimHash.from_text(mutate(TEXT, 0.02, RNG))
+        far = SimHash.from_text(" ".join(RNG.choices(WORDS, k=400)))
+        assert base.distance(near) < base.distance(far)
+        assert base.similarity(near) > 0.8
+
+    def test_simhash_without_int_bit_count(self, monkeypatch):
+        # Python before 3.10 has no `int.bit_count`.
+        from integraty import fingerprint
+        from integraty.utils import _bin_popcount
+        monkeypatch.setattr(fingerprint, "popcount", _bin_popcount)
+        assert SimHash(0b1011).distance(SimHash(0b0110)) == 3
+        assert SimHash(1 << 63).similarity(SimHash(0)) == 1 - 1 / 64
+
+    def test_same_in_every_process(self):
+        code = ("import sys; from integraty.fingerprint import MinHash, "
+                "SimHash; t = sys.stdin.read(); "
+                "print(MinHash.from_text(t).signature[:4], "
+                "SimHash.from_text(t).value)")
+        outputs = set()
+        for seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            outputs.add(
+                subprocess.run([sys.executable, "-c", code],
+                               input=TEXT,
+                               stdout=subprocess.PIPE,
+                               universal_newlines=True,
+                               env=env,
+                               cwd=os.path.dirname(os.path.dirname(__file__)),
+                               check=True).stdout)
+        assert len(outputs) == 1
+
+
+class TestLSHIndex:
+
+    def test_finds_nearest_baseline(self):
+        index = LSHIndex()
+        for i in range(300):
+            noise = " ".join(RNG.choices(WORDS, k=300))
+            index.add("noise%d" % i, MinHash.from_text(noise))
+        golden = {
+            "golden%d" % i: mutate(TEXT, 0.3, RNG) for i in range(3)
+        }
+        for key, text in golden.items():
+            index.add(key, MinHash.from_text(text))
+        assert len(index) == 303
+        actual = mutate(golden["golden1"], 0.05, RNG)
+        found = index.query(MinHash.from_text(actual), threshold=0.5)
+        assert found[0][0] == "golden1"
+        assert all(key.startswith("golden") for key, _ in found)
+        assert len(index.candidates(MinHash.from_text(actual))) < 50
+
+    def test_add_and_remove(self):
+        index = LSHIndex(num_perm=64, bands=16)
+        index.add("a", MinHash.from_text(TEXT, num_perm=64))
+        index.add("a", MinHash.from_text(TEXT.upper(), num_perm=64))
+        assert not index.query(MinHash.from_text(TEXT, num_perm=64))
+        index.remove("a")
+        assert "a" not in index
+        assert not any(index._buckets)
+        with pytest.raises(ValueError):
+            index.add("b", MinHash.from_text(TEXT))
+        with pytest.raises(ValueError):
+            LSHIndex(num_perm=100, bands=32)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+
+import pytest
+
+from integraty import multipattern
+from integraty.case import IntegraTestCase
+from integraty.extprog import ExternalProgram
+from integraty.multipattern import MultiPattern, trie_regex
+from integraty.xstring import String
+
+FIXTURE = os.path.join(os.path.dirname(__file__),
+                       "whois_iana_org_ip6_servers_arpa")
+
+LITERALS = [
+    "nserver", "server", "IP6-SERVERS", "SERVERS.ARPA", "e-mail", "whois",
+    "Virginia", "not there", "ARPA", "RPA 1"
+]
+
+REGEXES = [r"^nserver:\s+[A-C]\.", r"\d{4}-\d\d-\d\d", "(?i)iana", r"(a)\1"]
+
+
+def expected(lines, patterns, flags=0):
+    return {p: [l for l in lines if re.search(p, l, flags)] for p in patterns}
+
+
+class TestMultiPattern:
+
+    @pytest.mark.parametrize("trie", [False, True])
+    def test_same_results_as_one_pattern_at_a_time(self, trie, monkeypatch):
+        monkeypatch.setattr(multipattern, "TRIE_MIN_LITERALS",
+                            1 if trie else 1000)
+        xs = String.from_file(FIXTURE)
+        patterns = [re.escape(l) for l in LITERALS[:5]] + REGEXES
+        m = MultiPattern(literals=LITERALS, patterns=REGEXES)
+        assert (m._scanner is not None) == trie
+        lines = xs.lines()
+        assert m.scan(lines) == {
+            **{l: [x for x in lines if l in x] for l in LITERALS},
+            **expected(lines, REGEXES)
+        }
+        assert xs.match_many(patterns) == {
+            p: xs.lines(pattern=p) for p in patterns
+        }
+        assert xs.count_many(m)["not there"] == 0
+
+    @pytest.mark.parametrize("trie", [False, True])
+    def test_overlapping_literals(self, trie, monkeypatch):
+        monkeypatch.setattr(multipattern, "TRIE_MIN_LITERALS",
+                            1 if trie else 1000)
+        m = MultiPattern(["alphabet", "phab", "bet", "Alpha", "abc"],
+                         ignore_case=True)
+        assert m.matches("ALPHABET") == {"alphabet", "phab", "bet", "Alpha"}
+        assert m.count(["alphabet", "xx abc", "Bet"]) == {
+            "alphabet": 1,
+            "phab": 1,
+            "bet": 2,
+            "Alpha": 1,
+            "abc": 1
+        }
+
+    @pytest.mark.parametrize("trie", [False, True])
+    def test_ignore_case_same_on_both_paths(self, trie, monkeypatch):
+        monkeypatch.setattr(multipattern, "TRIE_MIN_LITERALS",
+                            1 if trie else 1000)
+        m = MultiPattern(["sx", "i\u0307x", "ix", "Ωmega"], ignore_case=True)
+        assert m.matches("\u017fx") == set()
+        assert m.matches("\u0130x") == {"i\u0307x"}
+        assert m.matches("ΩMEGA") == {"Ωmega"}
+        assert m.count(["\u017fx", "\u0130x SX", "ix"]) == {
+            "sx": 1,
+            "i\u0307x": 1,
+            "ix": 1,
+            "Ωmega": 0
+        }
+
+    def test_backreferences(self):
+        m = MultiPattern(patterns=[r"(a)\1", r"(b)\1", r"c+"])
+        assert m.matches("bb") == {r"(b)\1"}
+        assert m.search("xx bb c") == {r"(b)\1", "c+"}
+        assert m.count(["aa", "bb", "cbb"]) == {
+            r"(a)\1": 1,
+            r"(b)\1": 2,
+            "c+": 1
+        }
+        xs = String("aa\nbb\n")
+        assert xs.count_many([r"(a)\1", r"(b)\1"]) == {
+            p: len(xs.lines(pattern=p)) for p in [r"(a)\1", r"(b)\1"]
+        }
+
+    def test_search_whole_text(self):
+        text = String.from_file(FIXTURE)
+        patterns = LITERALS + REGEXES + ["ARPA\nnserver", r"domain:\s+\w"]
+        m = MultiPattern.from_patterns(patterns)
+        assert m.patterns == tuple(patterns)
+        assert m.search(text) == {p for p in patterns if re.search(p, text)}
+
+    @pytest.mark.parametrize("trie", [False, True])
+    def test_escaped_literals(self, trie, monkeypatch):
+        monkeypatch.setattr(multipattern, "TRIE_MIN_LITERALS",
+                            1 if trie else 1000)
+        lines = String.from_file(FIXTURE).lines()
+        escaped = [re.escape(lit) for lit in LITERALS] + [r"10\.0\.0\.1"]
+        m = MultiPattern.from_patterns(escaped + ["10.0.0.1"])
+        assert m.regexes == ("10.0.0.1", )
+        assert m.literals == tuple(escaped)
+        assert m.count(lines) == {
+            p: sum(1 for line in lines if re.search(p, line))
+            for p in escaped + ["10.0.0.1"]
+        }
+
+    def test_deep_trie(self):
+        word = "x" * 5000
+        assert re.fullmatch(trie_regex([word, word + "y"]), word + "y")
+
+    def test_assert_contains_all(self):
+        case = IntegraTestCase()
+        c = ExternalProgram('echo "alpha beta"; echo "gamma 42" >&2')
+        c.exec()
+        case.assertStdOutContainsAll(c, ["alpha", "bet.", "^alpha"])
+        case.assertStdErrContainsAll(c, ["gamma", r"\d+"])
+        with pytest.raises(AssertionError, match=r"\['delta', '\\\\d\+'\]"):
+            case.assertStdOutContainsAll(c, ["alpha", "delta", r"\d+"])
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import io
+
+import pytest
+
+from integraty import productivity
+from integraty.case import IntegraTestCase
+from integraty.productivity import ChecksumBytesIO, ChecksumFile
+from integraty.productivity import ChecksumStream, ChecksumStringIO
+from integraty.productivity import TemporaryFile, digests
+
+DATA = bytes(range(256)) * 5000 + "ψ".encode("utf-8") * 1000
+
+
+def expected(data, names=productivity.DEFAULT_ALGORITHMS):
+    return {name: hashlib.new(name, data).hexdigest() for name in names}
+
+
+class TestDigests:
+
+    @pytest.mark.parametrize("chunk_size", [1, 1000, 1 << 20])
+    def test_all_algorithms_in_one_pass(self, chunk_size):
+        stream = io.BytesIO(DATA)
+        assert digests(stream, chunk_size=chunk_size) == expected(DATA)
+        assert stream.tell() == len(DATA)
+        text = DATA.decode("latin-1")
+        assert digests(io.StringIO(text), ["sha512"],
+                       chunk_size=chunk_size) == expected(
+                           text.encode("utf-8"), ["sha512"])
+
+    def test_stream_is_read_once_in_chunks(self):
+        reads = []
+
+        class Stream(io.BytesIO):
+
+            def readinto(self, b):
+                reads.append(len(b))
+                return super().readinto(b)
+
+        stream = ChecksumStream(Stream(DATA))
+        stream._stream.seek(100)
+        assert stream.digests() == expected(DATA)
+        assert max(reads) == 1 << 20
+        assert len(reads) == len(DATA) // (1 << 20) + 2
+        assert stream._stream.tell() == 0
+        assert stream.sha256 == expected(DATA)["sha256"]
+
+    def test_no_size_limit(self, monkeypatch):
+        monkeypatch.setattr(productivity, "READ_LIMIT_BYTES", 1000)
+        assert TemporaryFile(DATA).sha1 == expected(DATA)["sha1"]
+
+    def test_checksum_classes(self, tmp_path):
+        path = tmp_path / "data"
+        path.write_bytes(DATA)
+        assert ChecksumFile(str(path)).digests("md5", "sha1") == expected(
+            DATA, ["md5", "sha1"])
+        text = DATA.decode("latin-1")
+        s = io.StringIO(text)
+        s.seek(10)
+        assert ChecksumStringIO(s).md5 == expected(text.encode("utf-8"))["md5"]
+        assert s.tell() == 10
+        b = io.BytesIO(DATA)
+        assert ChecksumBytesIO(b).digests() == expected(DATA)
+        assert TemporaryFile(DATA).digests("sha1") == expected(DATA, ["sha1"])
+
+    def test_assert_file_checksums(self, tmp_path):
+        path = tmp_path / "data"
+        path.write_bytes(DATA)
+        tc = IntegraTestCase()
+        want = expected(DATA, ["sha256", "md5"])
+        tc.assertFileChecksumsEqual(str(path), want)
+        tc.assertFileChecksumsEqual(str(path),
+                                    {"sha1": expected(DATA)["sha1"].upper()})
+        with pytest.raises(AssertionError, match="MD5 validation"):
+            tc.assertFileChecksumsEqual(str(path), dict(want, md5="0" * 32))
+        with pytest.raises(TypeError, match="checksums"):
+            tc.assertFileChecksumsEqual(str(path), {})
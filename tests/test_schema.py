@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import ipaddress
+import os
+
+import pytest
+
+from integraty import schema
+from integraty.schema import Column, Record, Schema, iter_pairs_records, record_type
+from integraty.xstring import String
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "dig_x_t_ns_microsoft_com")
+
+DIG = Schema([
+    "name",
+    ("ttl", int),
+    "class",
+    "q_type",
+    ("address", ipaddress.ip_address),
+])
+
+
+class TestSchema:
+
+    def test_same_records_as_map_func(self):
+        xs = String.from_file(FIXTURE)
+        keys = ('name', 'ttl', 'class', 'q_type', 'address')
+        expected = xs.map_func(lambda l: dict(zip(keys, l.split())),
+                               pattern=r'^microsoft\.com')
+        res = xs.parse(DIG, pattern=r'^microsoft\.com')
+        assert res.ok
+        assert [(r.name, str(r.ttl), r.class_, r.q_type, str(r.address))
+                for r in res] == [tuple(d.values()) for d in expected]
+        assert all(isinstance(r.address, ipaddress.IPv4Address) for r in res)
+
+    def test_errors_are_collected(self):
+        xs = String("a.com. 60 IN A 10.0.0.1\n"
+                    "b.com. 60 IN A not-an-address\n"
+                    "c.com. 60 IN\n"
+                    "d.com. 60 IN A 10.0.0.4\n")
+        res = xs.parse(DIG)
+        assert [r.name for r in res] == ['a.com.', 'd.com.']
+        assert [(e.index, e.line) for e in res.errors
+               ] == [(1, 'b.com. 60 IN A not-an-address'), (2, 'c.com. 60 IN')]
+        assert isinstance(res.errors[1].error, ValueError)
+        assert not res.ok
+        # Without a list to collect them, errors are skipped when streaming.
+        assert len(list(DIG.iter_parse(xs.lines()))) == 2
+        with pytest.raises(ValueError):
+            DIG.parse_line("c.com. 60 IN")
+
+    def test_nullable_columns(self):
+        schema = Schema(
+            [Column("iface"),
+             Column("mtu", int, True),
+             Column("state", nullable=True)],
+            sep=",",
+            null_values=("-", "n/a"))
+        res = String("eth0,1500,up\neth1,n/a,down\nlo,-\nwlan0\n").parse(
+            schema)
+        assert res.ok
+        assert [tuple(r) for r in res] == [('eth0', 1500, 'up'),
+                                           ('eth1', None, 'down'),
+                                           ('lo', None, None),
+                                           ('wlan0', None, None)]
+
+    def test_records(self):
+        schema = Schema(["if", "rx-bytes", "_tx", "1st", "a", "b"])
+        assert schema.record._fields == ('if_', 'rx_bytes', 'tx', 'f_1st',
+                                         'a', 'b')
+        row = schema.parse_line("eth0 10 20 x y z extra")
+        assert row == ('eth0', '10', '20', 'x', 'y', 'z')
+        assert not hasattr(row, "__dict__")
+        with pytest.raises(ValueError):
+            Schema([])
+
+
+class TestRecord:
+
+    def test_same_results_as_dicts(self):
+        xs = String.from_file(FIXTURE)
+        keys = ('name', 'ttl', 'class', 'q_type', 'address', 'missing')
+        for dicts, records in [
+            (xs.to_dict(keys=keys), xs.to_dict(keys=keys, compact=True)),
+            (xs.to_dict(), xs.to_dict(compact=True)),
+            (xs.pairs(as_dict=True), xs.pairs(as_dict=True, compact=True)),
+            (list(xs.iter_pairs(as_dict=True)),
+             list(xs.iter_pairs(as_dict=True, compact=True))),
+            (xs.to_dict_func(lambda l: [l.split()[:2]]),
+             xs.to_dict_func(lambda l: [l.split()[:2]], compact=True)),
+        ]:
+            assert [r.as_dict() for r in records] == dicts
+            assert all(isinstance(r, Record) for r in records)
+
+    def test_varying_keys_fall_back_to_dicts(self):
+        text = "".join("k%d %d k%d %d\n" % (i, i, i + 1, i) for i in range(100))
+        xs = String(text)
+        dicts = xs.pairs(as_dict=True)
+        for compact in (xs.pairs(as_dict=True, compact=True),
+                        list(xs.iter_pairs(as_dict=True, compact=True)),
+                        xs.to_dict_func(lambda l: zip(l.split()[::2],
+                                                      l.split()[1::2]),
+                                        compact=True)):
+            n = schema.MAX_RECORD_TYPES
+            assert all(isinstance(r, Record) for r in compact[:n])
+            assert all(type(r) is dict for r in compact[n:])
+            assert [r if type(r) is dict else r.as_dict()
+                    for r in compact] == dicts
+        rows = list(iter_pairs_records([["a", 1], ["b", 2], ["a", 3]],
+                                       max_types=1))
+        assert rows[1] == {"b": 2}
+        assert type(rows[0]) is type(rows[2])
+
+    def test_shared_keys(self):
+        rows = String("a 1\nb 2\nc\n").to_dict(keys=("k", "v"), compact=True)
+        assert type(rows[0]) is type(rows[1]) is record_type(("k", "v"))
+        assert rows[2].keys() == ("k",)
+        assert not hasattr(rows[0], "__dict__")
+
+    def test_access(self):
+        r = record_type(("name", "keys", "rx-bytes", 1))(("eth0", "k", 10, 20))
+        assert (r["name"], r.name, r[0]) == ("eth0", "eth0", "eth0")
+        # Methods win over attributes, and keys over positions.
+        assert (r["keys"], r.keys()) == ("k", ("name", "keys", "rx-bytes", 1))
+        assert (r["rx-bytes"], r[1], r[-1], r[1:3]) == (10, 20, 20, ("k", 10))
+        assert r.get("tx-bytes", 0) == 0
+        assert dict(r.items()) == r.as_dict()
+        with pytest.raises(KeyError):
+            r["tx-bytes"]
+        with pytest.raises(AttributeError):
+            r.name = "eth1"
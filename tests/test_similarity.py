@@ -2,8 +2,13 @@
 
 import re
 import os
+import random
 import sys
+import tracemalloc
 
+import pytest
+
+from integraty import case
 from integraty.case import IntegraTestCase
 from integraty.case import run_integra_tests
 from integraty.extprog import ExternalProgram, ExternalProgramException
@@ -68,5 +73,171 @@ class Similarity(IntegraTestCase):
                                                      ratio=0.74)
 
 
+def full_matrix_distance(str1, str2):
+    d = [list(range(len(str2) + 1))]
+    for i, a in enumerate(str1, 1):
+        row = [i]
+        for j, b in enumerate(str2, 1):
+            row.append(
+                min(d[-1][j] + 1, row[-1] + 1,
+                    d[-1][j - 1] + (0 if a == b else 2)))
+        d.append(row)
+    return d[-1][-1]
+
+
+class TestLevenshtein:
+
+    def test_same_as_full_matrix(self):
+        rng = random.Random(3)
+        for _ in range(500):
+            str1 = "".join(rng.choices("abc", k=rng.randint(0, 70)))
+            str2 = "".join(rng.choices("abc", k=rng.randint(0, 70)))
+            expected = full_matrix_distance(str1, str2)
+            sim = case.Similarity(str1, str2)
+            distance, ratio = sim.levenshtein_distance()
+            assert distance == expected
+            if str1 or str2:
+                assert ratio == pytest.approx(1 - expected /
+                                              (len(str1) + len(str2)))
+            for bound in (0, 5, 20):
+                distance, _ = case.Similarity._levenshtein_distance(
+                    str1, str2, bound)
+                if expected <= bound:
+                    assert distance == expected
+                else:
+                    assert bound < distance <= expected
+
+    def test_without_int_bit_count(self, monkeypatch):
+        # Python before 3.10 has no `int.bit_count`.
+        from integraty.utils import _bin_popcount
+        monkeypatch.setattr(case, "popcount", _bin_popcount)
+        assert _bin_popcount(0b1011 << 100) == 3
+        str1, str2 = "kitten" * 50, "sitting" * 50
+        distance, _ = case.Similarity(str1, str2).levenshtein_distance()
+        assert distance == full_matrix_distance(str1, str2)
+        distance, _ = case.Similarity(str1, str2).levenshtein_distance(10)
+        assert distance > 10
+
+    def test_max_distance(self):
+        tc = IntegraTestCase()
+        tc.assertStringsAlmostEqual("microsoft.com", "MicroSoft.com",
+                                    ratio=0.8,
+                                    max_distance=4)
+        with pytest.raises(AssertionError, match="at least"):
+            tc.assertStringsAlmostEqual("x" * 5000,
+                                        "y" * 5000,
+                                        ratio=0,
+                                        max_distance=10)
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__),
+                       "whois_iana_org_ip6_servers_arpa")
+
+
+class TestUnits:
+
+    @classmethod
+    def setup_class(cls):
+        with open(FIXTURE) as f:
+            cls.expected = f.read() * 100
+        lines = cls.expected.splitlines()
+        lines[10] = "changed: line"
+        del lines[200]
+        cls.actual = "\n".join(lines + ["added line"])
+
+    def test_lines(self):
+        sim = case.Similarity(self.actual, self.expected, unit="line")
+        units1, units2 = sim.units()
+        distance, ratio = sim.levenshtein_distance()
+        assert distance == 4
+        assert ratio == pytest.approx(1 - 4 / (len(units1) + len(units2)))
+        assert sim.difflib_ratio() == pytest.approx(ratio)
+        diffs = sim.differences()
+        assert [tag for tag, _, _ in diffs] == ["replace", "insert", "delete"]
+        assert diffs[0][1] == ["changed: line"]
+        assert diffs[-1] == ("delete", ["added line"], [])
+
+    def test_tokens(self):
+        sim = case.Similarity("a b  c d\ne", "a b x d e f", unit="token")
+        assert sim.levenshtein_distance() == (3, pytest.approx(8 / 11))
+        assert sim.differences() == [("replace", ["c"], ["x"]),
+                                     ("insert", [], ["f"])]
+        with pytest.raises(ValueError):
+            case.Similarity("a", "b", unit="word")
+
+    def test_assertions_report_differences(self):
+        tc = IntegraTestCase()
+        tc.assertStringsAlmostEqual(self.actual, self.expected, unit="line",
+                                    ratio=0.99, max_distance=4)
+        tc.assertStringsAlmostEqualDiffLib(self.actual, self.expected,
+                                           unit="token", ratio=0.99)
+        with pytest.raises(AssertionError) as e:
+            tc.assertStringsAlmostEqual(self.actual, self.expected,
+                                        unit="line",
+                                        max_distance=2)
+        assert "lines which differ:\n- changed: line\n+ " in str(e.value)
+        assert self.expected not in str(e.value)
+
+    def test_shortest_edit_script(self, monkeypatch):
+        rng = random.Random(5)
+        for limit in (case.DIFF_MAX_EDITS, 3):
+            monkeypatch.setattr(case, "DIFF_MAX_EDITS", limit)
+            for _ in range(300):
+                seq1 = rng.choices("abc", k=rng.randint(0, 20))
+                seq2 = rng.choices("abc", k=rng.randint(0, 20))
+                edited, edits = [], 0
+                for tag, i1, i2, j1, j2 in case.Similarity._opcodes(
+                        seq1, seq2):
+                    edited += seq2[j1:j2]
+                    if tag == "equal":
+                        assert seq1[i1:i2] == seq2[j1:j2]
+                    else:
+                        edits += i2 - i1 + j2 - j1
+                assert edited == seq2
+                distance, _ = case.Similarity._levenshtein_distance(
+                    seq1, seq2)
+                assert edits == distance or limit == 3
+
+    def test_too_many_edits_go_to_difflib(self):
+        seq1 = list(range(1500))
+        seq2 = list(range(1500, 3000))
+        tracemalloc.start()
+        try:
+            opcodes = case.Similarity._opcodes(seq1, seq2)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert opcodes == [("replace", 0, 1500, 0, 1500)]
+        # Shortest edit script was not attempted.
+        assert peak < 4 << 20
+
+
+class TestTokenVector:
+
+    def test_same_as_cosine_of_counts(self):
+        rng = random.Random(9)
+        words = ["alpha", "beta", "gamma", "delta", "x1", "_y"]
+        texts = [" ".join(rng.choices(words, k=rng.randint(0, 30))) + "!"
+                 for _ in range(50)]
+        reference = texts[0]
+        expected = [case.Similarity(reference, t).consine_distance()
+                    for t in texts]
+        assert case.similarity_many(reference, texts) == pytest.approx(
+            expected)
+        vectors = [case.TokenVector.from_text(t) for t in texts]
+        assert case.similarity_many(vectors[0], vectors) == pytest.approx(
+            expected)
+        assert case.similarity_many(reference, []) == []
+        assert case.similarity_many("", ["alpha"]) == [0.0]
+
+    def test_reference_is_tokenized_once(self, monkeypatch):
+        calls = []
+        text2vec = case.Similarity._text2vec
+        monkeypatch.setattr(case.Similarity, "_text2vec",
+                            lambda t: calls.append(t) or text2vec(t))
+        case.similarity_many("alpha beta", ["alpha"] * 10)
+        assert calls.count("alpha beta") == 1
+
+
 if __name__ == "__main__":
     run_integra_tests(catchbreak=True)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from integraty.xbytes import Bytes
+from integraty.xstring import String
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "dig_x_t_ns_microsoft_com")
+
+
+class TestBytes:
+
+    def test_same_results_as_string(self):
+        with open(FIXTURE, "rb") as f:
+            data = f.read()
+        xb, xs = Bytes(data), String(data.decode())
+        calls = [
+            ("lines", dict(pattern="^;", exclude=True)),
+            ("count", dict(pattern="IN")),
+            ("firstn", dict(n=2, pattern="NS")),
+            ("lastn", dict(n=2)),
+            ("take_column", dict(column=4, pattern=r"\tNS\t")),
+            ("head", dict(sep=";")),
+            ("tail", dict(pattern="NS")),
+            ("line_tuples", dict(strip_punct=True, pattern="^;;")),
+            ("compress", dict(indexes=(0, 3), pattern="NS")),
+            ("take_range_fields", dict(slc_range=(1, 3, 1), pattern="NS")),
+            ("pairs", dict(as_dict=True, pattern="^;; flags")),
+            ("with_prefix", dict(prefix=";;")),
+            ("with_suffix", dict(suffix=".")),
+            ("groupby_count", dict(key_func=lambda l: l[0])),
+            ("map_func", dict(func=len, sub_pattern="NS", replacement="ns")),
+        ]
+        for name, kwargs in calls:
+            assert getattr(xb, name)(**kwargs) == getattr(xs, name)(**kwargs)
+        assert xb.fields(pattern="NS") == xs.fields(pattern="NS")
+        assert xb.decode() == xs
+
+    def test_invalid_bytes(self):
+        xb = Bytes(b"ok \xff\xfe 1\nbad \x80 2\nok caf\xc3\xa9 3\n")
+        assert xb.take_column(column=2) == ['1', '2', '3']
+        assert xb.lines(pattern=b"^ok") == ['ok �� 1', 'ok café 3']
+        assert xb.count(pattern="café") == 1
+        latin = Bytes(b"caf\xe9 1\n", encoding="latin-1")
+        assert latin.take_column(column=0) == ['café']
+
+    def test_blank_lines_same_as_string(self):
+        data = "alpha 1\n   \n\t\nbeta 2\n"
+        xb, xs = Bytes(data.encode()), String(data)
+        for kwargs in (dict(), dict(keys=("name", "value")), dict(sep=","),
+                       dict(compact=True)):
+            assert xb.to_dict(**kwargs) == xs.to_dict(**kwargs)
+        assert xb.to_dict() == [{0: "alpha", 1: "1"}, {0: "beta", 1: "2"}]
+
+    def test_buffers(self):
+        data = b"alpha 1\r\nbeta 2\n\n  gamma 3  \n"
+        for buf in (data, bytearray(data), memoryview(data)):
+            assert Bytes(buf).pairs() == [(('alpha', '1'),), (('beta', '2'),),
+                                          (('gamma', '3'),)]
+
+    def test_decodes_only_returned_tokens(self):
+        decoded = []
+
+        class Tracing(Bytes):
+            __slots__ = []
+
+            def _decode(self, data):
+                decoded.append(bytes(data))
+                return super()._decode(data)
+
+        xb = Tracing(b"a 1 x\nb 2 y\nc 3 z\n")
+        assert xb.take_column(column=1, pattern="^[ab]") == ['1', '2']
+        assert decoded == [b'1', b'2']
+        del decoded[:]
+        assert xb.count() == 3
+        assert decoded == []
+
+    def test_columns(self):
+        import array
+        xb = Bytes(b"caf\xc3\xa9 10 0.5\nbad\xff 20 1.5\n")
+        assert xb.columns((0, 1, 2), (str, int, float), use_numpy=False) == [
+            ['café', 'bad�'],
+            array.array("q", [10, 20]),
+            array.array("d", [0.5, 1.5]),
+        ]
+
+
+class TestFromFile:
+
+    def test_mmap_same_results_as_string(self):
+        xs = String.from_file(FIXTURE)
+        with Bytes.from_file(FIXTURE) as xb:
+            assert xb.lines() == xs.lines()
+            assert xb.take_column(column=4,
+                                  pattern=r"\tNS\t") == xs.take_column(
+                                      column=4, pattern=r"\tNS\t")
+        assert String.from_file(FIXTURE, mmap=True).count() == xs.count()
+        assert Bytes.from_file(FIXTURE, mmap=False) == xs.encode()
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty"
+        path.write_bytes(b"")
+        assert Bytes.from_file(str(path)).lines() == []
+        assert String.from_file(str(path)).lines() == []
+
+    def test_mmap_is_not_copied(self, tmp_path):
+        import tracemalloc
+        path = tmp_path / "big.log"
+        with open(path, "wb") as f:
+            for i in range(200000):
+                f.write(b"host%06d up %d\n" % (i, i % 7))
+        size = path.stat().st_size
+        tracemalloc.start()
+        with Bytes.from_file(str(path)) as xb:
+            found = sum(1 for _ in xb.iter_take_column(column=0,
+                                                       pattern=b" up 6$"))
+            peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert found == 200000 // 7
+        # Lines are never copied out of the mapping all at once.
+        assert peak < size / 100
+
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+from integraty import xstring
+
+
+class TestLineIndex:
+
+    def test_lines_and_offsets(self):
+        text = "  alpha one\n\nbeta two  \r\n   \ngamma\x0cdelta"
+        index = xstring.LineIndex(text)
+        assert index.lines == [l.strip() for l in text.splitlines() if l]
+        assert len(index) == 5
+        # Every offset points at the unstripped line in the original string.
+        for line, offset in zip(index.lines, index.offsets):
+            assert text[offset:].lstrip().startswith(line)
+        assert index.offsets == [0, 13, 25, 29, 35]
+
+    def test_index_is_built_once(self):
+        xs = xstring.String("alpha 1\nbeta 2\ngamma 3\n")
+        assert xs.take_column(column=1) == ['1', '2', '3']
+        index = xs._line_index()
+        assert xs.lines(pattern="beta") == ['beta 2']
+        assert xs.count() == 3
+        assert xs._line_index() is index
+        # Results must not alias the shared index.
+        xs.lines().append("delta 4")
+        assert xs.lines() == ['alpha 1', 'beta 2', 'gamma 3']
+
+
+class TestCompilePattern:
+
+    def test_patterns_compiled_once(self):
+        from integraty.utils import compile_pattern
+        compile_pattern.cache_clear()
+        xs = xstring.String("alpha 1\nbeta 2\ngamma 3\n")
+        for _ in range(3):
+            assert xs.lines(pattern="^(alpha|beta)",
+                            sub_pattern=r"\d",
+                            replacement="N") == ['alpha N', 'beta N']
+        info = compile_pattern.cache_info()
+        assert info.misses == 2
+        assert info.hits == 4
+        assert compile_pattern("^(alpha|beta)") \
+            is compile_pattern("^(alpha|beta)")
+
+
+class TestPipeline:
+
+    def test_splitter_matches_split(self):
+        from integraty.utils import Split, splitter
+        line = "alpha: beta,, gamma  delta:epsilon"
+        for sep in (None, ",", ":", r":\s*", r"(,)", lambda s: s.split(":")):
+            for maxsplit in (-1, 1, 2):
+                assert splitter(sep=sep, maxsplit=maxsplit)(line) \
+                    == Split(line)(sep=sep, maxsplit=maxsplit)
+
+    def test_stages_are_lazy(self):
+        xs = xstring.String("a 1\nb 2\nc 3\n")
+        lines = xs._iter_lines(pattern="b", exclude=True,
+                               sub_pattern=r"\d", replacement="N")
+        assert not isinstance(lines, list)
+        assert list(lines) == ['a N', 'c N']
+        assert list(xs._iter_tokens(pattern="c")) == [['c', '3']]
+        assert xs.pairs(as_dict=True, pattern="a") == [{'a': '1'}]
+
+
+class TestStreaming:
+
+    text = ("Θ alpha  beta\n\n  ψ beta gamma delta \r\nΘ delta\tsigma\n"
+            "ψ epsilon tau\x0cω zeta eta")
+
+    def test_same_results_as_lists(self):
+        xs = xstring.String(self.text)
+        assert list(xs.iter_lines()) == xs.lines()
+        assert list(xs.iter_lines(pattern="ψ", exclude=True,
+                                  sub_pattern="a",
+                                  replacement="A")) \
+            == xs.lines(pattern="ψ", exclude=True, sub_pattern="a",
+                        replacement="A")
+        assert list(xs.iter_line_tuples(strip_punct=True)) \
+            == xs.line_tuples(strip_punct=True)
+        assert list(xs.iter_take_column(column=1, pattern="[Θψ]")) \
+            == xs.take_column(column=1, pattern="[Θψ]")
+        assert list(xs.iter_fields()) == xs.fields()
+        assert list(xs.iter_map_func(len)) == xs.map_func(len)
+        assert list(xs.iter_filtered_map(str.upper, lambda l: "a" in l)) \
+            == xs.filtered_map(str.upper, lambda l: "a" in l)
+        assert list(xs.iter_pairs()) == xs.pairs()
+        assert list(xs.iter_pairs(as_dict=True)) == xs.pairs(as_dict=True)
+        assert dict(xs.iter_groupby_count(lambda l: l[0])) \
+            == xs.groupby_count(lambda l: l[0])
+
+    def test_no_index_is_built(self):
+        xs = xstring.String(self.text)
+        assert next(xs.iter_take_column(column=1)) == 'alpha'
+        assert list(xs.iter_fields())
+        assert xs._index is None
+        xs.count()
+        assert xs._index is not None
+        assert list(xs.iter_lines()) == xs.lines()
+
+
+class TestLiteralPatterns:
+
+    text = TestStreaming.text + "\n  beta  \n\x1cbeta gamma\rtau beta tau"
+
+    def test_literal_of(self):
+        from integraty.utils import literal_of
+        assert literal_of("beta gamma") == "beta gamma"
+        assert literal_of(r"10\.0\.0\.1") == "10.0.0.1"
+        assert literal_of(r"a\d") is None
+        assert literal_of("^beta") is None
+        assert literal_of("") is None
+
+    def test_same_results_as_regex(self, monkeypatch):
+        patterns = ["beta", "a ", " beta", "beta ", "delta\tsigma", r"ψ\ ",
+                    "missing", "eta"]
+        expected = {}
+        with monkeypatch.context() as m:
+            m.setattr(xstring, "literal_of", lambda pattern: None)
+            for p in patterns:
+                xs = xstring.String(self.text)
+                expected[p] = xs.lines(pattern=p)
+                expected[p, True] = xs.lines(pattern=p, exclude=True)
+        for p in patterns:
+            for lazy in (True, False):
+                xs = xstring.String(self.text)
+                assert list(xs._iter_lines(pattern=p, lazy=lazy)) \
+                    == expected[p]
+                assert xs._index is None or not lazy
+                assert list(xs._iter_lines(pattern=p, exclude=True,
+                                           lazy=lazy)) == expected[p, True]
+            assert xs.lines(pattern=p) == expected[p]
+
+    def test_only_frequent_literal_builds_index(self):
+        xs = xstring.String("alpha beta\n" * 100 + "  rare gamma \n")
+        assert xs.lines(pattern="rare") == ["rare gamma"]
+        assert xs._index is None
+        assert len(xs.lines(pattern="a")) == 101
+        assert xs._index is not None
+
+
+class TestColumns:
+    text = "name rx tx ms\nalpha 10 20 0.5\nbeta 30 40 1.5\ngamma 50 60 2.0\n"
+
+    def test_array_columns(self):
+        import array
+        xs = xstring.String(self.text)
+        name, tx, ms = xs.columns((0, 2, 3), (str, int, float),
+                                  pattern="^name",
+                                  exclude=True,
+                                  use_numpy=False)
+        assert name == xs.take_column(column=0, pattern="^name", exclude=True)
+        assert tx == array.array("q", [20, 40, 60])
+        assert ms == array.array("d", [0.5, 1.5, 2.0])
+        rx, = xs.columns((1, ), "l", pattern="^name", exclude=True,
+                         use_numpy=False)
+        assert rx.typecode == "l" and sum(rx) == 90
+        assert xs.columns((1, ), int, pattern="^$", use_numpy=False) == [
+            array.array("q")
+        ]
+
+    def test_errors(self):
+        import pytest
+        xs = xstring.String(self.text)
+        with pytest.raises(ValueError):
+            xs.columns((1, ), int, use_numpy=False)  # header is not a number
+        with pytest.raises(ValueError):
+            xs.columns((1, 2), (int, ), pattern="^name", exclude=True)
+
+    def test_numpy_columns(self):
+        import pytest
+        np = pytest.importorskip("numpy")
+        xs = xstring.String(self.text)
+        name, rx, ms = xs.columns((0, 1, 3), (str, int, float),
+                                  pattern="^name",
+                                  exclude=True,
+                                  use_numpy=True)
+        assert list(name) == ["alpha", "beta", "gamma"]
+        assert rx.dtype == np.int64 and rx.sum() == 90
+        assert ms.dtype == np.float64 and ms.max() == 2.0
+
+
+class TestParallel:
+    text = "".join("host%d 10.0.%d.%d %s\n" % (i, i % 7, i % 250, "up" if i %
+                                               3 else "down")
+                   for i in range(1000))
+
+    def test_same_results_as_serial(self, monkeypatch):
+        from integraty import parallel
+        monkeypatch.setattr(parallel, "PARALLEL_MIN_LINES", 100)
+        xs = xstring.String(self.text)
+        key = lambda l: l.split()[1]
+        for method, args, kw in [
+            ("map_func", (key, ), dict(pattern="down", exclude=True)),
+            ("filter_func", (lambda l: l.endswith("down"), ),
+             dict(exclude=True)),
+            ("filtered_map", (len, lambda l: "7" in l),
+             dict(sub_pattern=r"\d", replacement="N")),
+            ("groupby_count", (key, ), {}),
+        ]:
+            serial = getattr(xs, method)(*args, **kw)
+            par = getattr(xs, method)(*args, workers=3, **kw)
+            assert par == serial
+            assert list(par) == list(serial)  # Order of groups too.
+
+    def test_threshold(self, monkeypatch):
+        from integraty import parallel
+        calls = []
+        monkeypatch.setattr(parallel, "chunk_bounds",
+                            lambda *a: calls.append(a) or [])
+        xstring.String(self.text).map_func(len, workers=4)
+        assert calls == []  # Too small to be worth splitting.
+        monkeypatch.setattr(parallel, "PARALLEL_MIN_LINES", 100)
+        xstring.String(self.text).map_func(len, workers=4)
+        assert calls == [(1000, 16)]
+
+    def test_serial_finds_literals_without_index(self):
+        xs = xstring.String(self.text)
+        assert xs.map_func(len, pattern="host99 ", workers=4) == [21]
+        assert xs.groupby_count(len, pattern="host99 ") == {21: 1}
+        assert xs._index is None
+
+    def test_no_fork_while_threads_run(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        from integraty import parallel
+        monkeypatch.setattr(parallel, "PARALLEL_MIN_LINES", 100)
+
+        def get_context(*args):
+            raise AssertionError("forked while threads run")
+
+        monkeypatch.setattr(parallel.multiprocessing, "get_context",
+                            get_context)
+        xs = xstring.String(self.text)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            par = executor.submit(xs.map_func, len, workers=3).result()
+        assert par == xs.map_func(len)